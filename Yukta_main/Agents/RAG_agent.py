@@ -3,63 +3,52 @@ from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
 from langchain_core.prompts import PromptTemplate
-from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_pinecone import PineconeVectorStore
-from langchain.retrievers.multi_query import MultiQueryRetriever
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.prebuilt import create_react_agent
 from langchain.tools import tool
 from pinecone import Pinecone, ServerlessSpec
+from Utils.semantic_cache import SemanticCache
+from Utils.runnable_registry import register_runnable
+from Utils.parallel_retrieval import ParallelMultiQueryRetriever
+from Utils.startup import LazyResource
+from Utils.admission import Overloaded
+
+MODEL_TIER = "light" # The agent loop only calls retriever_tool and echoes its answer
+ANSWER_CHAIN_MODEL_TIER = "heavy"
+# The answer is generated inside retriever_tool and relayed by the agent; streaming it from the tool would show it twice
+_NOSTREAM = {"tags": ["nostream"]}
 
 _RAG_llm = None
+_RAG_agent_llm = None
 _embedding = None
 _PINECONE_INDEX_NAME = None
 _parser = None
 vector_store = None
+_answer_cache = None
+_history_hook = None
+_rag_backend = None
+rag_retriever = None
+rag_answer_prompt = None
+rag_answer_chain = None
 
-def init_rag_agent(RAG_llm, embedding, pinecone_rag_index_name, parser):
-    global _RAG_llm, _embedding, _PINECONE_INDEX_NAME, _parser, vector_store
+def init_rag_agent(RAG_llm, embedding, pinecone_rag_index_name, parser, answer_cache=None, history_hook=None, agent_llm=None, startup_report=None):
+    global _RAG_llm, _RAG_agent_llm, _embedding, _PINECONE_INDEX_NAME, _parser, _answer_cache, _history_hook
+    global _rag_backend, rag_answer_prompt, rag_answer_chain
 
     _RAG_llm = RAG_llm
+    _RAG_agent_llm = agent_llm if agent_llm is not None else RAG_llm
     _embedding = embedding
     _PINECONE_INDEX_NAME = pinecone_rag_index_name
     _parser = parser
-    PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-    index = pc.Index(_PINECONE_INDEX_NAME)
-    vector_store = PineconeVectorStore(index=index, embedding=_embedding)
-
-# loader = DirectoryLoader(path='./TestData',glob='**/*.pdf', loader_cls=PyPDFLoader)
-# docs = loader.load()
-
-# splitter = RecursiveCharacterTextSplitter(chunk_size=1500, chunk_overlap=300) # Adjusted for balance
-# chunks = splitter.split_documents(docs)
-# vector_store = None
+    _answer_cache = answer_cache if answer_cache is not None else SemanticCache()
+    _history_hook = history_hook
 
-# if chunks:
-#         vector_store = PineconeVectorStore.from_documents(
-#                 chunks,
-#                 embedding,
-#                 index_name=PINECONE_INDEX_NAME
-#         )
-#         print(f"Successfully Loaded {len(chunks)} chunks into Pinecone.")
-# else:
-#         print("Warning: No documents or chunks were processed for the RAG System. RAG Functionalities might be limited")
+    # Connecting to Pinecone is a network round trip: it happens on the first retriever_tool call, not at startup
+    _rag_backend = LazyResource("pinecone_retriever", _connect_retriever, startup_report)
 
-
-
-@tool
-def retriever_tool(question: str):
-    """Tool to Retrieve Semantically Similar documents to answer User Questions related to FutureSmart AI"""
-    print("INSIDE RETRIEVER NODE")
-    if vector_store is None:
-        return "RAG system is not initialized. Please ensure documents are loaded correctly."
-    retriever = MultiQueryRetriever.from_llm(
-          retriever=vector_store.as_retriever(search_kwargs={'k': 4}),
-          llm=_RAG_llm
-    )
-    prompt = PromptTemplate(
+    # The answer chain is built once; retriever_tool reuses it on every call.
+    rag_answer_prompt = PromptTemplate(
           template="""You are an AI assistant. Your sole purpose is to answer questions based *strictly and exclusively* on the provided document excerpts (Context).
 
           Context:
@@ -74,12 +63,89 @@ def retriever_tool(question: str):
           Answer:""",
           input_variables=['context_text', 'question']
         )
-    retrieved_docs = retriever.invoke(question)
+    rag_answer_chain = rag_answer_prompt | _RAG_llm | _parser
+    register_runnable('rag.answer_chain', rag_answer_chain)
+    return _rag_backend
+
+
+def _connect_retriever():
+    global vector_store, rag_retriever
+    pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
+    index = pc.Index(_PINECONE_INDEX_NAME)
+    vector_store = PineconeVectorStore(index=index, embedding=_embedding)
+    # The retriever batch-embeds the query variants and runs the Pinecone searches concurrently
+    rag_retriever = ParallelMultiQueryRetriever(
+          llm=_RAG_llm,
+          vector_store=vector_store,
+          embedding=_embedding,
+          k=4
+    )
+    return register_runnable('rag.multi_query_retriever', rag_retriever)
+
+def get_rag_cache_stats():
+    """Returns hit/miss counters of the RAG semantic answer cache."""
+    return _answer_cache.stats() if _answer_cache is not None else None
+
+# Documents are loaded into Pinecone by the incremental ingestion pipeline, which only re-embeds changed chunks
+# and invalidates the semantic answer cache afterwards:
+#     python -m Utils.rag_ingestion --data-path ./TestData --index rag-documents-index
+
+
+@tool
+def retriever_tool(question: str):
+    """Tool to Retrieve Semantically Similar documents to answer User Questions related to FutureSmart AI"""
+    print("INSIDE RETRIEVER NODE")
+    if _rag_backend is None:
+        return "RAG system is not initialized. Please ensure documents are loaded correctly."
+
+    # Students ask the same syllabus questions in slightly different words: answer from the semantic cache when possible
+    question_vector = _embedding.embed_query(question)
+    cached_answer = _answer_cache.lookup(question_vector)
+    if cached_answer is not None:
+        print("RAG semantic cache hit")
+        return cached_answer
+
+    try:
+        retriever = _rag_backend.get()
+    except Exception as e:
+        return f"RAG system could not connect to the document index: {e}"
+    try:
+        retrieved_docs = retriever.search(question, question_vector) # Reuse the embedding computed for the cache lookup
+    except Overloaded as e:
+        return str(e)
+    context_text = "\n\n---\n\n".join([doc.page_content for doc in retrieved_docs])
+    generated_answer = rag_answer_chain.invoke({'context_text': context_text, 'question': question}, config=_NOSTREAM)
+    _answer_cache.insert(question_vector, question, generated_answer)
+    return generated_answer
+
+
+async def _aretriever_tool(question: str):
+    """Async variant of retriever_tool: the embedding, vector searches and LLM calls never block the event loop."""
+    print("INSIDE RETRIEVER NODE (async)")
+    if _rag_backend is None:
+        return "RAG system is not initialized. Please ensure documents are loaded correctly."
+
+    question_vector = await _embedding.aembed_query(question)
+    cached_answer = _answer_cache.lookup(question_vector)
+    if cached_answer is not None:
+        print("RAG semantic cache hit")
+        return cached_answer
+
+    try:
+        retriever = await _rag_backend.aget()
+    except Exception as e:
+        return f"RAG system could not connect to the document index: {e}"
+    try:
+        retrieved_docs = await retriever.asearch(question, question_vector)
+    except Overloaded as e:
+        return str(e)
     context_text = "\n\n---\n\n".join([doc.page_content for doc in retrieved_docs])
-    chain = prompt | _RAG_llm | _parser
-    generated_answer = chain.invoke({'context_text': context_text, 'question': question})
+    generated_answer = await rag_answer_chain.ainvoke({'context_text': context_text, 'question': question}, config=_NOSTREAM)
+    _answer_cache.insert(question_vector, question, generated_answer)
     return generated_answer
 
+retriever_tool.coroutine = _aretriever_tool
+
 rag_agent_prompt = """You are a specialized RAG (Retrieval Augmented Generation) agent for FutureSmart AI.
             Your primary goal is to answer user questions *strictly* based on the provided document excerpts related to FutureSmart AI's college syllabus.
             You will use the `retriever_tool` to find relevant information.
@@ -97,9 +163,10 @@ rag_agent_prompt = """You are a specialized RAG (Retrieval Augmented Generation)
 
 def create_rag_agent():
     RAG_agent = create_react_agent(
-        model = _RAG_llm,
+        model = _RAG_agent_llm,
         tools = [retriever_tool],
         prompt = rag_agent_prompt,
+        pre_model_hook = _history_hook,
         name = 'RAG_agent'
     )
     return RAG_agent
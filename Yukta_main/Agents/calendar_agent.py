@@ -1,17 +1,74 @@
+import asyncio
 from dotenv import load_dotenv
+from pydantic import BaseModel
 from langgraph.prebuilt import create_react_agent
+from langchain_core.tools import StructuredTool
 from langchain_google_community import CalendarToolkit
+from langchain_google_community.calendar.toolkit import (
+    CalendarCreateEvent, CalendarSearchEvents, CalendarUpdateEvent, GetCalendarsInfo, CalendarMoveEvent,
+    CalendarDeleteEvent, GetCurrentDatetime,
+)
+from Utils.startup import LazyResource
+from Utils.admission import Overloaded, downstream_slot
+
+MODEL_TIER = "heavy" # Resolves relative dates and creates, moves and deletes events: a wrong call changes the user's calendar
 
 _calendar_llm = None
+_history_hook = None
+_calendar_backend = None
 tools = None
 google_calendar_agent_prompt = None
 
-def init_calendar_agent(llm):
-    global _calendar_llm, tools, google_calendar_agent_prompt
+# The tools CalendarToolkit.get_tools() returns, in its order. Their names, descriptions and argument schemas are class
+# attributes, so the agent can be built from them before the toolkit (and its OAuth session) exists.
+CALENDAR_TOOL_CLASSES = [CalendarCreateEvent, CalendarSearchEvents, CalendarUpdateEvent, GetCalendarsInfo,
+                         CalendarMoveEvent, CalendarDeleteEvent, GetCurrentDatetime]
+
+
+class _NoArguments(BaseModel):
+    pass
+
+
+def _connect_calendar():
+    # Loads the OAuth token (or runs the consent flow) and builds the Calendar API client
+    return {tool.name: tool for tool in CalendarToolkit().get_tools()}
+
+
+def _lazy_calendar_tool(tool_class):
+    """A stand-in for a toolkit tool with the same name, description and arguments; the toolkit is built on its first call."""
+    fields = tool_class.model_fields
+    name = fields["name"].default
+
+    def run(**kwargs):
+        try:
+            calendar_tools = _calendar_backend.get()
+        except Exception as e:
+            return f"Google Calendar is not available: {e}"
+        try:
+            with downstream_slot("google_calendar"):
+                return calendar_tools[name].invoke(kwargs)
+        except Overloaded as e:
+            return str(e)
+
+    async def arun(**kwargs):
+        return await asyncio.to_thread(run, **kwargs)
+
+    return StructuredTool.from_function(
+        func=run,
+        coroutine=arun,
+        name=name,
+        description=fields["description"].default,
+        args_schema=fields["args_schema"].default or _NoArguments,
+    )
+
+
+def init_calendar_agent(llm, history_hook=None, startup_report=None):
+    global _calendar_llm, _calendar_backend, tools, google_calendar_agent_prompt, _history_hook
     load_dotenv(dotenv_path="../.env")
     _calendar_llm = llm
-    toolkit = CalendarToolkit()
-    tools = toolkit.get_tools()
+    _history_hook = history_hook
+    _calendar_backend = LazyResource("google_calendar", _connect_calendar, startup_report)
+    tools = [_lazy_calendar_tool(tool_class) for tool_class in CALENDAR_TOOL_CLASSES]
     google_calendar_agent_prompt = """You are a specialized Google Calendar Agent.
     Your primary goal is to manage calendar events for the user, including creating, searching, and deleting events.
     You will use the provided Google Calendar tools to fulfill requests.
@@ -30,6 +87,7 @@ def init_calendar_agent(llm):
     -   **Confirmation:** For any action that modifies the calendar (create, delete), always ask the user for confirmation first, listing the details.
     -   **Present Final Result:** Your task is complete once the calendar operation is done. Present a clear, concise confirmation of the action performed (e.g., "Event 'Meeting with John' created for tomorrow at 10 AM.").
     -   Do NOT add any additional conversational text beyond the confirmation or clarification questions."""
+    return _calendar_backend
 
 def create_calendar_agent():
     if _calendar_llm is None or tools is None:
@@ -38,6 +96,7 @@ def create_calendar_agent():
         model = _calendar_llm,
         tools = tools,
         prompt = google_calendar_agent_prompt,
+        pre_model_hook = _history_hook,
         name = "calendar_agent"
     )
     return calendar_agent
\ No newline at end of file
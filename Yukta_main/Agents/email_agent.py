@@ -1,21 +1,34 @@
 import os
+import re
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
+from typing import Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain.tools import tool
-from langgraph.prebuilt import create_react_agent
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
+from langgraph.graph import StateGraph, MessagesState, START, END
+from Utils.runnable_registry import register_runnable
+from Utils.model_tiers import tiered_chain
+from Utils.history_manager import current_request
+
+WRITER_CHAIN_MODEL_TIER = "heavy"
+REVIEWER_CHAIN_MODEL_TIER = "heavy"
 
-_llm = None
 _email_writer_llm = None
 _email_reviewer_llm = None
+_max_revisions = 2
+_stream_draft = True
 
 _email_writer_parser = None
 _email_reviewer_parser = None
 
 email_writer_prompt = None
 email_reviewer_prompt = None
+email_writer_chain = None
+email_reviewer_chain = None
 
 class EmailContent(BaseModel):
     """Structured output for an email, including its subject, body, and recipient details."""
@@ -36,13 +49,15 @@ class EmailReviewFeedback(BaseModel):
     revised_subject: str = Field(description="The revised subject line if changes are suggested, otherwise same as original.")
     revised_body: str = Field(description="The revised email body if changes are suggested, otherwise same as original.")
 
-def init_email_agent(llm_model, email_writer_llm, email_reviewer_llm):
-    global _llm, _email_writer_llm, _email_reviewer_llm
+def init_email_agent(email_writer_llm, email_reviewer_llm, max_revisions=2, stream_draft=True):
+    global _email_writer_llm, _email_reviewer_llm, _max_revisions, _stream_draft
     global _email_writer_parser, _email_reviewer_parser
     global email_reviewer_prompt, email_writer_prompt
-    _llm = llm_model
+    global email_writer_chain, email_reviewer_chain
     _email_writer_llm = email_writer_llm
     _email_reviewer_llm = email_reviewer_llm
+    _max_revisions = max_revisions
+    _stream_draft = stream_draft
 
     _email_writer_parser = PydanticOutputParser(pydantic_object=EmailContent)
     _email_reviewer_parser = PydanticOutputParser(pydantic_object=EmailReviewFeedback)
@@ -63,6 +78,7 @@ def init_email_agent(llm_model, email_writer_llm, email_reviewer_llm):
         Applicant Name: {applicant_name}
         Applicant Phone: {applicant_phone}
         Applicant Email: {applicant_email}
+        If a detail above is "N/A", use the sender's detail stated in the request instead, or keep "N/A" if the request does not give it.
 
         Ensure the email's body is well-structured and professional.
         """,
@@ -104,8 +120,14 @@ def init_email_agent(llm_model, email_writer_llm, email_reviewer_llm):
     partial_variables={"format_instructions": _email_reviewer_parser.get_format_instructions()}
     )
 
-@tool
-def write_email_tool(user_request: str,
+    # Compile both chains once; the pipeline nodes and the batch API reuse them on every call
+    email_writer_chain = register_runnable('email.writer_chain', tiered_chain(email_writer_prompt, _email_writer_llm, _email_writer_parser))
+    email_reviewer_chain = register_runnable('email.reviewer_chain', tiered_chain(email_reviewer_prompt, _email_reviewer_llm, _email_reviewer_parser))
+
+# The raw JSON of drafts and reviews is not shown to the user; the formatted draft is streamed instead
+_NOSTREAM = {"tags": ["nostream"]}
+
+def write_email(user_request: str,
     applicant_name: str,
     applicant_phone: str,
     applicant_email: str) -> EmailContent:
@@ -119,99 +141,237 @@ def write_email_tool(user_request: str,
         applicant_phone (str): The phone number of the sender.
         applicant_email (str): The email address of the sender.
     """
-    print("INSIDE EMAIL WRITER TOOL")
+    print("INSIDE EMAIL WRITER")
     try:
-        email_chain = email_writer_prompt | _email_writer_llm | _email_writer_parser
-        generated_email_obj = email_chain.invoke({
-            'user_request': user_request,
-            'applicant_name': applicant_name,
-            'applicant_phone': applicant_phone,
-            'applicant_email': applicant_email
-        })
-        return generated_email_obj
+        return email_writer_chain.invoke(_writer_inputs(user_request, applicant_name, applicant_phone, applicant_email), config=_NOSTREAM)
     except Exception as e:
-        print(f"Error in write_email_tool: {e}")
-        # Return an EmailContent object with error details for consistent type
-        return EmailContent(
-            recipient_name="Recipient", # Placeholder
-            recipient_greeting="Dear Sir/Madam,", # Placeholder
-            subject="Error: Email Generation Failed",
-            body=f"An error occurred while drafting the email: {e}",
-            applicant_name=applicant_name,
-            applicant_phone=applicant_phone,
-            applicant_email=applicant_email,
-            closing="Regards," # Placeholder
-        )
+        print(f"Error in write_email: {e}")
+        return _email_generation_error(e, applicant_name, applicant_phone, applicant_email)
 
+async def awrite_email(user_request: str,
+    applicant_name: str,
+    applicant_phone: str,
+    applicant_email: str) -> EmailContent:
+    print("INSIDE EMAIL WRITER (async)")
+    try:
+        return await email_writer_chain.ainvoke(_writer_inputs(user_request, applicant_name, applicant_phone, applicant_email), config=_NOSTREAM)
+    except Exception as e:
+        print(f"Error in write_email: {e}")
+        return _email_generation_error(e, applicant_name, applicant_phone, applicant_email)
+
+def _writer_inputs(user_request, applicant_name, applicant_phone, applicant_email):
+    return {
+        'user_request': user_request,
+        'applicant_name': applicant_name,
+        'applicant_phone': applicant_phone,
+        'applicant_email': applicant_email
+    }
+
+_GENERATION_ERROR_SUBJECT = "Error: Email Generation Failed"
 
+def _email_generation_error(e, applicant_name, applicant_phone, applicant_email):
+    # Return an EmailContent object with error details for consistent type
+    return EmailContent(
+        recipient_name="Recipient", # Placeholder
+        recipient_greeting="Dear Sir/Madam,", # Placeholder
+        subject=_GENERATION_ERROR_SUBJECT,
+        body=f"An error occurred while drafting the email: {e}",
+        applicant_name=applicant_name,
+        applicant_phone=applicant_phone,
+        applicant_email=applicant_email,
+        closing="Regards," # Placeholder
+    )
+
+def format_email_for_display(email_content: EmailContent) -> str:
+    """Formats an EmailContent object as a plain-text email, ready to copy into a mail client."""
+    signature = "\n".join(part for part in (email_content.applicant_name, email_content.applicant_phone, email_content.applicant_email)
+                          if part and part != "N/A")
+    return (f"Subject: {email_content.subject}\n\n{email_content.recipient_greeting}\n\n{email_content.body}\n\n"
+            f"{email_content.closing}\n{signature}").strip()
 
 
-@tool
-def review_email_tool(email_content: EmailContent) -> EmailReviewFeedback:
+def review_email(email_content: EmailContent) -> EmailReviewFeedback:
     """
     Reviews a structured email content object for professionalism and provides feedback.
 
     Args:
-        email_content (EmailContent): The structured email content generated by the EmailWriterAgent.
+        email_content (EmailContent): The structured email content generated by the email writer.
     """
-    print("INSIDE EMAIL REVIEWER TOOL")
+    print("INSIDE EMAIL REVIEWER")
     try:
-        review_chain = email_reviewer_prompt | _email_reviewer_llm | _email_reviewer_parser
-
-        # Pass all relevant fields from the EmailContent object to the prompt
-        review_feedback_obj = review_chain.invoke({
-            'recipient_name': email_content.recipient_name,
-            'recipient_greeting': email_content.recipient_greeting,
-            'subject': email_content.subject,
-            'body': email_content.body,
-            'closing': email_content.closing,
-            'applicant_name': email_content.applicant_name,
-            'applicant_email': email_content.applicant_email,
-            'applicant_phone': email_content.applicant_phone
-        })
-        return review_feedback_obj
+        return email_reviewer_chain.invoke(_review_inputs(email_content), config=_NOSTREAM)
     except Exception as e:
-        print(f"Error in review_email_tool: {e}")
-        # Return an EmailReviewFeedback object with error details for consistent type
-        return EmailReviewFeedback(
-            approved=False,
-            suggestions=f"An error occurred during email review: {e}",
-            revised_subject=email_content.subject, # Keep original
-            revised_body=email_content.body # Keep original
-        )
-    
-email_agent_prompt = """You are a dedicated Email Management Agent. Your task is to handle all email-related requests, including drafting and reviewing emails.
-You have access to `write_email_tool` and `review_email_tool`.
-Follow the workflow instructions precisely.
-
-**Here are your available tools:**
-1.  `write_email_tool(user_request: str, applicant_name: str, applicant_phone: str, applicant_email: str)`: Use this tool to draft a new email.
-    Provide the full email request and applicant details as input. This tool returns a structured EmailContent object.
-2.  `review_email_tool(email_content: EmailContent)`: Use this tool to review an existing structured email.
-    Provide the EmailContent object as input. This tool returns structured EmailReviewFeedback.
-
-**Workflow Instructions:**
--   **If the request is to draft an email:**
-    -   **Step A:** Use the `write_email_tool`. Extract `user_request`, `applicant_name`, `applicant_phone`, `applicant_email` from the request you received.
-    -   **Step B (Optional/Conditional):** After receiving the `EmailContent` object, if the user explicitly requested a review or if review is standard, use `review_email_tool` with the drafted `EmailContent` object.
-    -   **Step C: Final Output.** Present the output of the final tool (either `EmailContent` from writing or `EmailReviewFeedback` from reviewing) as your final response to the supervisor.
--   **If the request is to review an email:**
-    -   **Step A:** Extract the `EmailContent` object from the request (if the supervisor passes it in a structured way).
-    -   **Step B:** Use the `review_email_tool` with the `EmailContent` object.
-    -   **Step C: Final Output.** Present the `EmailReviewFeedback` object as your final response to the supervisor.
--   Do NOT add extra conversational text to your final output."""
+        print(f"Error in review_email: {e}")
+        return _email_review_error(e, email_content)
+
+async def areview_email(email_content: EmailContent) -> EmailReviewFeedback:
+    print("INSIDE EMAIL REVIEWER (async)")
+    try:
+        return await email_reviewer_chain.ainvoke(_review_inputs(email_content), config=_NOSTREAM)
+    except Exception as e:
+        print(f"Error in review_email: {e}")
+        return _email_review_error(e, email_content)
+
+def _review_inputs(email_content):
+    # Pass all relevant fields from the EmailContent object to the prompt
+    return {
+        'recipient_name': email_content.recipient_name,
+        'recipient_greeting': email_content.recipient_greeting,
+        'subject': email_content.subject,
+        'body': email_content.body,
+        'closing': email_content.closing,
+        'applicant_name': email_content.applicant_name,
+        'applicant_email': email_content.applicant_email,
+        'applicant_phone': email_content.applicant_phone
+    }
+
+def _email_review_error(e, email_content):
+    # Return an EmailReviewFeedback object with error details for consistent type
+    return EmailReviewFeedback(
+        approved=False,
+        suggestions=f"An error occurred during email review: {e}",
+        revised_subject=email_content.subject, # Keep original
+        revised_body=email_content.body # Keep original
+    )
+
+# ---------- Deterministic pipeline: (write | read) -> review -> (revise -> review)* -> return ----------
+# The EmailContent and EmailReviewFeedback objects pass between the steps in the graph state instead of being
+# re-typed by an agent model as tool arguments; the only model calls are the writer and reviewer chains.
+
+# Not given separately: the writer prompt takes the sender's details from the request itself, or keeps "N/A"
+_APPLICANT_FROM_REQUEST = "N/A"
+
+# A request to review an email the user pasted skips the writer: the pasted email goes straight to the reviewer
+_REVIEW_REQUEST = re.compile(r"\b(review|proofread|check|critique|improve|feedback)\b", re.IGNORECASE)
+_GREETING = re.compile(r"^(dear|hello|hi|hey|good (morning|afternoon|evening))\b", re.IGNORECASE)
+_CLOSING = re.compile(r"^((best|kind|warm)\s+)?(regards|sincerely|thanks|thank you|cheers|best|respectfully|yours)\b[\w ]{0,20},?$", re.IGNORECASE)
+_PHONE = re.compile(r"^\+?[\d\s().-]{7,}$")
+
+
+def parse_email_text(text):
+    """
+    The email pasted into a review request ("Please review this email: Subject: ... Dear ..."), as EmailContent,
+    or None when the request does not ask for a review or holds no recognizable email (a subject line or greeting).
+    """
+    lines = [line.strip() for line in text.split("\n\nContext from earlier steps:")[0].splitlines()]
+    subject_index = next((i for i, line in enumerate(lines) if line.lower().startswith("subject:")), None)
+    greeting_index = next((i for i, line in enumerate(lines) if _GREETING.match(line)), None)
+    starts = [i for i in (subject_index, greeting_index) if i is not None]
+    if not starts or not _REVIEW_REQUEST.search(" ".join(lines[:min(starts)])):
+        return None
+    body_start = greeting_index + 1 if greeting_index is not None else subject_index + 1
+    closing_index = next((i for i in range(len(lines) - 1, body_start - 1, -1) if _CLOSING.match(lines[i])), None)
+    body = "\n".join(lines[body_start:closing_index]).strip()
+    if not body:
+        return None
+    signature = []
+    for line in (lines[closing_index + 1:] if closing_index is not None else []):
+        if not line:
+            break
+        signature.append(line)
+    applicant_email = next((line for line in signature if "@" in line), "N/A")
+    applicant_phone = next((line for line in signature if _PHONE.match(line)), "N/A")
+    applicant_name = next((line for line in signature if line not in (applicant_email, applicant_phone)), "N/A")
+    return EmailContent(
+        recipient_name="N/A",
+        recipient_greeting=lines[greeting_index] if greeting_index is not None else "",
+        subject=lines[subject_index].split(":", 1)[1].strip() if subject_index is not None else "(no subject)",
+        body=body,
+        applicant_name=applicant_name,
+        applicant_phone=applicant_phone,
+        applicant_email=applicant_email,
+        closing=lines[closing_index] if closing_index is not None else "",
+    )
+
+class EmailPipelineState(MessagesState):
+    email: Optional[EmailContent]
+    review: Optional[EmailReviewFeedback]
+    revisions: int
+
+
+def _stream_email_draft(email_content, revision):
+    # Shown in the chat while the review runs; a no-op unless the graph is streamed with stream_mode "custom"
+    if _stream_draft:
+        get_stream_writer()({"email_draft": format_email_for_display(email_content), "revision": revision})
+
+
+def _route_request(state):
+    return "read_email" if parse_email_text(current_request(state["messages"])) is not None else "write_email"
+
+
+def _read_node(state):
+    return {"email": parse_email_text(current_request(state["messages"])), "review": None, "revisions": 0}
+
+
+def _after_write(state):
+    # A failed draft is returned as is; reviewing the error text would only produce a second error or a rewrite of it
+    return "finalize_email" if state["email"].subject == _GENERATION_ERROR_SUBJECT else "review_email"
+
+
+def _write_node(state):
+    email_content = write_email(current_request(state["messages"]), _APPLICANT_FROM_REQUEST, _APPLICANT_FROM_REQUEST, _APPLICANT_FROM_REQUEST)
+    _stream_email_draft(email_content, 0)
+    return {"email": email_content, "review": None, "revisions": 0}
+
+async def _awrite_node(state):
+    email_content = await awrite_email(current_request(state["messages"]), _APPLICANT_FROM_REQUEST, _APPLICANT_FROM_REQUEST, _APPLICANT_FROM_REQUEST)
+    _stream_email_draft(email_content, 0)
+    return {"email": email_content, "review": None, "revisions": 0}
+
+
+def _review_node(state):
+    return {"review": review_email(state["email"])}
+
+async def _areview_node(state):
+    return {"review": await areview_email(state["email"])}
+
+
+def _after_review(state):
+    """Stops as soon as the reviewer approves, proposes no change, or the revision cap is reached."""
+    email_content, review = state["email"], state["review"]
+    unchanged = (review.revised_subject or email_content.subject) == email_content.subject and (review.revised_body or email_content.body) == email_content.body
+    if review.approved or unchanged or state["revisions"] >= _max_revisions:
+        return "finalize_email"
+    return "revise_email"
+
+
+def _revise_node(state):
+    email_content, review = state["email"], state["review"]
+    revised = email_content.model_copy(update={"subject": review.revised_subject or email_content.subject,
+                                               "body": review.revised_body or email_content.body})
+    _stream_email_draft(revised, state["revisions"] + 1)
+    return {"email": revised, "revisions": state["revisions"] + 1}
+
+
+def _finalize_node(state):
+    email_content, review = state["email"], state.get("review")
+    text = format_email_for_display(email_content)
+    if review is None:
+        print("Email draft failed, returned without review")
+        return {"messages": [AIMessage(content=text, name="email_agent")]}
+    if not review.approved and review.suggestions and review.suggestions.strip().lower() != "none":
+        text += f"\n\n---\nReviewer notes: {review.suggestions}"
+    print(f"Email finished after {state['revisions']} revision(s), approved={review.approved}")
+    return {"messages": [AIMessage(content=text, name="email_agent")]}
+
 
 def create_email_agent():
     """
     Creates and returns the Email agent instance.
     This function should be called from yukta_nexus.py after init_email_agent().
     """
-    if _llm is None or _email_writer_llm is None or _email_reviewer_llm is None:
+    if _email_writer_llm is None or _email_reviewer_llm is None:
         raise ValueError("Email Agent LLM dependencies not initialized. Call init_email_agent() first.")
-    email_agent = create_react_agent(
-    model = _llm, 
-    tools=[write_email_tool, review_email_tool],
-    prompt=email_agent_prompt,
-    name = 'email_agent'
-    )
-    return email_agent
\ No newline at end of file
+    builder = StateGraph(EmailPipelineState)
+    builder.add_node("read_email", _read_node)
+    builder.add_node("write_email", RunnableLambda(_write_node, afunc=_awrite_node))
+    builder.add_node("review_email", RunnableLambda(_review_node, afunc=_areview_node))
+    builder.add_node("revise_email", _revise_node)
+    builder.add_node("finalize_email", _finalize_node)
+    builder.add_conditional_edges(START, _route_request, ["read_email", "write_email"])
+    builder.add_edge("read_email", "review_email")
+    builder.add_conditional_edges("write_email", _after_write, ["review_email", "finalize_email"])
+    builder.add_conditional_edges("review_email", _after_review, ["revise_email", "finalize_email"])
+    builder.add_edge("revise_email", "review_email")
+    builder.add_edge("finalize_email", END)
+    return builder.compile(name='email_agent')
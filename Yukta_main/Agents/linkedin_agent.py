@@ -5,8 +5,12 @@ from typing import List, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
-from langchain.tools import tool
-from langgraph.prebuilt import create_react_agent
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, MessagesState, START, END
+from Utils.runnable_registry import register_runnable
+from Utils.model_tiers import tiered_chain
+from Utils.history_manager import current_request
 
 class LinkedInPost(BaseModel):
     """
@@ -36,6 +40,8 @@ class LinkedInPost(BaseModel):
     )
 
 
+POST_CHAIN_MODEL_TIER = "heavy"
+
 _LinkedIn_llm = None
 _linkedin_parser = None
 linkedin_post_prompt = None
@@ -70,28 +76,40 @@ def init_linkedin_agent(LinkedIn_llm):
         partial_variables={'format_instructions': _linkedin_parser.get_format_instructions()}
     )
 
-    linkedin_post_chain = linkedin_post_prompt | _LinkedIn_llm | _linkedin_parser
+    linkedin_post_chain = register_runnable('linkedin.post_chain', tiered_chain(linkedin_post_prompt, _LinkedIn_llm, _linkedin_parser))
+
+# The raw JSON of the post is not shown to the user; the formatted post is streamed once it is ready
+_NOSTREAM = {"tags": ["nostream"]}
 
-@tool
 def generate_linkedin_post(user_input: str) -> LinkedInPost:
     """
     Generates a structured LinkedIn post based on user-provided content.
     """
-    print("\n--- INSIDE LINKEDIN POST GENERATOR TOOL ---")
+    print("\n--- INSIDE LINKEDIN POST GENERATOR ---")
     try:
-        generated_post = linkedin_post_chain.invoke({'user_input': user_input})
+        generated_post = linkedin_post_chain.invoke({'user_input': user_input}, config=_NOSTREAM)
         print("LinkedIn Post generated successfully.")
         return generated_post
     except Exception as e:
         print(f"Error generating LinkedIn post: {e}")
-        return LinkedInPost(
-            hook="Error generating post",
-            body_content=f"An error occurred during post generation: {e}",
-            hashtags=["Error"],
-            call_to_action="Please try again or rephrase your request."
-        )
-
-@tool
+        return _linkedin_post_error(e)
+
+async def agenerate_linkedin_post(user_input: str) -> LinkedInPost:
+    print("\n--- INSIDE LINKEDIN POST GENERATOR (async) ---")
+    try:
+        return await linkedin_post_chain.ainvoke({'user_input': user_input}, config=_NOSTREAM)
+    except Exception as e:
+        print(f"Error generating LinkedIn post: {e}")
+        return _linkedin_post_error(e)
+
+def _linkedin_post_error(e):
+    return LinkedInPost(
+        hook="Error generating post",
+        body_content=f"An error occurred during post generation: {e}",
+        hashtags=["Error"],
+        call_to_action="Please try again or rephrase your request."
+    )
+
 def format_linkedin_post_for_display(post_obj: LinkedInPost) -> str:
     """
     Formats a LinkedInPost Pydantic object into a human-readable string,
@@ -119,26 +137,30 @@ def format_linkedin_post_for_display(post_obj: LinkedInPost) -> str:
 
     return formatted_post.strip()
 
-linkedin_agent_prompt = """You are a specialized LinkedIn Post Creation and Formatting Agent.
-Your primary goal is to generate engaging LinkedIn posts and present them in a perfectly formatted, human-readable string.
-You will receive a request that details what kind of LinkedIn post needs to be created.
-Follow the workflow instructions precisely.
+# ---------- Deterministic pipeline: generate -> format -> return ----------
+# Formatting needs no model judgment, so the agent is a fixed graph instead of a ReAct loop: one LLM call (the post
+# chain) per request instead of three (decide to generate, decide to format, echo the formatted post).
+
+class LinkedInPipelineState(MessagesState):
+    post: Optional[LinkedInPost]
+
+
+def _generate_post_node(state):
+    return {"post": generate_linkedin_post(current_request(state["messages"]))}
 
-**Here are your available tools:**
-1.  `generate_linkedin_post_tool(user_input: str)`: Use this tool first when you need to create a LinkedIn post. Provide the user's detailed request as input to this tool. This tool will return a structured LinkedInPost object.
-2.  `format_linkedin_post_for_display_tool(post_obj: LinkedInPost)`: Use this tool *immediately after* `generate_linkedin_post_tool` has successfully returned a LinkedInPost object. Provide the LinkedInPost object (the output from `generate_linkedin_post_tool`) as input to this tool. This tool will return the final, nicely formatted string for the post.
+async def _agenerate_post_node(state):
+    return {"post": await agenerate_linkedin_post(current_request(state["messages"]))}
+
+
+def _format_post_node(state):
+    return {"messages": [AIMessage(content=format_linkedin_post_for_display(state["post"]), name="linkedin_agent")]}
 
-**Workflow Instructions:**
--   **Step 1: Generate Post.** Begin by extracting the core request for the LinkedIn post from the request you received. Then, use the `generate_linkedin_post_tool` with that extracted request.
--   **Step 2: Format Post.** Once you receive the structured LinkedInPost object from `generate_linkedin_post_tool` (which will appear as a tool output in your scratchpad), immediately use the `format_linkedin_post_for_display_tool` with that object as input.
--   **Step 3: Present Final Result.** After the `format_linkedin_post_for_display_tool` returns the formatted string, your task is complete. Present this formatted string as your final answer to the supervisor.
--   Do NOT include any additional conversational text or explanations in your final output, ONLY the formatted LinkedIn post string."""
 
 def create_linkedin_agent():
-    linkedin_agent = create_react_agent(
-    model = _LinkedIn_llm,
-    tools = [generate_linkedin_post, format_linkedin_post_for_display],
-    prompt = linkedin_agent_prompt,
-    name= 'linkedin_agent'
-    )
-    return linkedin_agent
+    builder = StateGraph(LinkedInPipelineState)
+    builder.add_node("generate_post", RunnableLambda(_generate_post_node, afunc=_agenerate_post_node))
+    builder.add_node("format_post", _format_post_node)
+    builder.add_edge(START, "generate_post")
+    builder.add_edge("generate_post", "format_post")
+    builder.add_edge("format_post", END)
+    return builder.compile(name='linkedin_agent')
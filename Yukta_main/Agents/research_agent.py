@@ -2,25 +2,78 @@ import os
 from dotenv import load_dotenv
 from langchain_tavily import TavilySearch
 from langchain_openai import ChatOpenAI
+from langchain.tools import tool
+from langchain_core.tools import ToolException
 from langgraph.prebuilt import create_react_agent
 
+from Utils.admission import Overloaded, downstream_slot, adownstream_slot
+
 load_dotenv()
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+MODEL_TIER = "heavy" # Synthesizes the answer from the search results
+
 _research_llm = None
-web_search_tool = None
+_tavily_search = None
+_search_cache = None
+_history_hook = None
 
-def init_research_agent(research_llm, tavily_API_KEY):
-    global TAVILY_API_KEY, _research_llm, web_search_tool
+def init_research_agent(research_llm, tavily_API_KEY, history_hook=None, search_cache=None):
+    global TAVILY_API_KEY, _research_llm, _tavily_search, _search_cache, _history_hook
     _research_llm = research_llm
+    _history_hook = history_hook
+    _search_cache = search_cache
     TAVILY_API_KEY = tavily_API_KEY
-    web_search_tool = TavilySearch(
+    _tavily_search = TavilySearch(
         max_results=5,
         topic="general",
         search_depth="advanced",
         api_key=TAVILY_API_KEY
     )
 
+# Part of the cache key, so results of a differently configured search are never mixed up
+_SEARCH_VARIANT = "tavily:advanced:5"
+
+def get_search_cache_stats():
+    return _search_cache.stats() if _search_cache is not None else None
+
+
+def _checked(query, result):
+    # TavilySearch returns {"error": e} for HTTP, network and key errors instead of raising; raising keeps it out of the cache
+    if isinstance(result, dict) and "error" in result:
+        raise ToolException(f"Web search for '{query}' failed: {result['error']}")
+    return result
+
+def _tavily(query):
+    with downstream_slot("tavily"): # Only real Tavily calls take one of its slots, cache hits don't
+        return _checked(query, _tavily_search.invoke({"query": query}))
+
+async def _atavily(query):
+    async with adownstream_slot("tavily"):
+        return _checked(query, await _tavily_search.ainvoke({"query": query}))
+
+
+@tool
+def web_search_tool(query: str):
+    """Searches the public web for general knowledge, current events and factual information. Input is a concise search query."""
+    try:
+        if _search_cache is None:
+            return _tavily(query)
+        # Repeated and concurrent identical queries are answered by one Tavily call
+        return _search_cache.get_or_fetch(query, _tavily, variant=_SEARCH_VARIANT)
+    except Overloaded as e:
+        return str(e)
+
+async def _aweb_search_tool(query: str):
+    try:
+        if _search_cache is None:
+            return await _atavily(query)
+        return await _search_cache.aget_or_fetch(query, _atavily, variant=_SEARCH_VARIANT)
+    except Overloaded as e:
+        return str(e)
+
+web_search_tool.coroutine = _aweb_search_tool
+
 
 research_agent_prompt = """You are a dedicated research agent.
 Your primary goal is to assist with research-related tasks by searching the public web using Tavily.
@@ -43,6 +96,7 @@ def create_research_agent():
     model=_research_llm,
     tools=[web_search_tool],
     prompt=research_agent_prompt,
+    pre_model_hook=_history_hook,
     name="research_agent",
     )
     return research_agent
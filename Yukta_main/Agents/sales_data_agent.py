@@ -1,65 +1,234 @@
-import os
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import SQLDatabaseToolkit
 from langgraph.prebuilt import create_react_agent
+from sqlalchemy import create_engine
 import pandas as pd
-import matplotlib.pyplot as plt
+import asyncio
 import io
-from datetime import datetime
+from Utils.runnable_registry import register_runnable
+from Utils.sql_cache import SalesQueryCache, table_change_marker, strip_sql
+from Utils.schema_cache import SchemaSnapshotCache
+from Utils.result_store import ResultStore
+from Utils.chart_renderer import ChartRenderer
+from Utils.startup import LazyResource
+from Utils.admission import downstream_slot
+from Utils.sql_guard import SQLGuard, QueryRejected
+
+MODEL_TIER = "heavy" # Writes SQL and analyses the results
+# The SQL agent runs inside get_data_from_sales and its answer is relayed by the agent; its tokens are not streamed
+_NOSTREAM = {"tags": ["nostream"]}
 
 _sales_llm = None
 DATABASE_URI = None
-db_engine = None
+_sql_backend = None
+db_engine = None # The SQLDatabase the toolkit uses
+sql_engine = None # Its SQLAlchemy engine, for the queries the agent runs itself
 sql_agent_executor = None
+_query_cache = None
+_schema_cache = None
+_result_store = None
+_chart_renderer = None
+_history_hook = None
+_sql_guard = None
 
-def init_sales_data_agent(sales_llm, db_uri):
-    global _sales_llm, DATABASE_URI, db_engine, sql_agent_executor
+def init_sales_data_agent(sales_llm, db_uri, query_cache=None, schema_cache=None, result_store=None, chart_renderer=None, history_hook=None, startup_report=None, sql_guard=None):
+    """
+    Sets up the caches and returns the lazy SQL backend. The database connection, the 'sales' schema snapshot and the
+    SQL agent executor are only built on the first query, so a slow or unreachable database does not hold up startup.
+    Every statement the agent runs goes through sql_guard (read-only check, row cap, EXPLAIN cost limit, timeout).
+    """
+    global _sales_llm, DATABASE_URI, _sql_backend, _query_cache, _schema_cache, _result_store, _chart_renderer, _history_hook, _sql_guard
     _sales_llm = sales_llm
+    _chart_renderer = chart_renderer if chart_renderer is not None else ChartRenderer()
+    _history_hook = history_hook
     DATABASE_URI = db_uri 
+    _schema_cache = schema_cache if schema_cache is not None else SchemaSnapshotCache(DATABASE_URI)
+    _query_cache = query_cache if query_cache is not None else SalesQueryCache()
+    _result_store = result_store if result_store is not None else ResultStore()
+    _sql_guard = sql_guard if sql_guard is not None else SQLGuard(max_rows=_result_store.max_rows)
+    if _query_cache.marker_fn is None:
+        _query_cache.marker_fn = table_change_marker(lambda sql: _database().run(sql, fetch="all"))
+    if _schema_cache.on_change is None:
+        _schema_cache.on_change = _on_schema_change
+    _sql_backend = LazyResource("sales_sql", _connect_sql_agent, startup_report)
+    return _sql_backend
+
+
+def _connect_sql_agent():
+    global db_engine, sql_engine, sql_agent_executor
+    connection = create_engine(DATABASE_URI)
+    # Lazy reflection: tables are only reflected when a schema snapshot actually has to be rebuilt
+    engine = SQLDatabase(connection, lazy_table_reflection=True)
+    sql_toolkit = SQLDatabaseToolkit(db = engine, llm = _sales_llm)
+    # Swap the toolkit's sql_db_query and sql_db_schema for cached versions (same names, descriptions and args)
+    cached_tools = {"sql_db_query": _cached_query_tool, "sql_db_schema": _cached_schema_tool}
+    all_sql_tools = [cached_tools[t.name](t) if t.name in cached_tools else t for t in sql_toolkit.get_tools()]
+    sales_agent_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system",
+            """You are an expert SQL assistant. Your goal is to translate user questions into accurate PostgreSQL queries and execute them using the provided tools.
+            You have access to the 'sales' table.
+            **Schema for the 'sales' table:**
+            {table_info}
+
+            When generating a SQL query, ensure it is correct PostgreSQL syntax and ONLY uses `SELECT` statements.
+            DO NOT generate `INSERT`, `UPDATE`, `DELETE`, `DROP`, or any other data-modifying queries.
+            For charting requests, generate queries that aggregate data and alias aggregated columns clearly (e.g., SUM(total_sale) AS total_sales).
+            `sql_db_query` returns a `result_id` handle, the row count, the column names and a preview of the rows.
+            Answer from the preview and do NOT copy large row sets into your answer; the result_id is passed on automatically.
+
+            You have the following tools available:
+            - `sql_db_query(query: str)`: Execute a SQL query against the database.
+            - `sql_db_schema(table_names: List[str])`: Get the schema of specified tables.
+            - `sql_db_query_checker(query: str)`: Check if a SQL query is syntactically correct and safe to run.
+
+            Always use `sql_db_query_checker` BEFORE `sql_db_query`.
+            The 'sales' schema above is current, so only call `sql_db_schema` for other tables.
+            """
+            ),
+            MessagesPlaceholder(variable_name="messages"), # <--- IMPORTANT: For conversation history
+            MessagesPlaceholder(variable_name="agent_scratchpad"), # <--- IMPORTANT: For ReAct thoughts/actions
+        ]
+    ).partial(table_info=lambda: _schema_cache.get_table_info(engine, ['sales'])) # Read per call, so a schema change reaches the prompt
+    executor = AgentExecutor(
+        agent=create_tool_calling_agent(_sales_llm, all_sql_tools, sales_agent_prompt),
+        tools=all_sql_tools,
+        verbose=True,
+        handle_parsing_errors=True,
+        return_intermediate_steps=True # Needed to capture the validated SQL for the question -> SQL cache
+    )
+    db_engine, sql_engine, sql_agent_executor = engine, connection, executor
+    print("SQL Agent Executor initialized successfully.")
+    return register_runnable('sales.sql_agent_executor', executor)
+
+
+def _database():
+    """The SQLDatabase, connecting on first use."""
+    _sql_backend.get()
+    return db_engine
+
+
+def _sql_engine():
+    """The SQLAlchemy engine, connecting on first use."""
+    _sql_backend.get()
+    return sql_engine
+
+
+def _execute_to_frame(sql):
+    """
+    Runs sql through the SQL guard and materializes at most _result_store.max_rows rows. The rows are read through a
+    server-side cursor (stream_results), so a driver like psycopg2 does not buffer the whole result client-side.
+    Returns (DataFrame, total row count, truncated); the count is None when counting a truncated result was rejected.
+    Raises QueryRejected when the guard refuses the query.
+    """
+    max_rows = _result_store.max_rows
+    with downstream_slot("postgres"), _sql_engine().connect() as conn:
+        guarded_sql = _sql_guard.prepare(conn, sql)
+        with _sql_guard.execution_limits(conn):
+            result = conn.execution_options(stream_results=True).exec_driver_sql(guarded_sql)
+            columns = list(result.keys())
+            rows = result.fetchmany(max_rows + 1)
+            result.close() # Closes the server-side cursor before the row count runs on the same connection
+        if len(rows) <= max_rows:
+            return pd.DataFrame(rows, columns=columns), len(rows), False
+        _sql_guard.record_truncation()
+        try:
+            count_sql = _sql_guard.prepare(conn, f"SELECT COUNT(*) FROM (\n{strip_sql(sql)}\n) AS counted", limit=False)
+            with _sql_guard.execution_limits(conn):
+                row_count = conn.exec_driver_sql(count_sql).scalar()
+        except QueryRejected:
+            row_count = None # Too expensive to count; the preview says "more than max_rows rows"
+    return pd.DataFrame(rows[:max_rows], columns=columns), row_count, True
+
+
+def run_sales_query(query: str) -> str:
+    """
+    Executes a SQL query against the sales database and stores the rows in the result store.
+    Returns a result_id handle with a preview. Repeated queries are served from the result cache.
+    """
+    if _query_cache is not None:
+        cached_id = _query_cache.get_result(query)
+        if cached_id is not None and _result_store.get(cached_id) is not None:
+            print("--- SQL result cache hit ---")
+            return _result_store.describe(cached_id)
     try:
-        db_engine = SQLDatabase.from_uri(DATABASE_URI)
-        sql_toolkit = SQLDatabaseToolkit(db = db_engine, llm = _sales_llm)
-        all_sql_tools = sql_toolkit.get_tools()
-        sales_agent_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system",
-                """You are an expert SQL assistant. Your goal is to translate user questions into accurate PostgreSQL queries and execute them using the provided tools.
-                You have access to the 'sales' table.
-                **Schema for the 'sales' table:**
-                {table_info}
-
-                When generating a SQL query, ensure it is correct PostgreSQL syntax and ONLY uses `SELECT` statements.
-                DO NOT generate `INSERT`, `UPDATE`, `DELETE`, `DROP`, or any other data-modifying queries.
-                For charting requests, generate queries that aggregate data and alias aggregated columns clearly (e.g., SUM(total_sale) AS total_sales).
-                Always return the raw data result from the database query.
-
-                You have the following tools available:
-                - `sql_db_query(query: str)`: Execute a SQL query against the database.
-                - `sql_db_schema(table_names: List[str])`: Get the schema of specified tables.
-                - `sql_db_query_checker(query: str)`: Check if a SQL query is syntactically correct and safe to run.
-
-                Always use `sql_db_query_checker` BEFORE `sql_db_query`.
-                """
-                ),
-                MessagesPlaceholder(variable_name="messages"), # <--- IMPORTANT: For conversation history
-                MessagesPlaceholder(variable_name="agent_scratchpad"), # <--- IMPORTANT: For ReAct thoughts/actions
-            ]
-        ).partial(table_info=db_engine.get_table_info(table_names=['sales']))
-        sql_agent_executor = AgentExecutor(
-            agent=create_tool_calling_agent(_sales_llm, all_sql_tools, sales_agent_prompt),
-            tools=all_sql_tools,
-            verbose=True,
-            handle_parsing_errors=True 
-        )
-        print("SQL Agent Executor initialized successfully.")
+        df, row_count, truncated = _execute_to_frame(query)
+    except QueryRejected as e:
+        print(f"--- SQL guard rejected query ({e.reason}) ---")
+        return str(e)
     except Exception as e:
-        print(f"Error initializing SQL Agent components: {e}")
-        db_engine = None
-        sql_agent_executor = None
+        return f"Error: {e}"
+    result_id = _result_store.put(strip_sql(query), df, row_count, truncated)
+    if _query_cache is not None:
+        _query_cache.put_result(query, result_id)
+    return _result_store.describe(result_id)
+
+
+def _cached_query_tool(original_tool):
+    return StructuredTool.from_function(
+        func=run_sales_query,
+        name=original_tool.name,
+        description=original_tool.description,
+    )
+
+
+def _cached_schema_tool(original_tool):
+    def get_schema(table_names: str) -> str:
+        try:
+            return _schema_cache.get_table_info(_database(), table_names.split(","))
+        except Exception as e:
+            return f"Error: {e}"
+
+    return StructuredTool.from_function(
+        func=get_schema,
+        name=original_tool.name,
+        description=original_tool.description,
+        args_schema=original_tool.args_schema,
+    )
+
+
+def refresh_sales_schema(table_names=None):
+    """Explicitly re-introspects the schema snapshot, e.g. after a migration (POST /admin/sales-schema/refresh)."""
+    if _sql_backend is None or _schema_cache is None:
+        return "SQL data retrieval system not initialized."
+    return _schema_cache.refresh(_database(), table_names or ['sales'])
+
+
+def _on_schema_change(table_names):
+    print(f"--- Schema of {', '.join(table_names)} changed: clearing the question -> SQL cache ---")
+    if _query_cache is not None:
+        _query_cache.invalidate_sql() # SQL written against the old schema may no longer run
+
+
+def _check_sales_schema():
+    """Re-checks the 'sales' fingerprint (at most every verify_interval), so a change clears the cached SQL before it is reused."""
+    _schema_cache.get_table_info(_database(), ['sales'])
+
+
+def _last_successful_query(intermediate_steps):
+    """
+    Returns (sql, observation) of the last sql_db_query call that did not error, from AgentExecutor intermediate
+    steps, or (None, None).
+    """
+    for action, observation in reversed(intermediate_steps or []):
+        if action.tool != "sql_db_query" or str(observation).startswith("Error"):
+            continue
+        tool_input = action.tool_input
+        return (tool_input.get("query") if isinstance(tool_input, dict) else tool_input), observation
+    return None, None
+
+
+def get_sales_cache_stats():
+    return _query_cache.stats() if _query_cache is not None else {}
+
+
+def get_sql_guard_stats():
+    return _sql_guard.stats() if _sql_guard is not None else {}
 
 
 
@@ -70,112 +239,209 @@ def get_data_from_sales(question: str) -> str:
     Ensures queries are safe and read-only.
     """
     print("\n--- INVOCATION OF GET_DATA_FROM_SALES TOOL ---")
-    if sql_agent_executor is None:
+    if _sql_backend is None:
         return "SQL data retrieval system not initialized due to a configuration error."
+    try:
+        executor = _sql_backend.get()
+    except Exception as e:
+        print(f"Error initializing SQL Agent components: {e}")
+        return f"SQL data retrieval system could not connect to the database: {e}"
 
     try:
+        _check_sales_schema()
+        # Level 1 cache: a question we have already answered reuses its validated SQL and skips the LLM steps
+        cached_sql = _query_cache.get_sql(question) if _query_cache is not None else None
+        if cached_sql:
+            result = run_sales_query(cached_sql)
+            if not str(result).startswith("Error"):
+                print(f"--- SQL cache hit for question, reusing: {cached_sql} ---")
+                return f"Query: {cached_sql}\n{result}"
+
         # Pass the user's question to the SQL agent executor
         # Use messages format as per ChatPromptTemplate recommendation
-        response = sql_agent_executor.invoke({"messages": [HumanMessage(content=question)]})
-
-        # The response structure from AgentExecutor.invoke() varies.
-        # It usually returns a dictionary with 'output' or 'messages'.
-        # We want the final AI message content.
-        if "output" in response and response["output"]:
-            return response["output"]
-        elif "messages" in response and response["messages"]:
-            # Look for the last AI message which should contain the answer
-            for msg in reversed(response["messages"]):
-                if isinstance(msg, AIMessage) and msg.content.strip():
-                    return msg.content
-                elif isinstance(msg, ToolMessage) and msg.name == "sql_db_query":
-                    # If the last thing was a tool execution, return its content
-                    return msg.content
-            return "SQL Agent executed but no clear output message found."
-        else:
-            return "SQL Agent executed but returned an unexpected response format."
+        response = executor.invoke({"messages": [HumanMessage(content=question)]}, config=_NOSTREAM)
+        return _sql_agent_answer(question, response)
 
     except Exception as e:
         return f"An error occurred during SQL query generation or execution: {e}"
+
+async def _aget_data_from_sales(question: str) -> str:
+    """Async variant of get_data_from_sales: the SQL agent's LLM calls are awaited, DB access runs on worker threads."""
+    print("\n--- INVOCATION OF GET_DATA_FROM_SALES TOOL (async) ---")
+    if _sql_backend is None:
+        return "SQL data retrieval system not initialized due to a configuration error."
+    try:
+        executor = await _sql_backend.aget()
+    except Exception as e:
+        print(f"Error initializing SQL Agent components: {e}")
+        return f"SQL data retrieval system could not connect to the database: {e}"
+
+    try:
+        await asyncio.to_thread(_check_sales_schema)
+        cached_sql = _query_cache.get_sql(question) if _query_cache is not None else None
+        if cached_sql:
+            result = await asyncio.to_thread(run_sales_query, cached_sql)
+            if not str(result).startswith("Error"):
+                print(f"--- SQL cache hit for question, reusing: {cached_sql} ---")
+                return f"Query: {cached_sql}\n{result}"
+
+        response = await executor.ainvoke({"messages": [HumanMessage(content=question)]}, config=_NOSTREAM)
+        return _sql_agent_answer(question, response)
+
+    except Exception as e:
+        return f"An error occurred during SQL query generation or execution: {e}"
+
+get_data_from_sales.coroutine = _aget_data_from_sales
+
+def _sql_agent_answer(question, response):
+    """Caches the validated SQL for the question and extracts the answer from an AgentExecutor response."""
+    validated_sql, query_result = _last_successful_query(response.get("intermediate_steps"))
+    if validated_sql and _query_cache is not None:
+        _query_cache.put_sql(question, validated_sql)
+
+    # The response structure from AgentExecutor.invoke() varies.
+    # It usually returns a dictionary with 'output' or 'messages'.
+    # We want the final AI message content, plus the result handle so charts never need the rows re-sent.
+    if "output" in response and response["output"]:
+        if query_result:
+            return f"{response['output']}\n\nQuery: {validated_sql}\n{query_result}"
+        return response["output"]
+    elif "messages" in response and response["messages"]:
+        # Look for the last AI message which should contain the answer
+        for msg in reversed(response["messages"]):
+            if isinstance(msg, AIMessage) and msg.content.strip():
+                return msg.content
+            elif isinstance(msg, ToolMessage) and msg.name == "sql_db_query":
+                # If the last thing was a tool execution, return its content
+                return msg.content
+        return "SQL Agent executed but no clear output message found."
+    else:
+        return "SQL Agent executed but returned an unexpected response format."
     
+def _aggregate_stored_result(result_id, group_by_column, value_column):
+    """
+    Pushes the chart aggregation into SQL over the stored query, so it covers every row of the result
+    (not just the materialized ones) and only one row per group comes back. Returns a Series or an error string.
+    """
+    entry = _result_store.get(result_id) if _result_store is not None else None
+    if entry is None:
+        return f"Error: unknown or expired result_id '{result_id}'. Re-run get_data_from_sales to get a fresh one."
+    if group_by_column not in entry["columns"]:
+        return f"Error: Grouping column '{group_by_column}' not found in data columns: {entry['columns']}."
+    if value_column not in entry["columns"]:
+        return f"Error: Value column '{value_column}' not found in data columns: {entry['columns']}."
+
+    engine = _sql_engine()
+    quote = engine.dialect.identifier_preparer.quote
+    group_sql, value_sql = quote(group_by_column), quote(value_column)
+    aggregate_sql = (f"SELECT {group_sql}, SUM({value_sql}) FROM (\n{entry['sql']}\n) AS stored_result "
+                     f"WHERE {value_sql} IS NOT NULL GROUP BY {group_sql} ORDER BY 2 DESC")
+    with downstream_slot("postgres"), engine.connect() as conn:
+        try:
+            guarded_sql = _sql_guard.prepare(conn, aggregate_sql)
+            with _sql_guard.execution_limits(conn):
+                rows = conn.exec_driver_sql(guarded_sql).fetchall()
+        except QueryRejected as e:
+            return str(e)
+    chart_data = pd.to_numeric(pd.Series([row[1] for row in rows], index=[row[0] for row in rows], name=value_column), errors='coerce').dropna()
+    chart_data.index.name = group_by_column
+    if chart_data.empty:
+        return "Error: No valid numeric data found for charting after processing."
+    return chart_data
+
+
 @tool
-def generate_chart_tool(data_csv: str, chart_type: str, title: str = "Sales Data Chart",
+def generate_chart_tool(chart_type: str, result_id: str = None, data_csv: str = None, title: str = "Sales Data Chart",
                         x_label: str = None, y_label: str = None,
                         group_by_column: str = None, value_column: str = None) -> str:
     """
-    Generates a chart (bar or pie) from data provided as a CSV string.
+    Generates a chart (bar or pie) from a stored sales query result (preferred) or from data provided as a CSV string.
     This tool is designed to visualize aggregated sales data.
 
-    The 'data_csv' input *must* be a string containing comma-separated values, including a header row.
-    If 'group_by_column' and 'value_column' are provided, the data will be grouped by 'group_by_column'
-    and the sum of 'value_column' will be used for the chart. These column names MUST exactly match
-    the column names in the provided 'data_csv' (e.g., if your SQL returns 'category' and 'sum', use those).
+    Pass the 'result_id' returned by get_data_from_sales: the rows never travel through the conversation and the
+    grouping/summing is done by the database, so it works on results of any size. Only fall back to 'data_csv'
+    (a comma-separated string including a header row) when no result_id is available.
+    The data will be grouped by 'group_by_column' and the sum of 'value_column' will be used for the chart.
+    These column names MUST exactly match the column names of the result (e.g., if your SQL returns 'category' and 'sum', use those).
 
     Args:
-        data_csv (str): The data in CSV string format. Example: "category,total_sales\nElectronics,1500\nAccessories,500"
         chart_type (str): The type of chart to generate. Must be 'bar' or 'pie'.
+        result_id (str, optional): Handle of a stored query result, e.g. "res_1a2b3c4d5e".
+        data_csv (str, optional): Fallback data in CSV string format. Example: "category,total_sales\nElectronics,1500\nAccessories,500"
         title (str, optional): The main title of the chart. Defaults to "Sales Data Chart".
         x_label (str, optional): Label for the X-axis (for bar charts).
         y_label (str, optional): Label for the Y-axis (for bar charts).
-        group_by_column (str, optional): The column name from 'data_csv' to group by. Required for bar/pie charts.
-        value_column (str, optional): The column name from 'data_csv' that contains the numeric values to plot. Required for bar/pie charts.
+        group_by_column (str, optional): The column name of the result to group by. Required for bar/pie charts.
+        value_column (str, optional): The column name of the result that contains the numeric values to plot. Required for bar/pie charts.
     Returns:
-        str: File path to the generated chart image (e.g., "charts/bar_chart_20250621_143000.png"), or an error message.
+        str: File path to the generated chart image (e.g., "charts/bar_chart_3f9a1c0d2b7e4a6f8c1d2e3f.png"), or an error message.
     """
     try:
+        chart_data = _prepare_chart_data(chart_type, result_id, data_csv, group_by_column, value_column)
+        if isinstance(chart_data, str):
+            return chart_data
+
+        # Rendered headless in the renderer's process pool; identical charts are served from its cache
+        chart_filename = _chart_renderer.render(chart_data, chart_type, title, x_label, y_label)
+
+        return f"Chart generated successfully: {chart_filename}"
+
+    except Exception as e:
+        return f"An error occurred while generating the chart: {e}"
+
+async def _agenerate_chart_tool(chart_type: str, result_id: str = None, data_csv: str = None, title: str = "Sales Data Chart",
+                                x_label: str = None, y_label: str = None,
+                                group_by_column: str = None, value_column: str = None) -> str:
+    try:
+        chart_data = await asyncio.to_thread(_prepare_chart_data, chart_type, result_id, data_csv, group_by_column, value_column)
+        if isinstance(chart_data, str):
+            return chart_data
+        chart_filename = await _chart_renderer.arender(chart_data, chart_type, title, x_label, y_label)
+        return f"Chart generated successfully: {chart_filename}"
+    except Exception as e:
+        return f"An error occurred while generating the chart: {e}"
+
+generate_chart_tool.coroutine = _agenerate_chart_tool
+
+def _prepare_chart_data(chart_type, result_id, data_csv, group_by_column, value_column):
+    """Validates the chart request and returns the aggregated Series to plot, or an error string."""
+    if not (group_by_column and value_column):
+        return "Error: Both 'group_by_column' and 'value_column' must be provided for bar/pie charts. Ensure the LLM provides these."
+    group_by_column = group_by_column.strip()
+    value_column = value_column.strip()
+
+    if result_id:
+        print(f"\n--- generate_chart_tool aggregating stored result {result_id} in SQL ---")
+        chart_data = _aggregate_stored_result(result_id.strip(), group_by_column, value_column)
+        if isinstance(chart_data, str):
+            return chart_data
+    elif data_csv:
         print(f"\n--- DEBUG: generate_chart_tool received data_csv (first 500 chars) ---\n{data_csv[:500]}...\n-----------------------------------------------\n")
 
         df = pd.read_csv(io.StringIO(data_csv))
         df.columns = df.columns.str.strip() # Strip whitespace from column names
 
-        if group_by_column and value_column:
-            group_by_column = group_by_column.strip()
-            value_column = value_column.strip()
-
-            if group_by_column not in df.columns:
-                return f"Error: Grouping column '{group_by_column}' not found in data columns: {df.columns.tolist()}."
-            if value_column not in df.columns:
-                return f"Error: Value column '{value_column}' not found in data columns: {df.columns.tolist()}."
-
-            df[value_column] = pd.to_numeric(df[value_column], errors='coerce')
-            df.dropna(subset=[value_column], inplace=True)
-
-            if df.empty:
-                return "Error: No valid numeric data found for charting after processing."
-
-            chart_data = df.groupby(group_by_column)[value_column].sum().sort_values(ascending=False)
-        else:
-            return "Error: Both 'group_by_column' and 'value_column' must be provided for bar/pie charts. Ensure the LLM provides these."
-
-        plt.figure(figsize=(10, 6))
-
-        if chart_type == 'bar':
-            chart_data.plot(kind='bar', color='skyblue')
-            plt.title(title)
-            if x_label: plt.xlabel(x_label)
-            if y_label: plt.ylabel(y_label)
-            plt.xticks(rotation=45, ha='right')
-        elif chart_type == 'pie':
-            if chart_data.sum() == 0:
-                return "Error: Cannot generate pie chart. All values are zero or missing after aggregation."
-            chart_data.plot(kind='pie', autopct='%1.1f%%', startangle=90, cmap='Pastel1')
-            plt.title(title)
-            plt.ylabel('')
-        else:
-            return "Error: Unsupported chart type. Choose 'bar' or 'pie'."
-
-        plt.tight_layout()
-        charts_dir = "charts"
-        os.makedirs(charts_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        chart_filename = f"{charts_dir}/{chart_type}_chart_{timestamp}.png"
-        plt.savefig(chart_filename)
-        plt.close()
+        if group_by_column not in df.columns:
+            return f"Error: Grouping column '{group_by_column}' not found in data columns: {df.columns.tolist()}."
+        if value_column not in df.columns:
+            return f"Error: Value column '{value_column}' not found in data columns: {df.columns.tolist()}."
 
-        return f"Chart generated successfully: {chart_filename}"
+        df[value_column] = pd.to_numeric(df[value_column], errors='coerce')
+        df.dropna(subset=[value_column], inplace=True)
 
-    except Exception as e:
-        return f"An error occurred while generating the chart: {e}"
+        if df.empty:
+            return "Error: No valid numeric data found for charting after processing."
+
+        chart_data = df.groupby(group_by_column)[value_column].sum().sort_values(ascending=False)
+    else:
+        return "Error: Provide either 'result_id' (from get_data_from_sales) or 'data_csv'."
+
+    if chart_type == 'pie':
+        if chart_data.sum() == 0:
+            return "Error: Cannot generate pie chart. All values are zero or missing after aggregation."
+    elif chart_type != 'bar':
+        return "Error: Unsupported chart type. Choose 'bar' or 'pie'."
+    return chart_data
     
 sales_data_agent_prompt = """You are a specialized Sales Data Analyst Agent.
         Your goal is to answer questions about sales data and generate visualizations when explicitly requested.
@@ -183,17 +449,18 @@ sales_data_agent_prompt = """You are a specialized Sales Data Analyst Agent.
 
         **Here are your available tools:**
         1.  `get_data_from_sales_tool(question: str)`: Use this tool to query the PostgreSQL database for sales data.
-            The input to this tool is the user's specific question about sales. It returns raw data (e.g., CSV string).
+            The input to this tool is the user's specific question about sales. It returns a `result_id` handle, the row count, the column names and a CSV preview of the rows.
             *Important*: If the user asks for a chart, ensure your input to this tool (the 'question') results in aggregated data suitable for charting (e.g., "get total sales by category", "sum of sales per region").
-        2.  `generate_chart_tool(data_csv: str, chart_type: str, title: str, x_label: str, y_label: str, group_by_column: str, value_column: str)`: Use this tool to create a bar or pie chart.
-            It requires `data_csv` (from `get_data_from_sales_tool`), `chart_type`, `title`, `x_label`, `y_label`, `group_by_column`, and `value_column`.
-            You MUST infer `chart_type`, `title`, `x_label`, `y_label`, `group_by_column`, and `value_column` from the original user's request AND the column names present in the `data_csv` (which you will observe from `get_data_from_sales_tool`'s output).
+        2.  `generate_chart_tool(chart_type: str, result_id: str, title: str, x_label: str, y_label: str, group_by_column: str, value_column: str)`: Use this tool to create a bar or pie chart.
+            It requires the `result_id` (from `get_data_from_sales_tool`), `chart_type`, `title`, `x_label`, `y_label`, `group_by_column`, and `value_column`.
+            You MUST infer `chart_type`, `title`, `x_label`, `y_label`, `group_by_column`, and `value_column` from the original user's request AND the column names listed in `get_data_from_sales_tool`'s output.
+            NEVER copy rows into the chart call; only pass `data_csv` (a CSV string) if no `result_id` is available.
 
         **Workflow Instructions:**
         -   **If the user asks for a chart (e.g., "bar chart", "pie chart", "visualize", "plot", "graph"):**
             -   **Step A: Get Raw Data.** First, use the `get_data_from_sales_tool`. Formulate the `question` for this tool to retrieve aggregated data relevant to the charting request.
             -   **Step B: Infer Chart Parameters.** Once you receive the raw data result (from `get_data_from_sales_tool`), carefully analyze the original user's question AND the column headers/structure of the received data. Infer the `chart_type` (must be 'bar' or 'pie'), an appropriate `title`, `x_label`, `y_label`, and crucially, the exact `group_by_column` and `value_column` names *from the data's headers*.
-            -   **Step C: Generate Chart.** Then, call `generate_chart_tool` with the data (as `data_csv`) and all the parameters you inferred.
+            -   **Step C: Generate Chart.** Then, call `generate_chart_tool` with the `result_id` and all the parameters you inferred.
             -   **Step D: Final Answer.** The output of `generate_chart_tool` will be the chart's file path. Present this file path as your final answer to the supervisor. Do NOT add any extra conversational text.
 
         -   **If the user asks for data retrieval or analysis that does NOT require a chart:**
@@ -208,6 +475,7 @@ def create_sales_data_agent():
         model = _sales_llm,
         tools = [get_data_from_sales, generate_chart_tool],
         prompt = sales_data_agent_prompt,
+        pre_model_hook = _history_hook,
         name = "SalesDataAgent"
     )
     return sales_data_agent
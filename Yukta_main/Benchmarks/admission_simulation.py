@@ -0,0 +1,231 @@
+"""
+Overload simulation: chat users, one flooding user and a batch job against fake backends, without and with the
+AdmissionController of Utils/admission.py.
+
+The fake backends behave like the real services under load:
+
+    openai                                   at most --openai-capacity requests in flight; more are answered 429 and
+                                             retried with exponential backoff (as the OpenAI SDK does) until
+                                             --max-retries is exhausted
+    tavily, pinecone, postgres, google_calendar  a fixed number of concurrent requests each; excess requests queue
+
+A chat run is a routing model call, an agent model call, one tool call (web search, documents, SQL or calendar) and
+an answering model call. A batch item is two model calls (writer and reviewer). Chat users send a message, read the
+answer, think for about --think seconds and send the next one, for --duration seconds; a run that misses --timeout
+counts as timed out (the user gave up). The batch job keeps --batch-concurrency items in flight and, being patient,
+resubmits an item that was shed after its Retry-After.
+
+Without admission control every message starts at once and everybody degrades together. With it, messages pass the
+per-user token bucket, the active-run cap and load shedding, and every call takes a slot of its downstream service,
+with chat runs served before batch items.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.admission_simulation --users 40 --batch 200 --duration 8 --openai-capacity 16
+"""
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from contextlib import asynccontextmanager
+
+from Utils.admission import AdmissionController, Overloaded, admission_priority
+
+TOOL_SERVICES = ("tavily", "pinecone", "postgres", "google_calendar")
+
+
+class RateLimited(Exception):
+    pass
+
+
+class FakeProvider:
+    """The model API: answers after latency seconds, or 429 when capacity requests are already in flight."""
+
+    def __init__(self, capacity, latency):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.counters = {"requests": 0, "rate_limited": 0}
+
+    async def call(self):
+        self.counters["requests"] += 1
+        if self.in_flight >= self.capacity:
+            self.counters["rate_limited"] += 1
+            raise RateLimited()
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        finally:
+            self.in_flight -= 1
+
+
+class FakeService:
+    """A tool backend that serves capacity requests at a time and queues the rest."""
+
+    def __init__(self, capacity, latency):
+        self.latency = latency
+        self._semaphore = asyncio.Semaphore(capacity)
+
+    async def call(self):
+        async with self._semaphore:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+
+
+class Simulation:
+    def __init__(self, args, controller):
+        self.args = args
+        self.controller = controller
+        self.provider = FakeProvider(args.openai_capacity, args.latency)
+        self.services = {name: FakeService(capacity, args.latency * factor)
+                         for name, capacity, factor in (("tavily", 4, 2.0), ("pinecone", 8, 0.5), ("postgres", 4, 1.0), ("google_calendar", 2, 1.0))}
+        self.results = []
+
+    @asynccontextmanager
+    async def _slot(self, name):
+        if self.controller is None:
+            yield
+            return
+        async with self.controller.adownstream(name):
+            yield
+
+    async def model_call(self):
+        for attempt in range(self.args.max_retries + 1):
+            try:
+                async with self._slot("openai"):
+                    return await self.provider.call()
+            except RateLimited:
+                if attempt == self.args.max_retries:
+                    raise
+                await asyncio.sleep(self.args.latency * 2 ** attempt * random.uniform(0.75, 1.25))
+
+    async def chat_work(self, tool):
+        await self.model_call() # Yukta Prime / fast-path routing
+        await self.model_call() # the agent decides on a tool call
+        async with self._slot(tool):
+            await self.services[tool].call()
+        await self.model_call() # the answer
+
+    async def batch_work(self):
+        await self.model_call()
+        await self.model_call()
+
+    async def run(self, kind, user, work, timeout):
+        """One message or batch item. Returns the Overloaded error when the controller shed it, else None."""
+        priority = "batch" if kind == "batch" else "interactive"
+        start = time.perf_counter()
+        ticket = None
+        if self.controller is not None:
+            try:
+                ticket = self.controller.admit(user, priority)
+            except Overloaded as e:
+                self.results.append((kind, "shed", None))
+                return e
+        try:
+            with admission_priority(priority):
+                await asyncio.wait_for(work(), timeout)
+            outcome = "completed"
+        except asyncio.TimeoutError:
+            outcome = "timed out"
+        except RateLimited:
+            outcome = "failed"
+        except Overloaded:
+            outcome = "shed"
+        finally:
+            if ticket is not None:
+                ticket.release()
+        self.results.append((kind, outcome, time.perf_counter() - start))
+        return None
+
+    async def chat_user(self, index, deadline):
+        await asyncio.sleep(random.uniform(0, self.args.think)) # Users do not arrive in lockstep
+        while time.perf_counter() < deadline:
+            tool = TOOL_SERVICES[index % len(TOOL_SERVICES)]
+            await self.run("interactive", f"user-{index}", lambda: self.chat_work(tool), self.args.timeout)
+            await asyncio.sleep(random.expovariate(1 / self.args.think))
+
+    async def flooding_user(self, deadline):
+        tasks = []
+        while time.perf_counter() < deadline:
+            tasks.append(asyncio.create_task(self.run("flood", "flooder", lambda: self.chat_work("tavily"), self.args.timeout)))
+            await asyncio.sleep(self.args.think / 10)
+        await asyncio.gather(*tasks)
+
+    async def batch_job(self):
+        pending = list(range(self.args.batch))
+
+        async def worker():
+            while pending:
+                pending.pop()
+                while True:
+                    shed = await self.run("batch", "batch-job", self.batch_work, self.args.batch_timeout)
+                    if shed is None:
+                        break
+                    await asyncio.sleep(min(shed.retry_after, self.args.think)) # Patient: retry after a while
+
+        await asyncio.gather(*(worker() for _ in range(self.args.batch_concurrency)))
+
+    async def main(self):
+        deadline = time.perf_counter() + self.args.duration
+        start = time.perf_counter()
+        await asyncio.gather(self.batch_job(), self.flooding_user(deadline),
+                             *(self.chat_user(i, deadline) for i in range(self.args.users)))
+        return time.perf_counter() - start
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def report(label, simulation, wall):
+    print(f"\n{label}: {wall:.1f}s, provider requests {simulation.provider.counters['requests']}, "
+          f"429s {simulation.provider.counters['rate_limited']}")
+    print(f"  {'class':<13}{'runs':>6}{'completed':>11}{'shed':>6}{'failed':>8}{'timed out':>11}{'p50':>8}{'p95':>8}")
+    for kind in ("interactive", "flood", "batch"):
+        rows = [(outcome, seconds) for k, outcome, seconds in simulation.results if k == kind]
+        outcomes = [outcome for outcome, _ in rows]
+        latencies = [seconds for outcome, seconds in rows if outcome == "completed"]
+        print(f"  {kind:<13}{len(rows):>6}{outcomes.count('completed'):>11}{outcomes.count('shed'):>6}{outcomes.count('failed'):>8}"
+              f"{outcomes.count('timed out'):>11}{statistics.median(latencies) if latencies else 0:>7.2f}s{_percentile(latencies, 0.95):>7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--think", type=float, default=1.0, help="Mean seconds between a user's messages")
+    parser.add_argument("--duration", type=float, default=8.0)
+    parser.add_argument("--batch", type=int, default=200, help="Items of the batch job")
+    parser.add_argument("--batch-concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per model call")
+    parser.add_argument("--openai-capacity", type=int, default=16, help="Requests in flight before the provider answers 429")
+    parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=4.0, help="Seconds a chat user waits for an answer")
+    parser.add_argument("--batch-timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{args.users} chat users (+1 flooding), batch of {args.batch} items ({args.batch_concurrency} in flight), "
+          f"provider capacity {args.openai_capacity}, model latency {args.latency}s, chat timeout {args.timeout}s")
+    for label in ("no admission control", "admission control"):
+        random.seed(args.seed)
+        controller = None
+        if label == "admission control":
+            # Rates are per minute of real time, the simulation compresses minutes into seconds
+            controller = AdmissionController(
+                user_rate_per_minute=60 / args.think, user_burst=3, batch_rate_per_minute=60000, batch_burst=args.batch,
+                max_active_runs=args.users + args.batch_concurrency // 2, batch_share=0.5,
+                downstream_limits={"openai": args.openai_capacity, "tavily": 4, "pinecone": 8, "postgres": 4, "google_calendar": 2},
+                max_downstream_waiting=args.openai_capacity,
+                downstream_timeout={"interactive": args.timeout / 2, "batch": args.batch_timeout / 2},
+            )
+        simulation = Simulation(args, controller)
+        wall = asyncio.run(simulation.main())
+        report(label, simulation, wall)
+        if controller is not None:
+            stats = controller.stats()
+            print(f"  shed: {stats['rejected_user_rate']} over a user's rate, {stats['rejected_capacity']} at capacity, "
+                  f"{stats['rejected_downstream']} for a saturated service, {stats['shed_downstream_calls']} calls timed out waiting")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load test of concurrent conversations: blocking invoke() on a bounded thread pool vs ainvoke() on one event loop.
+
+Builds a supervisor over the real email and LinkedIn agents (both have native async paths) with FakeLLM
+models that simulate per-call network latency, then runs N independent conversations each way and reports wall time,
+throughput and per-conversation latency percentiles.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.async_load_test --conversations 40 --threads 4 --latency 0.1 --checkpointer sqlite
+"""
+import os
+import time
+import uuid
+import asyncio
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph_supervisor import create_supervisor
+
+from Benchmarks.fake_llm import FakeLLM
+from Benchmarks.chain_construction_benchmark import FAKE_EMAIL, FAKE_REVIEW, FAKE_POST
+from Utils.checkpointer import create_checkpointer
+import Agents.email_agent as email_agent
+import Agents.linkedin_agent as linkedin_agent
+
+REQUESTS = [
+    "Write an email applying for the data scientist role at Acme",
+    "Draft a linkedin post about our new AI course",
+    "Write an email to thank the interview panel",
+    "Create a linkedin post announcing the hackathon results",
+]
+
+
+def _route(messages, tool_names):
+    """Supervisor: hand off by keyword, then finish once the agent has handed back."""
+    last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    request = messages[last_human].content
+    if any(m.response_metadata.get("__is_handoff_back") for m in messages[last_human + 1:] if isinstance(m, AIMessage)):
+        return AIMessage(content="Done.")
+    target = "transfer_to_email_agent" if "email" in request.lower() else "transfer_to_linkedin_agent"
+    return AIMessage(content="", tool_calls=[{"name": target, "args": {}, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+
+def build_graph(latency, checkpointer):
+    chain_llm = FakeLLM(latency=latency, structured_outputs={
+        "professional email reviewer": FAKE_REVIEW,
+        "expert at writing professional emails": FAKE_EMAIL,
+        "LinkedIn posts": FAKE_POST,
+    })
+    agent_llm = FakeLLM(latency=latency, responder=_route)
+    agent_llm.stats = stats = chain_llm.stats # One call counter for both models
+    email_agent.init_email_agent(chain_llm, chain_llm)
+    linkedin_agent.init_linkedin_agent(chain_llm)
+    agents = [email_agent.create_email_agent(), linkedin_agent.create_linkedin_agent()]
+    graph = create_supervisor(agents, model=agent_llm, prompt="Route the request to the right agent.").compile(checkpointer=checkpointer)
+    return graph, stats
+
+
+def _inputs(i):
+    return {"messages": [HumanMessage(content=REQUESTS[i % len(REQUESTS)])]}, {"configurable": {"thread_id": f"load-{i}"}}
+
+
+def run_sync(graph, conversations, threads):
+    def one(i):
+        inputs, config = _inputs(i)
+        start = time.perf_counter()
+        graph.invoke(inputs, config)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(conversations)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(graph, conversations):
+    async def one(i):
+        inputs, config = _inputs(i)
+        start = time.perf_counter()
+        await graph.ainvoke(inputs, config)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(conversations)))
+    return time.perf_counter() - start, list(latencies)
+
+
+def _report(name, wall, latencies, calls):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<34}{wall:>9.2f}s{len(latencies) / wall:>10.1f}/s{statistics.median(latencies):>10.2f}s{p95:>10.2f}s{calls:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=4, help="Worker threads for the blocking baseline.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated seconds per LLM call.")
+    parser.add_argument("--checkpointer", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def fresh_checkpointer(name):
+            return create_checkpointer(args.checkpointer, sqlite_path=os.path.join(tmp, f"{name}.sqlite"))
+
+        print(f"{'mode':<34}{'wall':>10}{'throughput':>11}{'p50':>11}{'p95':>11}{'calls':>8}")
+        graph, stats = build_graph(args.latency, fresh_checkpointer("sync"))
+        wall, latencies = run_sync(graph, args.conversations, args.threads)
+        _report(f"invoke, {args.threads} threads", wall, latencies, stats["calls"])
+
+        graph, stats = build_graph(args.latency, fresh_checkpointer("async"))
+        wall, latencies = asyncio.run(run_async(graph, args.conversations))
+        _report("ainvoke, 1 event loop", wall, latencies, stats["calls"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark of per-call chain construction overhead, before and after the runnable registry.
+
+Every runnable the init_*_agent() functions register (Utils/runnable_registry.py) is measured: the RAG
+ParallelMultiQueryRetriever and answer chain, the email writer / reviewer chains, the LinkedIn post chain and the SQL
+AgentExecutor. "before" rebuilds the runnable inside every call with the same constructor the agent uses; "after"
+invokes the instance registered once at init. The benchmark fails when a registered runnable has no case, so it keeps
+covering the registry as shipped. All LLM calls go to a zero-latency FakeLLM, so the difference is pure construction
+overhead. The RAG retriever searches an InMemoryVectorStore instead of Pinecone, and the SQL agent a local SQLite
+'sales' table.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.chain_construction_benchmark --iterations 200
+"""
+import io
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from Benchmarks.fake_llm import FakeLLM
+import Agents.RAG_agent as RAG_agent
+import Agents.email_agent as email_agent
+import Agents.linkedin_agent as linkedin_agent
+import Agents.sales_data_agent as sales_data_agent
+from Utils.model_tiers import tiered_chain
+from Utils.parallel_retrieval import ParallelMultiQueryRetriever
+from Utils.runnable_registry import register_runnable, registered_runnables
+from Utils.schema_cache import SchemaSnapshotCache
+
+FAKE_EMAIL = {"recipient_name": "Hiring Manager", "recipient_greeting": "Dear Hiring Manager,", "subject": "Application",
+              "body": "I am applying for the role.", "applicant_name": "A. Person", "applicant_phone": "N/A",
+              "applicant_email": "a@example.com", "closing": "Regards,"}
+FAKE_REVIEW = {"approved": True, "suggestions": "None", "revised_subject": "Application", "revised_body": "I am applying for the role."}
+FAKE_POST = {"hook": "Did you know?", "body_content": "AI is changing work.", "hashtags": ["AI"], "call_to_action": None}
+
+
+def _time_per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def _build_sales_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, region TEXT, total_sale REAL)")
+    conn.executemany("INSERT INTO sales (region, total_sale) VALUES (?, ?)", [(region, 100.0) for region in "NSEW"])
+    conn.commit()
+    conn.close()
+
+
+def _quiet(func):
+    """The SQL agent prints on construction and runs with verbose=True; keep that out of the table."""
+    def run(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    llm = FakeLLM(structured_outputs={
+        "professional email reviewer": FAKE_REVIEW,
+        "expert at writing professional emails": FAKE_EMAIL,
+        "LinkedIn posts": FAKE_POST,
+    })
+    # The SQL agent answers in text at once, so only the executor (not the database) is on the measured path
+    sql_llm = FakeLLM(responder=lambda messages, tool_names: AIMessage(content="Total sales: 400"))
+    embedding = DeterministicFakeEmbedding(size=64)
+    vector_store = InMemoryVectorStore(embedding)
+    vector_store.add_texts([f"Syllabus unit {i}: topic {i}" for i in range(50)])
+
+    email_agent.init_email_agent(llm, llm)
+    linkedin_agent.init_linkedin_agent(llm)
+    RAG_agent.init_rag_agent(llm, embedding, None, StrOutputParser())
+
+    def build_rag_retriever():
+        # RAG_agent._connect_retriever() with the in-memory store in place of Pinecone
+        return ParallelMultiQueryRetriever(llm=llm, vector_store=vector_store, embedding=embedding, k=4)
+
+    register_runnable('rag.multi_query_retriever', build_rag_retriever())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = f"sqlite:///{os.path.join(tmp, 'sales.db')}"
+        _build_sales_db(os.path.join(tmp, 'sales.db'))
+        backend = sales_data_agent.init_sales_data_agent(sql_llm, db_uri, schema_cache=SchemaSnapshotCache(db_uri, cache_dir=os.path.join(tmp, "schema_cache")))
+        _quiet(backend.get)()
+
+        registry = registered_runnables()
+        question = "What is in unit 3?"
+        email_inputs = {'user_request': 'Apply for the data scientist role', 'applicant_name': 'A. Person',
+                        'applicant_phone': 'N/A', 'applicant_email': 'a@example.com'}
+
+        # {registered name: (build() -> runnable as a tool would rebuild it per call, run(runnable))}
+        cases = {
+            'rag.multi_query_retriever': (build_rag_retriever, lambda retriever: retriever.invoke(question)),
+            'rag.answer_chain': (lambda: RAG_agent.rag_answer_prompt | llm | StrOutputParser(),
+                                 lambda chain: chain.invoke({'context_text': "Syllabus unit 3: topic 3", 'question': question})),
+            'email.writer_chain': (lambda: tiered_chain(email_agent.email_writer_prompt, llm, email_agent._email_writer_parser),
+                                   lambda chain: chain.invoke(email_inputs)),
+            'email.reviewer_chain': (lambda: tiered_chain(email_agent.email_reviewer_prompt, llm, email_agent._email_reviewer_parser),
+                                     lambda chain: chain.invoke(dict(FAKE_EMAIL))),
+            'linkedin.post_chain': (lambda: tiered_chain(linkedin_agent.linkedin_post_prompt, llm, linkedin_agent._linkedin_parser),
+                                    lambda chain: chain.invoke({'user_input': 'AI trends'})),
+            'sales.sql_agent_executor': (_quiet(sales_data_agent._connect_sql_agent),
+                                         _quiet(lambda executor: executor.invoke({"messages": [HumanMessage(content="Total sales?")]}))),
+        }
+        missing = sorted(set(registry) - set(cases))
+        assert not missing, f"registered runnables without a benchmark case: {missing}"
+
+        print(f"{'runnable':<30}{'construct (us)':>16}{'before (us/call)':>18}{'after (us/call)':>18}")
+        for name in sorted(cases):
+            build, run = cases[name]
+            prebuilt = registry[name]
+            run(build()), run(prebuilt) # warm-up
+            construct_s = _time_per_call(build, args.iterations)
+            before_s = _time_per_call(lambda: run(build()), args.iterations)
+            after_s = _time_per_call(lambda: run(prebuilt), args.iterations)
+            print(f"{name:<30}{construct_s * 1e6:>16.1f}{before_s * 1e6:>18.1f}{after_s * 1e6:>18.1f}")
+        sales_data_agent.sql_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares per-turn checkpoint write/read latency of the checkpointer backends against InMemorySaver.
+
+Each "turn" runs a tiny LangGraph graph (no LLM) that appends a user and an assistant message to a
+thread, so the measured cost is what the checkpointer adds to every Yukta turn as history grows.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.checkpointer_benchmark --turns 50 --threads 5
+    python -m Benchmarks.checkpointer_benchmark --pg-conninfo postgresql://user:pw@host:5432/db
+"""
+import os
+import time
+import argparse
+import statistics
+import tempfile
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph, MessagesState, START, END
+
+from Utils.checkpointer import create_checkpointer, compact_checkpointer
+
+
+def _build_graph(checkpointer, reply_size):
+    def reply(state):
+        return {"messages": [AIMessage(content="x" * reply_size)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_backend(name, checkpointer, turns, threads, reply_size):
+    graph = _build_graph(checkpointer, reply_size)
+    write_times, read_times = [], []
+    for turn in range(turns):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"bench-{name}-{thread}"}}
+            start = time.perf_counter()
+            graph.invoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config=config)
+            write_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            graph.get_state(config)
+            read_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    removed = compact_checkpointer(checkpointer)
+    compaction_time = time.perf_counter() - start
+
+    print(f"{name:<10} turn p50 {statistics.median(write_times) * 1000:7.2f} ms | turn p95 {_percentile(write_times, 95) * 1000:7.2f} ms | "
+          f"read p50 {statistics.median(read_times) * 1000:6.2f} ms | read p95 {_percentile(read_times, 95) * 1000:6.2f} ms | "
+          f"compaction removed {removed} rows in {compaction_time * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=5)
+    parser.add_argument("--reply-size", type=int, default=2000, help="Characters per assistant reply.")
+    parser.add_argument("--pg-conninfo", default=None, help="Also benchmark the Postgres backend.")
+    args = parser.parse_args()
+
+    print(f"{args.turns} turns x {args.threads} threads, {args.reply_size}-char replies")
+    run_backend("memory", create_checkpointer("memory"), args.turns, args.threads, args.reply_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_saver = create_checkpointer("sqlite", sqlite_path=os.path.join(tmp, "bench.sqlite"))
+        run_backend("sqlite", sqlite_saver, args.turns, args.threads, args.reply_size)
+        sqlite_saver.conn.close()
+    if args.pg_conninfo:
+        run_backend("postgres", create_checkpointer("postgres", pg_conninfo=args.pg_conninfo), args.turns, args.threads, args.reply_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Cold-start time of initialize_yukta_graph: serial and eager (as before) vs concurrent with lazy backends.
+
+Every external client is replaced by a local stand-in that sleeps for a typical construction time: ChatOpenAI clients
+(TLS contexts for the sync and async HTTP clients), NVIDIA embeddings, the Pinecone client and index handle, the SQL
+connection (a SQLite file here), the Google Calendar OAuth session and the Tavily client. Three startups are timed:
+
+    serial/eager     - one component after the other, lazy backends connected before the app is ready (the old startup)
+    parallel/eager   - independent components on the thread pool, then the lazy backends (also concurrently) before ready
+    parallel/lazy    - independent components on the thread pool, Pinecone/SQL/Calendar left for first use
+
+For parallel/lazy, the cost each backend adds to the first request of its agent is listed as well.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.cold_start_benchmark --client-latency 0.15 --sql-latency 1.0
+"""
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import warnings
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_core.tools import tool
+from sqlalchemy import create_engine
+
+import yukta_nexus
+from yukta_nexus import initialize_yukta_graph, get_startup_report
+from Agents import RAG_agent, sales_data_agent, calendar_agent, research_agent
+from Benchmarks.fake_llm import FakeLLM
+from Utils.startup import build_concurrently
+
+LLM_CONFIG = {
+    'default_model': 'gpt-4o', 'rag_model': 'gpt-4o', 'research_model': 'gpt-4o', 'linkedin_model': 'gpt-4o',
+    'linkedin_temp': 0.8, 'email_writer_model': 'gpt-4o', 'email_writer_temp': 0.7, 'email_reviewer_model': 'gpt-4o',
+    'sales_model': 'gpt-4o', 'yukta_nexus_model': 'gpt-4o', 'embedding_model': 'fake-embedding', 'calendar_model': 'gpt-4o',
+}
+API_KEYS = {'OPENAI_API_KEY': 'x', 'TAVILY_API_KEY': 'x', 'NVIDIA_API_KEY': 'x', 'PINECONE_API_KEY': 'x'}
+
+
+@tool
+def get_current_datetime(calendar_id: str = "primary") -> str:
+    """Stand-in for the Google Calendar tool."""
+    return "2026-01-01 09:00:00"
+
+
+def install_stand_ins(args, db_path):
+    """Replaces every external client the agents build with a local stand-in of fixed construction latency."""
+    def chat_model(model=None, **kwargs):
+        time.sleep(args.client_latency)
+        return FakeLLM(model_name=model or "gpt-4o")
+
+    def embeddings(**kwargs):
+        time.sleep(args.embedding_latency)
+        return DeterministicFakeEmbedding(size=64)
+
+    class Pinecone:
+        def __init__(self, **kwargs):
+            time.sleep(args.pinecone_latency / 2)
+
+        def Index(self, name):
+            time.sleep(args.pinecone_latency / 2) # describe_index round trip
+            return name
+
+    def vector_store(index=None, embedding=None, **kwargs):
+        return InMemoryVectorStore(embedding)
+
+    def sql_engine(uri, **kwargs):
+        time.sleep(args.sql_latency) # connection + reflection of a remote database
+        return create_engine(f"sqlite:///{db_path}", **kwargs)
+
+    class CalendarToolkit:
+        def __init__(self):
+            time.sleep(args.calendar_latency) # OAuth token refresh + API discovery document
+
+        def get_tools(self):
+            return [get_current_datetime]
+
+    def tavily(**kwargs):
+        time.sleep(args.tavily_latency)
+        return get_current_datetime
+
+    yukta_nexus.ChatOpenAI = chat_model
+    yukta_nexus.NVIDIAEmbeddings = embeddings
+    RAG_agent.Pinecone = Pinecone
+    RAG_agent.PineconeVectorStore = vector_store
+    sales_data_agent.create_engine = sql_engine
+    calendar_agent.CalendarToolkit = CalendarToolkit
+    research_agent.TavilySearch = tavily
+
+
+def lazy_backends():
+    return [RAG_agent._rag_backend, sales_data_agent._sql_backend, calendar_agent._calendar_backend]
+
+
+def cold_start(workdir, max_workers, eager):
+    runtime_config = {
+        'startup_max_workers': max_workers,
+        'tracing_enabled': False,
+        'search_cache_path': os.path.join(workdir, 'search_cache.sqlite'),
+        'sales_schema_cache_dir': os.path.join(workdir, f'schema_cache_{time.monotonic_ns()}'), # Cold schema cache every run
+    }
+    start = time.perf_counter()
+    initialize_yukta_graph(LLM_CONFIG, API_KEYS, "postgresql+psycopg2://bench", os.path.join(workdir, 'TestData'), 'bench-index', runtime_config)
+    if eager:
+        build_concurrently({backend.name: backend.get for backend in lazy_backends()}, max_workers=max_workers)
+    ready = time.perf_counter() - start
+    first_use = {}
+    for backend in lazy_backends():
+        backend_start = time.perf_counter()
+        backend.get()
+        first_use[backend.name] = time.perf_counter() - backend_start
+    return ready, first_use, get_startup_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client-latency", type=float, default=0.15, help="Seconds per ChatOpenAI client")
+    parser.add_argument("--embedding-latency", type=float, default=0.4)
+    parser.add_argument("--pinecone-latency", type=float, default=0.8)
+    parser.add_argument("--sql-latency", type=float, default=1.0)
+    parser.add_argument("--calendar-latency", type=float, default=1.2)
+    parser.add_argument("--tavily-latency", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--verbose", action="store_true", help="Print the per-component startup report of each run")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "sales.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, region TEXT, category TEXT, total_sale REAL)")
+        install_stand_ins(args, db_path)
+        cwd = os.getcwd()
+        os.chdir(workdir) # Charts and other default paths stay out of the repository
+        try:
+            results = {}
+            for label, workers, eager in (("serial/eager", 1, True), ("parallel/eager", args.workers, True), ("parallel/lazy", args.workers, False)):
+                results[label] = cold_start(workdir, workers, eager)
+        finally:
+            os.chdir(cwd)
+
+    print(f"\n{'startup':<16}{'ready':>9}{'component time':>17}")
+    for label, (ready, _, report) in results.items():
+        print(f"{label:<16}{ready:>8.2f}s{report['component_seconds']:>16.2f}s")
+        if args.verbose:
+            for name, row in sorted(report['components'].items(), key=lambda item: -(item[1]['seconds'] or 0)):
+                print(f"    {name:<30}{row['phase']:<9}{row['seconds'] or 0:>7.3f}s")
+    baseline = results["serial/eager"][0]
+    ready, first_use, _ = results["parallel/lazy"]
+    print(f"parallel/lazy is ready {baseline / ready:.1f}x sooner ({baseline - ready:.2f}s saved)")
+    print("first-use cost in parallel/lazy (paid once, by the first request of the agent): "
+          + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in first_use.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Model calls and tokens per email: the former ReAct email agent vs the write -> review -> revise pipeline.
+
+The ReAct baseline rebuilds the agent as it was: an agent model that calls write_email, re-types the EmailContent as
+the argument of review_email, then presents the review. The pipeline (create_email_agent) passes the objects through
+the graph state and only calls the writer and reviewer chains, plus one review per revision. Both run on FakeLLMs that
+count calls and approximate tokens; two scenarios cover a draft the reviewer approves and one it sends back once.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.email_pipeline_benchmark --requests 5 --latency 0.3
+"""
+import json
+import time
+import uuid
+import argparse
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from Benchmarks.fake_llm import FakeLLM
+from Benchmarks.chain_construction_benchmark import FAKE_EMAIL
+import Agents.email_agent as email_agent
+
+REQUESTS = [
+    "Write an email applying for the data scientist role at Acme. My name is A. Person, a@example.com",
+    "Write an email to thank the interview panel at Globex",
+    "Draft an email inviting the team to the quarterly review on Friday",
+]
+
+# The agent prompt before the pipeline replaced the ReAct loop
+REACT_AGENT_PROMPT = """You are a dedicated Email Management Agent. Your task is to handle all email-related requests, including drafting and reviewing emails.
+You have access to `write_email_tool` and `review_email_tool`.
+Follow the workflow instructions precisely.
+
+**Here are your available tools:**
+1.  `write_email_tool(user_request: str, applicant_name: str, applicant_phone: str, applicant_email: str)`: Use this tool to draft a new email.
+    Provide the full email request and applicant details as input. This tool returns a structured EmailContent object.
+2.  `review_email_tool(email_content: EmailContent)`: Use this tool to review an existing structured email.
+    Provide the EmailContent object as input. This tool returns structured EmailReviewFeedback.
+
+**Workflow Instructions:**
+-   **If the request is to draft an email:**
+    -   **Step A:** Use the `write_email_tool`. Extract `user_request`, `applicant_name`, `applicant_phone`, `applicant_email` from the request you received.
+    -   **Step B (Optional/Conditional):** After receiving the `EmailContent` object, if the user explicitly requested a review or if review is standard, use `review_email_tool` with the drafted `EmailContent` object.
+    -   **Step C: Final Output.** Present the output of the final tool (either `EmailContent` from writing or `EmailReviewFeedback` from reviewing) as your final response to the supervisor.
+-   **If the request is to review an email:**
+    -   **Step A:** Extract the `EmailContent` object from the request (if the supervisor passes it in a structured way).
+    -   **Step B:** Use the `review_email_tool` with the `EmailContent` object.
+    -   **Step C: Final Output.** Present the `EmailReviewFeedback` object as your final response to the supervisor.
+-   Do NOT add extra conversational text to your final output."""
+
+
+def chain_responder(needs_revision):
+    """Writer returns the draft; the reviewer approves it, or first sends it back once with a revised subject/body."""
+    def respond(messages, tool_names):
+        prompt = messages[-1].content
+        if "professional email reviewer" not in prompt:
+            return AIMessage(content=json.dumps(FAKE_EMAIL))
+        approved = not needs_revision or "(revised)" in prompt
+        return AIMessage(content=json.dumps({
+            "approved": approved,
+            "suggestions": "None" if approved else "Make the subject more specific and add a clear call to action.",
+            "revised_subject": FAKE_EMAIL["subject"] + ("" if approved else " (revised)"),
+            "revised_body": FAKE_EMAIL["body"] + ("" if approved else " I would welcome a call next week."),
+        }))
+    return respond
+
+
+def react_responder(messages, tool_names):
+    """The former agent loop: write, review the written email (re-typed as the tool argument), present the review."""
+    last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    outputs = {m.name: m for m in messages[last_human + 1:] if isinstance(m, ToolMessage)}
+    if "review_email" in outputs:
+        return AIMessage(content=outputs["review_email"].content)
+    if "write_email" in outputs:
+        name, args = "review_email", {"email_content": FAKE_EMAIL}
+    else:
+        name, args = "write_email", {"user_request": messages[last_human].content, "applicant_name": "A. Person",
+                                     "applicant_phone": "N/A", "applicant_email": "a@example.com"}
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+
+def build_react_agent(agent_llm):
+    return create_react_agent(model=agent_llm, tools=[tool(email_agent.write_email), tool(email_agent.review_email)],
+                              prompt=REACT_AGENT_PROMPT, name="email_agent")
+
+
+def run(graph, stats, requests):
+    before = dict(stats)
+    start = time.perf_counter()
+    for i in range(requests):
+        graph.invoke({"messages": [HumanMessage(content=REQUESTS[i % len(REQUESTS)])]})
+    seconds = (time.perf_counter() - start) / requests
+    return {key: (stats[key] - before[key]) / requests for key in stats}, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated seconds per LLM call.")
+    parser.add_argument("--max-revisions", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18}{'agent':<10}{'calls':>7}{'prompt tok':>12}{'output tok':>12}{'latency':>10}")
+    for scenario, needs_revision in (("approved", False), ("one revision", True)):
+        chain_llm = FakeLLM(latency=args.latency, responder=chain_responder(needs_revision))
+        agent_llm = FakeLLM(latency=args.latency, responder=react_responder)
+        agent_llm.stats = chain_llm.stats # One counter for the agent model and the chains
+        email_agent.init_email_agent(chain_llm, chain_llm, max_revisions=args.max_revisions)
+        for name, graph in (("ReAct", build_react_agent(agent_llm)), ("pipeline", email_agent.create_email_agent())):
+            per_email, seconds = run(graph, chain_llm.stats, args.requests)
+            print(f"{scenario:<18}{name:<10}{per_email['calls']:>7.1f}{per_email['prompt_tokens']:>12,.0f}"
+                  f"{per_email['completion_tokens']:>12,.0f}{seconds:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
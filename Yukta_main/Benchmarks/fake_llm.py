@@ -0,0 +1,99 @@
+"""
+Deterministic stand-in for ChatOpenAI used by the offline benchmarks and load tests.
+
+FakeLLM simulates network latency, supports bind_tools so it can drive create_react_agent / create_supervisor
+graphs, and counts calls and (approximate) prompt/completion tokens so benchmarks can compare model usage.
+"""
+import json
+import time
+import uuid
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import Field
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+def approx_tokens(text):
+    """Rough token estimate (~4 characters per token), good enough for before/after comparisons."""
+    return max(1, len(text) // 4)
+
+
+def _message_text(message):
+    return message.content if isinstance(message.content, str) else json.dumps(message.content)
+
+
+class FakeLLM(BaseChatModel):
+    """
+    latency:            seconds to sleep per call (time.sleep for sync, asyncio.sleep for async).
+    structured_outputs: {substring of the prompt: dict}. When a prompt contains the substring, the dict is
+                        returned as JSON (for PydanticOutputParser chains).
+    responder:          optional callable(messages, bound_tool_names) -> AIMessage that overrides the default policy.
+    stats:              shared counters {"calls", "prompt_tokens", "completion_tokens"} (shared by bind_tools copies).
+
+    Default policy with tools bound: call the first tool whose name matches a route keyword in the latest user
+    message (or the first tool) with every argument set to that message, then answer with the tool output.
+    """
+    model_name: str = "fake-llm"
+    latency: float = 0.0
+    structured_outputs: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    responder: Optional[Callable] = None
+    routes: Dict[str, str] = Field(default_factory=dict)
+    stats: Dict[str, int] = Field(default_factory=lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+    bound_tools: List[Dict[str, Any]] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self):
+        return "fake-llm"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"bound_tools": [convert_to_openai_tool(t)["function"] for t in tools]})
+
+    def _respond(self, messages):
+        tool_names = [t["name"] for t in self.bound_tools]
+        if self.responder is not None:
+            return self.responder(messages, tool_names)
+
+        prompt_text = "\n".join(_message_text(m) for m in messages)
+        for marker, payload in self.structured_outputs.items():
+            if marker in prompt_text:
+                return AIMessage(content=json.dumps(payload))
+
+        if not self.bound_tools:
+            return AIMessage(content="Fake answer.")
+
+        last = messages[-1]
+        if isinstance(last, ToolMessage) or (isinstance(last, AIMessage) and last.response_metadata.get("__is_handoff_back")):
+            return AIMessage(content=_message_text(last) if isinstance(last, ToolMessage) else "Done.")
+
+        humans = [m for m in messages if isinstance(m, HumanMessage)]
+        request = _message_text(humans[-1]) if humans else ""
+        chosen = self.bound_tools[0]
+        for keyword, tool_name in self.routes.items():
+            if keyword in request.lower() and tool_name in tool_names:
+                chosen = self.bound_tools[tool_names.index(tool_name)]
+                break
+        args = {name: request for name in chosen.get("parameters", {}).get("properties", {})}
+        return AIMessage(content="", tool_calls=[{"name": chosen["name"], "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+    def _record(self, messages, message):
+        prompt_tokens = sum(approx_tokens(_message_text(m)) for m in messages)
+        completion_tokens = approx_tokens(_message_text(message) + json.dumps(message.tool_calls))
+        self.stats["calls"] += 1
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["completion_tokens"] += completion_tokens
+        message.usage_metadata = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        message.response_metadata["model_name"] = self.model_name
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._record(messages, self._respond(messages))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._record(messages, self._respond(messages))
@@ -0,0 +1,38 @@
+"""
+Local stand-in for the Tavily search tool, for the search cache benchmark and offline runs.
+
+FakeSearchBackend has the invoke/ainvoke interface of TavilySearch, simulates network latency, returns Tavily-shaped
+results and counts the calls that reached it.
+"""
+import time
+import asyncio
+import threading
+
+
+class FakeSearchBackend:
+    def __init__(self, latency=0.8, max_results=5, fail_on=None, error_on=None):
+        self.latency = latency
+        self.max_results = max_results
+        self.fail_on = fail_on # Queries containing this substring raise, like a Tavily error
+        self.error_on = error_on # Queries containing this substring return {"error": ...}, as TavilySearch does for HTTP errors
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _results(self, query):
+        with self._lock:
+            self.calls += 1
+        if self.fail_on and self.fail_on in query:
+            raise RuntimeError(f"Search backend error for '{query}'")
+        if self.error_on and self.error_on in query:
+            return {"error": RuntimeError(f"429 Too Many Requests for '{query}'")}
+        return {"query": query, "results": [
+            {"title": f"{query} - result {i}", "url": f"https://example.com/{i}", "content": f"Snippet {i} about {query}.", "score": 1 - i / 10}
+            for i in range(self.max_results)]}
+
+    def invoke(self, tool_input, config=None):
+        time.sleep(self.latency)
+        return self._results(tool_input["query"])
+
+    async def ainvoke(self, tool_input, config=None):
+        await asyncio.sleep(self.latency)
+        return self._results(tool_input["query"])
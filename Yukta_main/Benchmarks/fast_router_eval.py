@@ -0,0 +1,66 @@
+"""
+Routing check of the fast-path router (Utils/fast_router.py) on labelled requests.
+
+Single-agent requests must go straight to their agent; compound requests (two actions joined by "and then", a plain
+"and", "also" or a comma) must fall back to Yukta Prime, since the fast path runs one agent and would silently drop
+the second action. Prints each misrouted request and exits non-zero if there is one, plus the time per decision.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.fast_router_eval
+"""
+import sys
+import time
+import argparse
+
+from Utils.fast_router import FastPathRouter
+
+FALLBACK = FastPathRouter.FALLBACK
+
+# (request, expected destination)
+CASES = [
+    # Single intent: fast path
+    ("bar chart of sales by region", "SalesDataAgent"),
+    ("what were the total sales by region and category", "SalesDataAgent"),
+    ("show me sales per month", "SalesDataAgent"),
+    ("schedule a meeting tomorrow at 10 am with Alice and Bob", "calendar_agent"),
+    ("what events do I have this week", "calendar_agent"),
+    ("write a linkedin post about ai trends", "linkedin_agent"),
+    ("draft a follow up email to the client", "email_agent"),
+    ("what topics are covered in the syllabus", "RAG_agent"),
+    # Compound: Yukta Prime
+    ("total sales by region and email the numbers to my boss", FALLBACK),
+    ("schedule a meeting tomorrow and send an email invite to the team", FALLBACK),
+    ("bar chart of sales by region, then write a linkedin post about it", FALLBACK),
+    ("show me sales per month and also draft an email to finance", FALLBACK),
+    ("book a call with the team next monday, send them the agenda", FALLBACK),
+    ("write a linkedin post about our launch and schedule a meeting to review it", FALLBACK),
+    ("search the web for the latest ai news and summarize it in an email", FALLBACK),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Routing passes over the cases for the timing")
+    args = parser.parse_args()
+
+    router = FastPathRouter()
+    failures = []
+    for request, expected in CASES:
+        destination, confidence, method = router.route(request)
+        if destination != expected:
+            failures.append((request, expected, destination, method))
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for request, _ in CASES:
+            router.route(request)
+    per_decision = (time.perf_counter() - start) / (args.repeat * len(CASES))
+
+    print(f"{len(CASES) - len(failures)}/{len(CASES)} requests routed as labelled, {per_decision * 1e6:.0f}us per decision")
+    for request, expected, destination, method in failures:
+        print(f"  MISROUTED ({method}): {request!r} -> {destination}, expected {expected}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
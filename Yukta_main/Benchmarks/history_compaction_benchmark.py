@@ -0,0 +1,145 @@
+"""
+Prompt tokens per turn over a long scripted conversation, with and without history compaction.
+
+Mirrors the Yukta hierarchy (Yukta Prime -> full_history supervisors -> ReAct agents) with FakeLLM models and tools that
+return realistic payload sizes (sales CSVs, web search results, drafted emails). The same 50-turn script runs on one
+checkpointed thread twice: once sending the full history (today), once with HistoryManager as the pre_model_hook.
+Reported tokens are the approximate prompt tokens of every model call in the turn (supervisors + agents).
+A last check streams a few compacted turns the way app2 and the server do and asserts that the rolling summary,
+generated inside the pre_model_hook node, never shows up as answer tokens.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.history_compaction_benchmark --turns 50 --keep-turns 4 --max-tokens 6000
+"""
+import uuid
+import argparse
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+from langgraph_supervisor import create_supervisor
+
+from Benchmarks.fake_llm import FakeLLM
+from Utils.history_manager import HistoryManager
+from Utils.streaming import stream_yukta_response
+
+SCRIPT = [
+    "What were the total sales by region last quarter?",
+    "Research the latest pricing of competitor X",
+    "Write an email to my boss with the regional sales figures",
+    "Show the sales by product category for 2024",
+    "Research industry trends in retail analytics",
+    "Write an email inviting the team to the quarterly review",
+]
+
+
+@tool
+def query_sales(query: str) -> str:
+    """Runs a sales query."""
+    return "region,category,month,sales\n" + "\n".join(f"Region{i % 5},Category{i % 7},2024-{i % 12 + 1:02d},{1000 + 37 * i}" for i in range(120))
+
+
+@tool
+def web_search(query: str) -> str:
+    """Searches the web."""
+    return "\n\n".join(f"Result {i}: {query} - " + "Lorem ipsum analysis of the market, pricing tiers and announcements. " * 6 for i in range(5))
+
+
+@tool
+def write_email(query: str) -> str:
+    """Drafts an email."""
+    return "Subject: Update\n\nDear team,\n\n" + "This email summarizes the latest figures and next steps for the quarter. " * 15 + "\n\nBest regards"
+
+
+ROUTES = {"sales": ("company_supervisor", "sales_agent"), "research": ("communication_supervisor", "research_agent"),
+          "email": ("communication_supervisor", "email_agent")}
+
+
+def _respond(messages, tool_names):
+    """Yukta Prime / supervisors hand off by keyword and relay the answer; agents call their tool and summarize it."""
+    last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    request, since = messages[last_human].content, messages[last_human + 1:]
+    supervisor, agent = next(route for keyword, route in ROUTES.items() if keyword in request.lower())
+    transfers = [name for name in tool_names if name.startswith("transfer_to_")]
+    if transfers:
+        if any(m.response_metadata.get("__is_handoff_back") for m in since if isinstance(m, AIMessage)):
+            answer = next(m.content for m in reversed(since) if isinstance(m, AIMessage) and m.content and not m.response_metadata.get("__is_handoff_back"))
+            return AIMessage(content=answer[:600])
+        target = f"transfer_to_{supervisor}" if f"transfer_to_{supervisor}" in tool_names else f"transfer_to_{agent}"
+        return AIMessage(content="", tool_calls=[{"name": target, "args": {}, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+    outputs = [m for m in since if isinstance(m, ToolMessage) and m.name in tool_names]
+    if outputs:
+        return AIMessage(content=f"Here is what I found for '{request}':\n{outputs[-1].content[:500]}")
+    return AIMessage(content="", tool_calls=[{"name": tool_names[0], "args": {"query": request}, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+
+def build_graph(llm, hook):
+    agents = {name: create_react_agent(model=llm, tools=[t], prompt=f"You are the {name}.", pre_model_hook=hook, name=name)
+              for name, t in (("sales_agent", query_sales), ("research_agent", web_search), ("email_agent", write_email))}
+
+    def supervisor(name, members):
+        return create_supervisor([agents[m] for m in members], model=llm, prompt=f"You are the {name}.", pre_model_hook=hook,
+                                 add_handoff_back_messages=True, output_mode="full_history").compile(name=name)
+
+    supervisors = [supervisor("company_supervisor", ["sales_agent"]), supervisor("communication_supervisor", ["research_agent", "email_agent"])]
+    return create_supervisor(supervisors, model=llm, prompt="You are Yukta Prime.", pre_model_hook=hook,
+                             add_handoff_back_messages=True, output_mode="full_history").compile(checkpointer=InMemorySaver())
+
+
+def run(turns, hook):
+    llm = FakeLLM(responder=_respond)
+    graph = build_graph(llm, hook)
+    config = {"configurable": {"thread_id": f"history-{uuid.uuid4().hex[:8]}"}}
+    per_turn = []
+    for i in range(turns):
+        before = llm.stats["prompt_tokens"]
+        graph.invoke({"messages": [HumanMessage(content=SCRIPT[i % len(SCRIPT)])]}, config)
+        per_turn.append(llm.stats["prompt_tokens"] - before)
+    return per_turn
+
+
+def check_streaming(summary_llm, summary_text, turns=8):
+    """Streams turns with a manager that folds early; returns the token events seen. Raises if a summary token leaks."""
+    manager = HistoryManager(keep_turns=1, max_tokens=6000, summary_llm=summary_llm)
+    graph = build_graph(FakeLLM(responder=_respond), manager.as_hook())
+    config = {"configurable": {"thread_id": f"history-stream-{uuid.uuid4().hex[:8]}"}}
+    tokens = 0
+    for i in range(turns):
+        for event in stream_yukta_response(graph, {"messages": [HumanMessage(content=SCRIPT[i % len(SCRIPT)])]}, config):
+            if event["type"] != "token":
+                continue
+            tokens += 1
+            assert event["node"] != "pre_model_hook" and summary_text.strip() not in event["text"], \
+                f"the history summary was streamed as answer text: {event}"
+    assert manager.stats()["summary_calls"], "no summary was generated, so the check proved nothing"
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--keep-turns", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=6000)
+    args = parser.parse_args()
+
+    summary_text = ("The user reviewed regional and category sales, researched competitor pricing and retail trends, and had "
+                    "emails drafted to their boss and team with the sales figures. " * 3)
+    summary_llm = FakeLLM(responder=lambda messages, tool_names: AIMessage(content=summary_text))
+    manager = HistoryManager(keep_turns=args.keep_turns, max_tokens=args.max_tokens, summary_llm=summary_llm)
+
+    full = run(args.turns, None)
+    compacted = run(args.turns, manager.as_hook())
+
+    print(f"{'turn':>5}{'full history':>15}{'compacted':>12}")
+    for i in range(args.turns):
+        if i < 5 or (i + 1) % 5 == 0:
+            print(f"{i + 1:>5}{full[i]:>15,}{compacted[i]:>12,}")
+    print(f"{'total':>5}{sum(full):>15,}{sum(compacted):>12,}  ({1 - sum(compacted) / sum(full):.0%} fewer prompt tokens)")
+    print(f"summary model: {summary_llm.stats['calls']} calls, {summary_llm.stats['prompt_tokens']:,} prompt tokens")
+    print(f"history manager: {manager.stats()}")
+    tokens = check_streaming(summary_llm, summary_text)
+    print(f"streaming: {tokens} token events over 8 compacted turns, none from the history summary")
+
+
+if __name__ == "__main__":
+    main()
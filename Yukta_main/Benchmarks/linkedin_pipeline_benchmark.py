@@ -0,0 +1,79 @@
+"""
+Model calls and latency of one LinkedIn post request: the former ReAct agent vs the deterministic pipeline.
+
+The ReAct baseline rebuilds the agent as it was (generate_linkedin_post and format_linkedin_post_for_display exposed
+as tools): one model call to decide to generate, the post chain call, one to decide to format, one to echo the post.
+The pipeline (create_linkedin_agent) runs generate -> format -> return with only the post chain call. Every model
+call is a FakeLLM call with fixed latency.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.linkedin_pipeline_benchmark --requests 10 --latency 0.5
+"""
+import time
+import uuid
+import argparse
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from Benchmarks.fake_llm import FakeLLM
+from Benchmarks.chain_construction_benchmark import FAKE_POST
+import Agents.linkedin_agent as linkedin_agent
+
+REQUESTS = [
+    "Write a LinkedIn post announcing our new AI course",
+    "Create a LinkedIn post about finishing my internship",
+    "Draft a LinkedIn post celebrating the team's hackathon win",
+]
+
+
+def react_responder(messages, tool_names):
+    """The former agent loop: generate, then format the generated post, then echo the formatted post."""
+    last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    outputs = {m.name: m.content for m in messages[last_human + 1:] if isinstance(m, ToolMessage)}
+    if "format_linkedin_post_for_display" in outputs:
+        return AIMessage(content=outputs["format_linkedin_post_for_display"])
+    if "generate_linkedin_post" in outputs:
+        name, args = "format_linkedin_post_for_display", {"post_obj": FAKE_POST}
+    else:
+        name, args = "generate_linkedin_post", {"user_input": messages[last_human].content}
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+
+def build_react_agent(agent_llm):
+    return create_react_agent(model=agent_llm, tools=[tool(linkedin_agent.generate_linkedin_post), tool(linkedin_agent.format_linkedin_post_for_display)],
+                              prompt="You are a specialized LinkedIn Post Creation and Formatting Agent.", name="linkedin_agent")
+
+
+def run(graph, requests):
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        result = graph.invoke({"messages": [HumanMessage(content=REQUESTS[i % len(REQUESTS)])]})
+        latencies.append(time.perf_counter() - start)
+    return latencies, result["messages"][-1].content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per LLM call.")
+    args = parser.parse_args()
+
+    chain_llm = FakeLLM(latency=args.latency, structured_outputs={"LinkedIn posts": FAKE_POST})
+    agent_llm = FakeLLM(latency=args.latency, responder=react_responder)
+    agent_llm.stats = chain_llm.stats # One call counter for both models
+    linkedin_agent.init_linkedin_agent(chain_llm)
+
+    print(f"{'agent':<24}{'model calls/request':>21}{'mean latency':>14}")
+    outputs = []
+    for name, graph in (("ReAct (format as tool)", build_react_agent(agent_llm)), ("pipeline", linkedin_agent.create_linkedin_agent())):
+        calls_before = chain_llm.stats["calls"]
+        latencies, output = run(graph, args.requests)
+        outputs.append(output)
+        print(f"{name:<24}{(chain_llm.stats['calls'] - calls_before) / args.requests:>21.1f}{sum(latencies) / len(latencies):>13.2f}s")
+    print(f"identical formatted post: {outputs[0] == outputs[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Sockets, rate-limit errors and latency of LLM calls with one client per role vs the shared ModelRegistry.
+
+A local OpenAI-compatible server answers chat completions after a fixed latency and, like the real API, rejects a
+request with 429 (and a Retry-After) when more than --capacity requests for the same model are in flight. It counts
+the TCP connections it accepts. Concurrent users then call the nine roles of initialize_yukta_graph (most of them the
+same model with the same settings) through:
+
+    per-role clients  - a ChatOpenAI per role, each with its own httpx client and connection pool
+    registry          - ModelRegistry: one instance per (model, settings), one shared pool, per-model concurrency limit
+
+A last check saturates the admission controller's OpenAI cap and asserts that a call which cannot get a slot fails
+once, after the downstream timeout, with the Overloaded message meant for the user (not after the SDK's retries with
+a generic connection error).
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.model_registry_benchmark --users 32 --calls 4 --capacity 8 --latency 0.2
+"""
+import json
+import time
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from langchain_openai import ChatOpenAI
+
+from Utils.admission import PriorityLimiter, find_overloaded
+from Utils.model_registry import ModelRegistry
+
+# (role, model, settings) as initialize_yukta_graph resolves them with the default llm_config and model tiers
+ROLES = [
+    ("rag_answer", "gpt-4o", {}),
+    ("rag_agent", "gpt-4o-mini", {}),
+    ("research", "gpt-4o", {}),
+    ("linkedin", "gpt-4o", {"temperature": 0.8}),
+    ("email_writer", "gpt-4o", {"temperature": 0.7}),
+    ("email_reviewer", "gpt-4o", {}),
+    ("sales", "gpt-4o", {}),
+    ("calendar", "gpt-4o-mini", {}),
+    ("yukta_prime", "gpt-4o-mini", {}),
+]
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, capacity):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.counters = {"connections": 0, "requests": 0, "rate_limited": 0}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def reset(self):
+        with self.lock:
+            self.counters = {key: 0 for key in self.counters}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.counters["connections"] += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        model, server = request["model"], self.server
+        with server.lock:
+            server.counters["requests"] += 1
+            if server.in_flight.get(model, 0) >= server.capacity:
+                server.counters["rate_limited"] += 1
+                rejected = True
+            else:
+                server.in_flight[model] = server.in_flight.get(model, 0) + 1
+                rejected = False
+        if rejected:
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                       {"retry-after-ms": "250"})
+            return
+        try:
+            time.sleep(server.latency)
+            self._send(200, {
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 1, "total_tokens": 13},
+            })
+        finally:
+            with server.lock:
+                server.in_flight[model] -= 1
+
+
+def per_role_clients(url, max_retries):
+    return {role: ChatOpenAI(model=model, base_url=url, api_key="bench", max_retries=max_retries, http_client=httpx.Client(),
+                             http_async_client=httpx.AsyncClient(), **settings)
+            for role, model, settings in ROLES}
+
+
+def registry_clients(url, max_retries, capacity):
+    registry = ModelRegistry(model_class=lambda **kwargs: ChatOpenAI(base_url=url, api_key="bench", **kwargs),
+                             default_concurrency=capacity, max_retries=max_retries)
+    return {role: registry.get(model, **settings) for role, model, settings in ROLES}, registry
+
+
+def run_load(clients, users, calls):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def user(index):
+        for call in range(calls):
+            role = ROLES[(index + call) % len(ROLES)][0]
+            start = time.perf_counter()
+            try:
+                clients[role].invoke(f"user {index} call {call}")
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(user, range(users)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def check_shedding(url, max_retries, timeout=0.3):
+    """Calls a model while the only OpenAI slot is taken; returns (seconds to the error, the error)."""
+    limiter = PriorityLimiter("openai", 1)
+    registry = ModelRegistry(model_class=lambda **kwargs: ChatOpenAI(base_url=url, api_key="bench", **kwargs),
+                             max_retries=max_retries, downstream=limiter, downstream_timeout={"interactive": timeout})
+    model = registry.get("gpt-4o-mini")
+    limiter.acquire()
+    start = time.perf_counter()
+    try:
+        model.invoke("hello")
+    except Exception as e:
+        return time.perf_counter() - start, e
+    finally:
+        limiter.release()
+        registry.close()
+    raise AssertionError("the call got an OpenAI slot although the only one was taken")
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=4, help="Calls per user, spread over the roles")
+    parser.add_argument("--capacity", type=int, default=8, help="Concurrent requests per model the server accepts")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-retries", type=int, default=2)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.latency, args.capacity)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    registry, rows = None, []
+    try:
+        shed_seconds, shed_error = check_shedding(server.url, max_retries=4)
+        for label in ("per-role clients", "registry"):
+            server.reset()
+            if label == "registry":
+                clients, registry = registry_clients(server.url, args.max_retries, args.capacity)
+            else:
+                clients = per_role_clients(server.url, args.max_retries)
+            latencies, errors, wall = run_load(clients, args.users, args.calls)
+            instances = len({id(client) for client in clients.values()})
+            rows.append((label, instances, dict(server.counters), latencies, errors, wall))
+    finally:
+        server.shutdown()
+
+    total = args.users * args.calls
+    print(f"{total} calls from {args.users} users over {len(ROLES)} roles, server capacity {args.capacity}/model, latency {args.latency}s")
+    print(f"{'clients':<18}{'models':>7}{'sockets':>9}{'HTTP reqs':>11}{'429s':>6}{'failed':>8}{'p50':>8}{'p95':>8}{'wall':>8}")
+    for label, instances, counters, latencies, errors, wall in rows:
+        print(f"{label:<18}{instances:>7}{counters['connections']:>9}{counters['requests']:>11}{counters['rate_limited']:>6}"
+              f"{len(errors):>8}{statistics.median(latencies) if latencies else 0:>7.2f}s{_percentile(latencies, 0.95):>7.2f}s{wall:>7.2f}s")
+    stats = registry.stats()
+    print(f"registry pool: {stats['requests']} requests over {stats['new_connections']} new sockets "
+          f"({stats['reuse_rate']:.0%} reused), {stats['open_connections']} open / {stats['idle_connections']} idle, "
+          f"http2={stats['http2']}, queued locally: " + ", ".join(f"{model} {counters['queued']}" for model, counters in stats["by_model"].items()))
+
+    overloaded = find_overloaded(shed_error)
+    assert overloaded is not None, f"a shed call surfaced as {type(shed_error).__name__}: {shed_error}"
+    assert str(overloaded).startswith("The OpenAI service is busy"), str(overloaded)
+    assert shed_seconds < 0.6, f"the shed call took {shed_seconds:.2f}s: it was retried"
+    print(f"shedding: {type(shed_error).__name__} after {shed_seconds:.2f}s (max_retries=4): {overloaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+End-to-end latency of multi-domain requests: sequential Yukta Prime vs the planner/executor mode.
+
+Supervisors are stand-in graphs that take a fixed time (simulating their own agent + tool + LLM work); every
+Yukta Prime / planner / synthesizer LLM call is a FakeLLM call with fixed latency. The sequential mode is the real
+create_supervisor hierarchy delegating one step at a time; the plan mode is build_plan_executor_graph.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.plan_executor_benchmark --llm-latency 0.3 --supervisor-latency 1.0
+"""
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, MessagesState, START, END
+from langgraph_supervisor import create_supervisor
+
+from Benchmarks.fake_llm import FakeLLM
+from Utils.plan_executor import build_plan_executor_graph
+
+SCENARIOS = [
+    ("Get sales by region AND find my calendar events this week AND research competitor X", [
+        {"id": "s1", "supervisor": "company_supervisor", "instruction": "Get total sales by region", "depends_on": []},
+        {"id": "s2", "supervisor": "personal_supervisor", "instruction": "Find my calendar events this week", "depends_on": []},
+        {"id": "s3", "supervisor": "communication_supervisor", "instruction": "Research competitor X", "depends_on": []},
+    ]),
+    ("Email my boss the sales of each region, and list my calendar events this week", [
+        {"id": "s1", "supervisor": "company_supervisor", "instruction": "Get total sales by region", "depends_on": []},
+        {"id": "s2", "supervisor": "communication_supervisor", "instruction": "Write an email to my boss with these sales figures", "depends_on": ["s1"]},
+        {"id": "s3", "supervisor": "personal_supervisor", "instruction": "Find my calendar events this week", "depends_on": []},
+    ]),
+    ("What were the total sales by region?", [
+        {"id": "s1", "supervisor": "company_supervisor", "instruction": "Get total sales by region", "depends_on": []},
+    ]),
+]
+
+
+def fake_supervisor(name, latency):
+    def work(state):
+        time.sleep(latency)
+        return {"messages": [AIMessage(content=f"{name} result", name=name)]}
+
+    async def awork(state):
+        await asyncio.sleep(latency)
+        return {"messages": [AIMessage(content=f"{name} result", name=name)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("work", RunnableLambda(work, afunc=awork))
+    builder.add_edge(START, "work")
+    builder.add_edge("work", END)
+    return builder.compile(name=name)
+
+
+def _plan_for(messages):
+    text = "\n".join(m.content for m in messages if isinstance(m.content, str))
+    return next(steps for request, steps in SCENARIOS if request in text)
+
+
+def sequential_responder(messages, tool_names):
+    """Yukta Prime today: hand off to one supervisor per plan step, in order, then answer."""
+    last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    steps = _plan_for(messages[last_human:last_human + 1])
+    done = sum(1 for m in messages[last_human:] if isinstance(m, AIMessage) and m.response_metadata.get("__is_handoff_back"))
+    if done < len(steps):
+        return AIMessage(content="", tool_calls=[{"name": f"transfer_to_{steps[done]['supervisor']}", "args": {}, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+    return AIMessage(content="Here is everything you asked for.")
+
+
+def planner_responder(messages, tool_names):
+    text = messages[-1].content
+    if "planner of 'Yukta Prime'" in text:
+        return AIMessage(content=json.dumps({"steps": _plan_for(messages)}))
+    return AIMessage(content="Here is everything you asked for.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--supervisor-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    supervisors = [fake_supervisor(name, args.supervisor_latency) for name in ("communication_supervisor", "personal_supervisor", "company_supervisor")]
+    sequential_llm = FakeLLM(latency=args.llm_latency, responder=sequential_responder)
+    sequential = create_supervisor(supervisors, model=sequential_llm, prompt="Yukta Prime", add_handoff_back_messages=True,
+                                   output_mode="full_history").compile(name="yukta_prime")
+    planner_llm = FakeLLM(latency=args.llm_latency, responder=planner_responder)
+    planned = build_plan_executor_graph(planner_llm, supervisors, fallback_graph=sequential)
+
+    print(f"{'request':<62}{'steps':>6}{'sequential':>12}{'plan':>9}{'speed-up':>10}")
+    for request, steps in SCENARIOS:
+        timings = []
+        for graph in (sequential, planned):
+            start = time.perf_counter()
+            graph.invoke({"messages": [HumanMessage(content=request)]})
+            timings.append(time.perf_counter() - start)
+        print(f"{request[:60]:<62}{len(steps):>6}{timings[0]:>11.2f}s{timings[1]:>8.2f}s{timings[0] / timings[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Offline benchmark of RAG retrieval wall-clock: sequential MultiQueryRetriever vs ParallelMultiQueryRetriever.
+
+Uses an InMemoryVectorStore stand-in for Pinecone. Network cost is simulated with a fixed latency per embedding
+request (regardless of batch size, like a real HTTP round trip), per vector search, and per variant-generation LLM call.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.rag_retrieval_benchmark --variants 3 --embed-latency 0.08 --search-latency 0.12
+"""
+import time
+import argparse
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from langchain_core.messages import AIMessage
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain.retrievers.multi_query import MultiQueryRetriever
+
+from Benchmarks.fake_llm import FakeLLM
+from Utils.parallel_retrieval import ParallelMultiQueryRetriever
+
+
+class LatencyEmbedding(Embeddings):
+    """Deterministic embeddings that sleep once per request, to mimic a remote embedding API."""
+
+    def __init__(self, latency, size=128):
+        self.latency = latency
+        self.inner = DeterministicFakeEmbedding(size=size)
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return self.inner.embed_query(text)
+
+
+class LatencyVectorStore(InMemoryVectorStore):
+    """InMemoryVectorStore whose every vector search pays a simulated network round trip."""
+    search_latency = 0.0
+
+    def _similarity_search_with_score_by_vector(self, *args, **kwargs):
+        time.sleep(self.search_latency)
+        return super()._similarity_search_with_score_by_vector(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--embed-latency", type=float, default=0.08)
+    parser.add_argument("--search-latency", type=float, default=0.12)
+    args = parser.parse_args()
+
+    def variants(messages, tool_names):
+        return AIMessage(content="\n".join(f"rephrased question {i}" for i in range(args.variants)))
+
+    llm = FakeLLM(latency=args.llm_latency, responder=variants)
+    embedding = LatencyEmbedding(args.embed_latency)
+    vector_store = LatencyVectorStore(embedding)
+    embedding.latency, vector_store.search_latency = 0.0, 0.0 # no latency while loading the corpus
+    vector_store.add_texts([f"Syllabus chunk {i}: unit {i % 12}, topic {i}" for i in range(500)])
+    embedding.latency, vector_store.search_latency = args.embed_latency, args.search_latency
+
+    sequential = MultiQueryRetriever.from_llm(retriever=vector_store.as_retriever(search_kwargs={'k': 4}), llm=llm, include_original=True)
+    parallel = ParallelMultiQueryRetriever(llm=llm, vector_store=vector_store, embedding=embedding, k=4, num_variants=args.variants)
+
+    for name, retriever in [("sequential MultiQueryRetriever", sequential), ("ParallelMultiQueryRetriever", parallel)]:
+        retriever.invoke("What does unit 3 cover?") # warm-up (thread pool start-up)
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            docs = retriever.invoke("What does unit 3 cover?")
+        elapsed = (time.perf_counter() - start) / args.runs
+        print(f"{name:<32} {elapsed * 1000:8.1f} ms/query  ({len(docs)} docs, {args.variants + 1} queries)")
+
+
+if __name__ == "__main__":
+    main()
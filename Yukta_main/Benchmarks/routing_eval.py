@@ -0,0 +1,214 @@
+"""
+Routing accuracy and latency per model tier, on labelled requests (Benchmarks/routing_examples.jsonl).
+
+Every example is routed at both hops with the real prompts and handoff tools: Yukta Prime must hand off to the
+labelled supervisor, and that supervisor must hand off to the labelled agent. Each hop runs three ways:
+    small   - the routing tier model alone
+    tiered  - EscalatingChatModel from ModelTierPolicy (small first, escalate to the large model)
+    large   - the role's large model alone
+
+Offline (default), the models are FakeLLMs with fixed latencies: the small model routes by keyword and answers in
+text when no keyword matches (as a cheap model does on vague requests), the large model replays the labels. The offline
+numbers therefore show how often the escalation rules fire and what they cost, not how good a real model is; use
+--live to run the same examples against OpenAI. Offline runs also check tiered_chain(): only a parse failure of the
+small model's output is re-run on the large model, and each chain call is counted once.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.routing_eval --small-latency 0.25 --large-latency 0.8
+    python -m Benchmarks.routing_eval --live --small-model gpt-4o-mini --large-model gpt-4o
+"""
+import os
+import json
+import time
+import uuid
+import argparse
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from langgraph_supervisor.handoff import create_handoff_tool
+
+from Benchmarks.fake_llm import FakeLLM
+from Utils.model_tiers import ModelTierPolicy, tiered_chain
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(__file__), "routing_examples.jsonl")
+
+MEMBERS = {
+    "yukta_prime": ["communication_supervisor", "personal_supervisor", "company_supervisor"],
+    "communication_supervisor": ["research_agent", "email_agent", "linkedin_agent"],
+    "personal_supervisor": ["RAG_agent", "calendar_agent"],
+    "company_supervisor": ["SalesDataAgent"],
+}
+
+# Keyword router standing in for the small model: first match wins, no match -> a text answer
+SMALL_MODEL_KEYWORDS = [
+    ("email", ["communication_supervisor", "email_agent"]),
+    ("mail", ["communication_supervisor", "email_agent"]),
+    ("linkedin", ["communication_supervisor", "linkedin_agent"]),
+    ("post", ["communication_supervisor", "linkedin_agent"]),
+    ("research", ["communication_supervisor", "research_agent"]),
+    ("search", ["communication_supervisor", "research_agent"]),
+    ("news", ["communication_supervisor", "research_agent"]),
+    ("calendar", ["personal_supervisor", "calendar_agent"]),
+    ("meeting", ["personal_supervisor", "calendar_agent"]),
+    ("schedule", ["personal_supervisor", "calendar_agent"]),
+    ("appointment", ["personal_supervisor", "calendar_agent"]),
+    ("syllabus", ["personal_supervisor", "RAG_agent"]),
+    ("course", ["personal_supervisor", "RAG_agent"]),
+    ("sales", ["company_supervisor", "SalesDataAgent"]),
+    ("revenue", ["company_supervisor", "SalesDataAgent"]),
+    ("order", ["company_supervisor", "SalesDataAgent"]),
+]
+
+
+def load_examples(path=EXAMPLES_PATH):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_prompts():
+    from yukta_nexus import yukta_nexus_prompt
+    from Supervisors.communication_supervisor import communication_supervisor_prompt
+    from Supervisors.personal_supervisor import personal_supervisor_prompt
+    from Supervisors.company_supervisor import company_supervisor_prompt
+    return {"yukta_prime": yukta_nexus_prompt, "communication_supervisor": communication_supervisor_prompt,
+            "personal_supervisor": personal_supervisor_prompt, "company_supervisor": company_supervisor_prompt}
+
+
+def _handoff(tool_name):
+    return AIMessage(content="", tool_calls=[{"name": tool_name, "args": {}, "id": f"call_{uuid.uuid4().hex[:12]}"}])
+
+
+def _request(messages):
+    return next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+
+
+def small_responder(messages, tool_names):
+    request = _request(messages).lower()
+    for keyword, targets in SMALL_MODEL_KEYWORDS:
+        if keyword in request:
+            for target in targets:
+                tool_name = create_handoff_tool(agent_name=target).name
+                if tool_name in tool_names:
+                    return _handoff(tool_name)
+    return AIMessage(content="Could you tell me a bit more about what you need?")
+
+
+def large_responder_for(examples):
+    labels = {example["request"]: example for example in examples}
+
+    def respond(messages, tool_names):
+        example = labels[_request(messages)]
+        for target in (example["supervisor"], example["agent"]):
+            tool_name = create_handoff_tool(agent_name=target).name
+            if tool_name in tool_names:
+                return _handoff(tool_name)
+        return AIMessage(content="I could not find the right agent for this.")
+
+    return respond
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def evaluate(examples, prompts, policy, small_model, large_model):
+    """Returns {hop: {mode: {"correct", "total", "latencies", "misroutes"}}} and the policy's escalation stats."""
+    results = {}
+    for hop in ("yukta_prime", "supervisor"):
+        for mode in ("small", "tiered", "large"):
+            results.setdefault(hop, {})[mode] = {"correct": 0, "total": 0, "latencies": [], "misroutes": []}
+
+    for hop in ("yukta_prime", "supervisor"):
+        for example in examples:
+            router = "yukta_prime" if hop == "yukta_prime" else example["supervisor"]
+            expected = create_handoff_tool(agent_name=example["supervisor"] if hop == "yukta_prime" else example["agent"]).name
+            tools = [create_handoff_tool(agent_name=member) for member in MEMBERS[router]]
+            messages = [SystemMessage(content=prompts[router]), HumanMessage(content=example["request"])]
+            models = {"small": policy.model_factory(small_model), "tiered": policy.model_for("routing", large_model),
+                      "large": policy.model_factory(large_model)}
+            for mode, model in models.items():
+                start = time.perf_counter()
+                answer = model.bind_tools(tools).invoke(messages)
+                elapsed = time.perf_counter() - start
+                routed = answer.tool_calls[0]["name"] if answer.tool_calls else "(text answer)"
+                counters = results[hop][mode]
+                counters["total"] += 1
+                counters["latencies"].append(elapsed)
+                if routed == expected:
+                    counters["correct"] += 1
+                else:
+                    counters["misroutes"].append((example["request"], expected, routed))
+    return results, policy.stats()
+
+
+def check_tiered_chain():
+    def small(messages, tool_names):
+        request = messages[-1].content
+        if "fail" in request:
+            raise TimeoutError("small model timed out")
+        return AIMessage(content='{"ok": true}' if "json" in request else "not json")
+
+    large = FakeLLM(model_name="large", responder=lambda messages, tool_names: AIMessage(content='{"ok": true}'))
+    fakes = {"small": FakeLLM(model_name="small", responder=small), "large": large}
+    policy = ModelTierPolicy(lambda model, **kwargs: fakes[model], tier_models={"light": "small"})
+    chain = tiered_chain(ChatPromptTemplate.from_messages([("human", "{request}")]), policy.model_for("light", "large"), JsonOutputParser())
+
+    assert chain.invoke({"request": "json please"}) == {"ok": True}
+    assert chain.invoke({"request": "plain text"}) == {"ok": True}
+    try:
+        chain.invoke({"request": "fail"})
+        raise AssertionError("a non-parse error was swallowed by the fallback")
+    except TimeoutError:
+        pass
+    light = policy.stats()["light"]
+    assert light["calls"] == 3 and light["escalations"] == 1 and light["reasons"] == {"parse_failure": 1}, light
+    assert large.stats["calls"] == 1, f"large model calls: {large.stats['calls']}"
+    print("tiered_chain: parse failure escalated once, timeout raised without escalating, 3 calls counted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", default=EXAMPLES_PATH)
+    parser.add_argument("--live", action="store_true", help="Use OpenAI models instead of the offline fakes")
+    parser.add_argument("--small-model", default="gpt-4o-mini")
+    parser.add_argument("--large-model", default="gpt-4o")
+    parser.add_argument("--small-latency", type=float, default=0.25)
+    parser.add_argument("--large-latency", type=float, default=0.8)
+    parser.add_argument("--min-confidence", type=float, default=None)
+    parser.add_argument("--verbose", action="store_true", help="List every misrouted example")
+    args = parser.parse_args()
+
+    examples = load_examples(args.examples)
+    prompts = load_prompts()
+    if args.live:
+        from langchain_openai import ChatOpenAI
+        factory = lambda model, **kwargs: ChatOpenAI(model=model, temperature=0, **kwargs)
+    else:
+        fakes = {args.small_model: FakeLLM(model_name=args.small_model, latency=args.small_latency, responder=small_responder),
+                 args.large_model: FakeLLM(model_name=args.large_model, latency=args.large_latency, responder=large_responder_for(examples))}
+        factory = lambda model, **kwargs: fakes[model]
+    policy = ModelTierPolicy(factory, tier_models={"routing": args.small_model}, min_confidence=args.min_confidence)
+
+    results, tier_stats = evaluate(examples, prompts, policy, args.small_model, args.large_model)
+
+    print(f"{len(examples)} labelled requests, small={args.small_model}, large={args.large_model}, {'live' if args.live else 'offline'}")
+    print(f"{'hop':<14}{'mode':<8}{'accuracy':>10}{'mean':>9}{'p95':>9}")
+    for hop, modes in results.items():
+        for mode, counters in modes.items():
+            latencies = counters["latencies"]
+            print(f"{hop:<14}{mode:<8}{counters['correct'] / counters['total']:>10.0%}"
+                  f"{sum(latencies) / len(latencies):>8.2f}s{_percentile(latencies, 0.95):>8.2f}s")
+    routing = tier_stats.get("routing", {})
+    print(f"escalations: {routing.get('escalations', 0)}/{routing.get('calls', 0)} routing calls "
+          f"({routing.get('escalation_rate', 0.0):.0%}), reasons: {routing.get('reasons', {})}")
+    if args.verbose:
+        for hop, modes in results.items():
+            for request, expected, routed in modes["tiered"]["misroutes"]:
+                print(f"  tiered {hop}: '{request}' -> {routed} (expected {expected})")
+    if not args.live:
+        check_tiered_chain()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark of sales schema introspection: SQLDatabase.get_table_info() vs the on-disk SchemaSnapshotCache.
+
+Builds a local SQLite 'sales' table, then times a "session restart" (new SQLDatabase + first table_info lookup) and a
+repeated sql_db_schema lookup, with and without the snapshot cache. Then checks that a column added to the table is
+picked up on the next fingerprint check and reported through on_change (which clears the agent's question -> SQL cache).
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.schema_cache_benchmark --rows 200000
+"""
+import os
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from langchain_community.utilities import SQLDatabase
+
+from Utils.schema_cache import SchemaSnapshotCache
+
+
+def _build_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, region TEXT, category TEXT, product TEXT, "
+                 "quantity INTEGER, total_sale REAL, sale_date TEXT, updated_at TEXT)")
+    conn.executemany("INSERT INTO sales (region, category, product, quantity, total_sale, sale_date, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     [(random.choice("NSEW"), random.choice(["Electronics", "Accessories", "Software"]), f"P{i % 500}",
+                       random.randint(1, 9), random.random() * 1000, "2025-06-21", "2025-06-21") for i in range(rows)])
+    conn.commit()
+    conn.close()
+
+
+def _avg(func, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs
+
+
+def check_schema_change(db_uri, cache_dir):
+    changes = []
+    cache = SchemaSnapshotCache(db_uri, cache_dir=cache_dir, verify_interval=0, on_change=changes.append)
+    db = SQLDatabase.from_uri(db_uri, lazy_table_reflection=True)
+    cache.get_table_info(db, ['sales'])
+    assert not changes, f"unchanged schema reported as changed: {changes}"
+    with sqlite3.connect(db_uri.removeprefix("sqlite:///")) as conn:
+        conn.execute("ALTER TABLE sales ADD COLUMN discount REAL")
+    table_info = cache.get_table_info(db, ['sales'])
+    assert "discount" in table_info, "added column missing from the table info"
+    assert changes == [['sales']], f"on_change calls: {changes}"
+    cache.refresh(db, ['sales'])
+    assert changes[-1] == ['sales'] and len(changes) == 2, f"on_change calls after refresh: {changes}"
+    print("schema change: new column picked up, on_change called on change and on refresh")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = f"sqlite:///{os.path.join(tmp, 'sales.db')}"
+        _build_db(os.path.join(tmp, 'sales.db'), args.rows)
+        cache_dir = os.path.join(tmp, "schema_cache")
+        SchemaSnapshotCache(db_uri, cache_dir=cache_dir).refresh(SQLDatabase.from_uri(db_uri, lazy_table_reflection=True), ['sales'])
+
+        def restart_uncached():
+            SQLDatabase.from_uri(db_uri).get_table_info(table_names=['sales'])
+
+        def restart_cached():
+            db = SQLDatabase.from_uri(db_uri, lazy_table_reflection=True)
+            SchemaSnapshotCache(db_uri, cache_dir=cache_dir).get_table_info(db, ['sales'])
+
+        db = SQLDatabase.from_uri(db_uri)
+        warm_cache = SchemaSnapshotCache(db_uri, cache_dir=cache_dir)
+        lazy_db = SQLDatabase.from_uri(db_uri, lazy_table_reflection=True)
+        warm_cache.get_table_info(lazy_db, ['sales'])
+
+        print(f"{'case':<28}{'uncached (ms)':>16}{'snapshot (ms)':>16}")
+        print(f"{'session restart':<28}{_avg(restart_uncached, args.runs) * 1000:>16.2f}{_avg(restart_cached, args.runs) * 1000:>16.2f}")
+        print(f"{'sql_db_schema per question':<28}{_avg(lambda: db.get_table_info(table_names=['sales']), args.runs) * 1000:>16.2f}"
+              f"{_avg(lambda: warm_cache.get_table_info(lazy_db, ['sales']), args.runs) * 1000:>16.2f}")
+        check_schema_change(db_uri, os.path.join(tmp, "schema_cache_change")) # Cold, so the first lookup reflects the table
+
+
+if __name__ == "__main__":
+    main()
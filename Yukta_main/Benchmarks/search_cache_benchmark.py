@@ -0,0 +1,137 @@
+"""
+Web search calls and latency for a burst of research requests, with and without the search cache.
+
+A fixed number of users research a small set of trending topics at the same time, each phrasing the query slightly
+differently (case, punctuation, spacing). The search backend is FakeSearchBackend with a fixed latency. Without the
+cache every request is a backend call; with it, identical normalized queries are coalesced into one in-flight call
+and later ones are served from the cache. A second cache instance on the same file then shows the results surviving
+a restart.
+
+A last check runs the research agent's web_search_tool against a backend that returns {"error": ...} the way
+TavilySearch does for HTTP errors, and asserts that the error reaches the caller and is never cached.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.search_cache_benchmark --users 40 --topics 5 --latency 0.8
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.tools import ToolException
+
+from Agents import research_agent
+from Benchmarks.fake_search import FakeSearchBackend
+from Utils.search_cache import SearchCache, classify_topic
+
+TOPICS = [
+    "latest LangGraph release notes",
+    "what is retrieval augmented generation",
+    "OpenAI pricing for gpt-4o today",
+    "history of the transformer architecture",
+    "current state of AI regulation in the EU",
+    "how does Pinecone serverless indexing work",
+    "retail analytics trends this year",
+    "who invented the relational database",
+]
+
+
+def _phrasings(topic):
+    return [topic, topic.upper(), topic.capitalize() + "?", "  " + topic.replace(" ", "  ") + " ", topic + "!"]
+
+
+def make_queries(users, topics, seed=7):
+    rng = random.Random(seed)
+    return [rng.choice(_phrasings(rng.choice(TOPICS[:topics]))) for _ in range(users)]
+
+
+def run_sync(queries, search):
+    def one(query):
+        start = time.perf_counter()
+        search(query)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        latencies = list(pool.map(one, queries))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(queries, asearch):
+    async def one(query):
+        start = time.perf_counter()
+        await asearch(query)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(query) for query in queries))
+    return time.perf_counter() - start, list(latencies)
+
+
+def _report(name, backend, wall, latencies):
+    print(f"{name:<34}{backend.calls:>9}{wall:>9.2f}s{statistics.median(latencies):>9.2f}s{max(latencies):>9.2f}s")
+
+
+def check_error_results(path):
+    """Error results of the search tool must raise and must not be cached. Returns the backend calls made for 2+2 searches."""
+    backend = research_agent._tavily_search = FakeSearchBackend(latency=0, error_on="outage")
+    research_agent._search_cache = cache = SearchCache(path)
+    for _ in range(2):
+        try:
+            research_agent.web_search_tool.invoke({"query": "news during the outage"})
+        except ToolException as e:
+            assert "failed" in str(e), str(e)
+        else:
+            raise AssertionError("an error result of the search backend was returned as a search result")
+    for _ in range(2):
+        try:
+            asyncio.run(research_agent.web_search_tool.ainvoke({"query": "news during the outage"}))
+        except ToolException:
+            pass
+        else:
+            raise AssertionError("an error result of the search backend was returned as a search result (async)")
+    assert cache.stats()["entries"] == 0, "an error result was cached"
+    assert backend.calls == 4, f"{backend.calls} backend calls for 4 failing searches: an error was served from the cache"
+    return backend.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--topics", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.8, help="Simulated seconds per search call.")
+    args = parser.parse_args()
+
+    queries = make_queries(args.users, args.topics)
+    print(f"{args.users} requests over {args.topics} topics ({', '.join(sorted({classify_topic(t) for t in TOPICS[:args.topics]}))} TTLs)")
+    print(f"{'mode':<34}{'searches':>9}{'wall':>10}{'p50':>10}{'max':>10}")
+
+    backend = FakeSearchBackend(latency=args.latency)
+    wall, latencies = run_sync(queries, lambda q: backend.invoke({"query": q}))
+    _report("no cache (threads)", backend, wall, latencies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search_cache.sqlite")
+        backend, cache = FakeSearchBackend(latency=args.latency), SearchCache(path)
+        wall, latencies = run_sync(queries, lambda q: cache.get_or_fetch(q, lambda x: backend.invoke({"query": x})))
+        _report("cache + coalescing (threads)", backend, wall, latencies)
+
+        backend, cache = FakeSearchBackend(latency=args.latency), SearchCache(os.path.join(tmp, "async.sqlite"))
+        wall, latencies = asyncio.run(run_async(queries, lambda q: cache.aget_or_fetch(q, lambda x: backend.ainvoke({"query": x}))))
+        _report("cache + coalescing (async)", backend, wall, latencies)
+        print(f"cache stats: {cache.stats()}")
+
+        backend, restarted = FakeSearchBackend(latency=args.latency), SearchCache(path)
+        wall, latencies = run_sync(queries, lambda q: restarted.get_or_fetch(q, lambda x: backend.invoke({"query": x})))
+        _report("after restart (same cache file)", backend, wall, latencies)
+
+        calls = check_error_results(os.path.join(tmp, "errors.sqlite"))
+        print(f"error results: {calls} backend calls for 4 failing searches, none cached")
+
+
+if __name__ == "__main__":
+    main()
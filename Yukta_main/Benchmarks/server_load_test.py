@@ -0,0 +1,250 @@
+"""
+Load test of the HTTP server (server.py) with FakeLLM models, so only the serving layer and the graph are measured.
+
+The graph is the supervisor over the email and LinkedIn agents from async_load_test.py. A server process is started
+on a random local port and driven by concurrent clients:
+
+    sse         - conversations of --turns messages each through YuktaClient.astream (POST .../runs/stream)
+    websocket   - the same conversations over /threads/{thread_id}/ws, one socket per conversation
+    backpressure- a burst of single messages against a small queue, without client retries: how many are accepted
+                  and how many are rejected with 429 (and that every accepted one completes)
+    shutdown    - a burst of messages, then the server is told to exit: runs already accepted must still complete
+    retries     - YuktaClient resends a message rejected because the queue was full, and fails at once on a per-user
+                  rate-limit rejection (whose Retry-After is a minute away)
+
+Reported: throughput, turn latency p50/p95 and time to the first graph event (the first supervisor step) per turn.
+
+Usage (from Yukta_main/):
+    python -m Benchmarks.server_load_test --conversations 48 --turns 2 --run-workers 16 --latency 0.1
+"""
+import json
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+import warnings
+import httpx
+import uvicorn
+import websockets
+from langgraph.checkpoint.memory import InMemorySaver
+
+from server import create_app
+from Utils.yukta_client import YuktaClient, YuktaServerError
+from Utils.admission import AdmissionController
+from Benchmarks.async_load_test import build_graph, REQUESTS
+
+
+class BackgroundServer:
+    """uvicorn running create_app(...) on a thread, on a free local port."""
+
+    def __init__(self, app, drain_timeout=30):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning",
+                                                    timeout_graceful_shutdown=drain_timeout))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.servers[0].sockets[0].getsockname()[1]}"
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+    def __exit__(self, *exc):
+        if self.thread.is_alive():
+            self.stop()
+
+
+class TurnTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_event = None
+        self.status = None
+
+    def observe(self, event):
+        if event["type"] == "step" and self.first_event is None:
+            self.first_event = time.perf_counter() - self.start
+        elif event["type"] == "done":
+            self.status = event["status"]
+
+    def result(self):
+        return {"latency": time.perf_counter() - self.start, "first_event": self.first_event, "status": self.status}
+
+
+def _message(conversation, turn):
+    return REQUESTS[(conversation + turn) % len(REQUESTS)]
+
+
+async def sse_conversations(url, conversations, turns, max_retries=10):
+    client = YuktaClient(url, max_retries=max_retries)
+
+    async def conversation(i):
+        results = []
+        for turn in range(turns):
+            timer = TurnTimer()
+            async for event in client.astream(f"sse-{i}", _message(i, turn)):
+                timer.observe(event)
+            results.append(timer.result())
+        return results
+
+    try:
+        return [turn for results in await asyncio.gather(*(conversation(i) for i in range(conversations))) for turn in results]
+    finally:
+        await client.aclose()
+
+
+async def websocket_conversations(url, conversations, turns):
+    ws_url = url.replace("http://", "ws://")
+
+    async def conversation(i):
+        results = []
+        async with websockets.connect(f"{ws_url}/threads/ws-{i}/ws") as socket:
+            for turn in range(turns):
+                timer = TurnTimer()
+                while timer.status is None:
+                    await socket.send(json.dumps({"message": _message(i, turn)}))
+                    while True:
+                        event = json.loads(await socket.recv())
+                        if event["type"] == "error" and event.get("reason") == "queue_full": # Wait and resend
+                            await asyncio.sleep(float(event["retry_after"]))
+                            break
+                        timer.observe(event)
+                        if event["type"] == "done":
+                            break
+                results.append(timer.result())
+        return results
+
+    return [turn for results in await asyncio.gather(*(conversation(i) for i in range(conversations))) for turn in results]
+
+
+async def burst(url, messages, prefix):
+    """One message on each of `messages` threads at once, no retries. Returns (completed statuses, rejections by status code)."""
+    client = YuktaClient(url, max_retries=0)
+    rejected = {}
+
+    async def one(i):
+        timer = TurnTimer()
+        try:
+            async for event in client.astream(f"{prefix}-{i}", _message(i, 0)):
+                timer.observe(event)
+        except YuktaServerError as e:
+            rejected[e.status_code] = rejected.get(e.status_code, 0) + 1
+            return None
+        except httpx.TransportError:
+            rejected["refused"] = rejected.get("refused", 0) + 1
+            return None
+        return timer.status
+
+    try:
+        statuses = [status for status in await asyncio.gather(*(one(i) for i in range(messages))) if status is not None]
+    finally:
+        await client.aclose()
+    return statuses, rejected
+
+
+async def check_retries(url, queue_url):
+    """url: a server allowing one message per user per minute; queue_url: one worker and a queue of one."""
+    client, queued_client = YuktaClient(url, max_retries=3), YuktaClient(queue_url, max_retries=20)
+    try:
+        async for _ in client.astream("rate-0", _message(0, 0), user_id="rate-user"):
+            pass
+        start = time.perf_counter()
+        try:
+            async for _ in client.astream("rate-1", _message(1, 0), user_id="rate-user"):
+                pass
+            raise AssertionError("second message within the user's rate limit was accepted")
+        except YuktaServerError as e:
+            assert e.status_code == 429 and e.reason == "user_rate", (e.status_code, e.reason)
+        rejected_after = time.perf_counter() - start
+        assert rejected_after < 1.0, f"user-rate rejection took {rejected_after:.2f}s (retried?)"
+
+        async def one(i):
+            timer = TurnTimer()
+            async for event in queued_client.astream(f"queued-{i}", _message(i, 0)):
+                timer.observe(event)
+            return timer.status
+
+        statuses = await asyncio.gather(*(one(i) for i in range(4)))
+        assert statuses == ["completed"] * 4, statuses
+    finally:
+        await client.aclose()
+        await queued_client.aclose()
+    print(f"retries: user-rate 429 raised after {rejected_after:.2f}s without retrying, 4 messages through a queue of 1 all completed")
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def report(label, results, wall):
+    latencies = [r["latency"] for r in results]
+    first_events = [r["first_event"] for r in results if r["first_event"] is not None]
+    failed = sum(1 for r in results if r["status"] != "completed")
+    print(f"{label:<11}{len(results):>7}{failed:>8}{len(results) / wall:>11.1f}/s{statistics.median(latencies):>8.2f}s"
+          f"{_percentile(latencies, 0.95):>8.2f}s{statistics.median(first_events) if first_events else 0:>10.3f}s{wall:>8.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=48)
+    parser.add_argument("--turns", type=int, default=2, help="Messages per conversation, sent one after the other")
+    parser.add_argument("--run-workers", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per fake LLM call")
+    parser.add_argument("--burst", type=int, default=40, help="Simultaneous messages of the backpressure and shutdown runs")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    graph, llm_stats = build_graph(args.latency, InMemorySaver())
+    no_stats = lambda: {}
+
+    def app(**kwargs):
+        return create_app(graph_factory=lambda: graph, stats_fn=no_stats, **kwargs)
+
+    print(f"{args.conversations} conversations x {args.turns} turns, {args.run_workers} run workers, "
+          f"queue {args.max_queue}, fake LLM latency {args.latency}s")
+    print(f"{'transport':<11}{'turns':>7}{'failed':>8}{'throughput':>13}{'p50':>9}{'p95':>9}{'1st event':>11}{'wall':>9}")
+    with BackgroundServer(app(run_workers=args.run_workers, max_queue=args.max_queue)) as server:
+        for label, load in (("sse", sse_conversations), ("websocket", websocket_conversations)):
+            start = time.perf_counter()
+            results = asyncio.run(load(server.url, args.conversations, args.turns))
+            report(label, results, time.perf_counter() - start)
+        run_stats = httpx.get(f"{server.url}/stats").json()["runs"]
+        print(f"server: {run_stats['completed']} runs completed, queue wait p95 {run_stats['queue_wait_p95_s']:.2f}s, "
+              f"run p50 {run_stats['run_p50_s']:.2f}s, {llm_stats['calls']} fake LLM calls")
+
+    small_workers, small_queue = 2, 4
+    with BackgroundServer(app(run_workers=small_workers, max_queue=small_queue)) as server:
+        statuses, rejected = asyncio.run(burst(server.url, args.burst, "burst"))
+    print(f"backpressure ({small_workers} workers, queue {small_queue}): {len(statuses)} of {args.burst} accepted "
+          f"({statuses.count('completed')} completed), rejected: {rejected}")
+
+    server = BackgroundServer(app(run_workers=small_workers, max_queue=args.burst)).__enter__()
+
+    async def burst_then_stop():
+        runs = asyncio.create_task(burst(server.url, args.burst, "drain"))
+        while httpx.get(f"{server.url}/stats").json()["runs"]["submitted"] < args.burst:
+            await asyncio.sleep(0.01)
+        stop_start = time.perf_counter()
+        await asyncio.to_thread(server.stop)
+        return await runs, time.perf_counter() - stop_start
+
+    (statuses, rejected), drain_seconds = asyncio.run(burst_then_stop())
+    print(f"shutdown with {args.burst} runs accepted: {statuses.count('completed')} completed while draining "
+          f"({drain_seconds:.2f}s), lost: {args.burst - statuses.count('completed')}, rejected: {rejected}")
+
+    rate_limited = AdmissionController(user_rate_per_minute=1, user_burst=1)
+    with BackgroundServer(app(admission=rate_limited)) as server, BackgroundServer(app(run_workers=1, max_queue=1)) as queue_server:
+        asyncio.run(check_retries(server.url, queue_server.url))
+
+
+if __name__ == "__main__":
+    main()
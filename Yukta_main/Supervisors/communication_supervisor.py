@@ -1,20 +1,24 @@
 from langgraph_supervisor import create_supervisor
 
+MODEL_TIER = "routing" # Only delegates and relays agent output
+
 _llm = None
 _research_agent_instance = None
 _email_agent_instance = None
 _linkedin_agent_instance = None
+_history_hook = None
 
-def init_communication_supervisor(llm_model, research_agent_obj, email_agent_obj, linkedin_agent_obj):
+def init_communication_supervisor(llm_model, research_agent_obj, email_agent_obj, linkedin_agent_obj, history_hook=None):
     """
     Initializes global dependencies for the Communication Supervisor.
     This function should be called once from yukta_nexus.py.
     """
-    global _llm, _research_agent_instance, _email_agent_instance, _linkedin_agent_instance
+    global _llm, _research_agent_instance, _email_agent_instance, _linkedin_agent_instance, _history_hook
     _llm = llm_model
     _research_agent_instance = research_agent_obj
     _email_agent_instance = email_agent_obj
     _linkedin_agent_instance = linkedin_agent_obj
+    _history_hook = history_hook
 
 communication_supervisor_prompt = """
 You are the Communication Supervisor within the 'Yukta' AI Assistant. Your primary responsibility is to manage tasks related to external communication, content generation, and general web research.
@@ -49,6 +53,7 @@ def create_communication_supervisor_graph():
         model = _llm,
         agents = [_research_agent_instance, _email_agent_instance, _linkedin_agent_instance], # Use the *instances*
         prompt = communication_supervisor_prompt,
+        pre_model_hook=_history_hook,
         add_handoff_back_messages=True,
         output_mode="full_history",
     ).compile(name="communication_supervisor") # No checkpointer here, yukta_nexus will handle global checkpointer
@@ -1,17 +1,21 @@
 from langgraph_supervisor import create_supervisor
 
+MODEL_TIER = "routing" # Only delegates and relays agent output
+
 _llm = None
 _sales_data_agent_instance = None
+_history_hook = None
 
 
-def init_company_supervisor(llm_model, sales_data_agent_obj):
+def init_company_supervisor(llm_model, sales_data_agent_obj, history_hook=None):
     """
     Initializes global dependencies for the Company Supervisor.
     This function should be called once from yukta_nexus.py.
     """
-    global _llm, _sales_data_agent_instance
+    global _llm, _sales_data_agent_instance, _history_hook
     _llm = llm_model
     _sales_data_agent_instance = sales_data_agent_obj
+    _history_hook = history_hook
 
 company_supervisor_prompt = """
 You are the Company Supervisor within the 'Yukta' AI Assistant. Your primary responsibility is to manage tasks related to company sales data, business insights, and internal operations.
@@ -43,6 +47,7 @@ def create_company_supervisor_graph():
         model = _llm,
         agents = [_sales_data_agent_instance], # Use the *instance* passed via init_company_supervisor
         prompt = company_supervisor_prompt,
+        pre_model_hook=_history_hook,
         add_handoff_back_messages=True,
         output_mode="full_history",
     ).compile(name="company_supervisor") # No checkpointer here, yukta_nexus will handle global checkpointer
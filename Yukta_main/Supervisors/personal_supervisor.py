@@ -1,18 +1,22 @@
 from langgraph_supervisor import create_supervisor
 
+MODEL_TIER = "routing" # Only delegates and relays agent output
+
 _llm = None
 _RAG_agent_instance = None
 _calendar_agent_instance = None
+_history_hook = None
 
-def init_personal_supervisor(llm_model, RAG_agent_obj, calendar_agent_object):
+def init_personal_supervisor(llm_model, RAG_agent_obj, calendar_agent_object, history_hook=None):
     """
     Initializes global dependencies for the Personal Supervisor.
     This function should be called once from yukta_nexus.py.
     """
-    global _llm, _RAG_agent_instance, _calendar_agent_instance
+    global _llm, _RAG_agent_instance, _calendar_agent_instance, _history_hook
     _llm = llm_model
     _RAG_agent_instance = RAG_agent_obj
     _calendar_agent_instance = calendar_agent_object
+    _history_hook = history_hook
     
 
 personal_supervisor_prompt = """
@@ -49,6 +53,7 @@ def create_personal_supervisor_graph():
         model = _llm,
         agents = [_RAG_agent_instance, _calendar_agent_instance], # Use the *instances*
         prompt = personal_supervisor_prompt,
+        pre_model_hook=_history_hook,
         add_handoff_back_messages=True,
         output_mode="full_history",
     ).compile(name="personal_supervisor") # No checkpointer here, yukta_nexus will handle global checkpointer
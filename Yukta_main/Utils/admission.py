@@ -0,0 +1,361 @@
+"""
+Admission control in front of the Yukta graph.
+
+Every chat message starts a chain of model and tool calls, so under peak load the first thing to run out is not the
+server but the services behind it (OpenAI's rate limits, Tavily, Pinecone, Postgres, Google Calendar). Without a
+gate, every message starts anyway and every user slows down together. AdmissionController decides at the door:
+
+    - a token bucket per user (thread) limits how fast one user can send messages;
+    - max_active_runs caps the runs admitted and not finished yet; batch runs may hold at most batch_share of them;
+    - a run is shed when a downstream service already has max_downstream_waiting calls queued for it (a batch run is
+      shed as soon as interactive calls are queued anywhere).
+
+The capacity and downstream checks come before the user's token bucket, so a message shed because Yukta is overloaded
+does not count against the user's rate.
+
+A rejected message raises Overloaded, whose text is meant for the user and whose retry_after is in seconds, instead of
+waiting until something times out.
+
+Admitted runs still go through a concurrency cap per downstream service (PriorityLimiter). Batch work may hold at most
+batch_share of a service's slots and never takes a slot while interactive work waits for one. The OpenAI cap is
+applied in ModelRegistry's transport; the tools wrap their Tavily, Pinecone, Postgres and Calendar calls in
+downstream_slot(name). The priority of the current run is a context variable (admission_priority), so it follows the
+run into LangGraph's tasks and tool threads without being passed around.
+"""
+import math
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+
+PRIORITIES = ("interactive", "batch")
+DOWNSTREAMS = ("openai", "tavily", "pinecone", "postgres", "google_calendar")
+DEFAULT_DOWNSTREAM_LIMITS = {"openai": 32, "tavily": 8, "pinecone": 16, "postgres": 8, "google_calendar": 4}
+DOWNSTREAM_LABELS = {"openai": "language model", "tavily": "web search", "pinecone": "document search",
+                     "postgres": "sales database", "google_calendar": "Google Calendar"}
+
+_current_priority = contextvars.ContextVar("yukta_admission_priority", default="interactive")
+_controller = None
+
+
+class Overloaded(Exception):
+    """A message or call that was shed. str(e) is shown to the user."""
+
+    def __init__(self, message, reason, retry_after):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def find_overloaded(error):
+    """The Overloaded that error is or was raised from (a client library may wrap it), or None."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, Overloaded):
+            return error
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def set_admission_controller(controller):
+    """Makes controller the one downstream_slot() and the model registry use (None disables admission control)."""
+    global _controller
+    _controller = controller
+
+
+def get_admission_controller():
+    return _controller
+
+
+def current_priority():
+    return _current_priority.get()
+
+
+@contextmanager
+def admission_priority(priority):
+    """Runs the block, and everything it starts, with the given priority class."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@contextmanager
+def downstream_slot(name):
+    """Holds a slot of the named downstream service for the block; a no-op without an admission controller."""
+    if _controller is None:
+        yield
+        return
+    with _controller.downstream(name):
+        yield
+
+
+@asynccontextmanager
+async def adownstream_slot(name):
+    if _controller is None:
+        yield
+        return
+    async with _controller.adownstream(name):
+        yield
+
+
+class TokenBucket:
+    """rate tokens per second, at most capacity stored. Not thread-safe on its own; AdmissionController locks it."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Takes a token. Returns 0 on success, otherwise the seconds until the next token."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PriorityLimiter:
+    """Concurrency cap of one downstream service, shared by threads and by tasks on any event loop."""
+
+    def __init__(self, name, limit, batch_share=0.5):
+        self.name = name
+        self.limit = limit
+        self.batch_limit = max(1, int(limit * batch_share))
+        self._cond = threading.Condition()
+        self._in_use = {priority: 0 for priority in PRIORITIES}
+        self._waiting = {priority: 0 for priority in PRIORITIES}
+        self._held_seconds = 0.0
+        self.counters = {"calls": 0, "waited": 0, "wait_seconds": 0.0, "timeouts": 0, "peak_in_use": 0}
+
+    def _available(self, priority):
+        if sum(self._in_use.values()) >= self.limit:
+            return False
+        if priority == "batch":
+            return self._in_use["batch"] < self.batch_limit and not self._waiting["interactive"]
+        return True
+
+    def _take(self, priority, waited):
+        self._in_use[priority] += 1
+        self.counters["calls"] += 1
+        self.counters["peak_in_use"] = max(self.counters["peak_in_use"], sum(self._in_use.values()))
+        if waited:
+            self.counters["waited"] += 1
+            self.counters["wait_seconds"] += waited
+
+    def acquire(self, priority="interactive", timeout=None):
+        """Takes a slot, waiting up to timeout seconds (None: forever). Returns False on timeout."""
+        with self._cond:
+            if self._available(priority):
+                self._take(priority, 0.0)
+                return True
+            self._waiting[priority] += 1
+            start = time.perf_counter()
+            try:
+                acquired = self._cond.wait_for(lambda: self._available(priority), timeout)
+            finally:
+                self._waiting[priority] -= 1
+            if not acquired:
+                self.counters["timeouts"] += 1
+                return False
+            self._take(priority, time.perf_counter() - start)
+            return True
+
+    async def aacquire(self, priority="interactive", timeout=None):
+        # Polling, like ConcurrencyLimiter.aacquire, keeps one limiter usable from threads and every event loop
+        with self._cond:
+            if self._available(priority):
+                self._take(priority, 0.0)
+                return True
+            self._waiting[priority] += 1
+        start, delay = time.perf_counter(), 0.005
+        try:
+            while True:
+                await asyncio.sleep(delay)
+                with self._cond:
+                    if self._available(priority):
+                        self._take(priority, time.perf_counter() - start)
+                        return True
+                    if timeout is not None and time.perf_counter() - start >= timeout:
+                        self.counters["timeouts"] += 1
+                        return False
+                delay = min(delay * 2, 0.05)
+        finally:
+            with self._cond:
+                self._waiting[priority] -= 1
+
+    def release(self, priority="interactive", held_seconds=None):
+        with self._cond:
+            self._in_use[priority] -= 1
+            if held_seconds is not None:
+                self._held_seconds += held_seconds
+            self._cond.notify_all()
+
+    def waiting(self, priority=None):
+        return self._waiting[priority] if priority else sum(self._waiting.values())
+
+    def retry_after(self):
+        """Rough seconds until the calls queued now have been served."""
+        mean_hold = self._held_seconds / self.counters["calls"] if self.counters["calls"] else 1.0
+        return max(1, math.ceil(mean_hold * (self.waiting() + 1) / self.limit))
+
+    def stats(self):
+        with self._cond:
+            return {**self.counters, "limit": self.limit, "batch_limit": self.batch_limit,
+                    "in_use": dict(self._in_use), "waiting": dict(self._waiting)}
+
+
+class AdmissionTicket:
+    """An admitted run. release() (or leaving the with block) frees its active-run slot; releasing twice is harmless."""
+
+    def __init__(self, controller, user_id, priority):
+        self.controller = controller
+        self.user_id = user_id
+        self.priority = priority
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller._release_run(self.priority)
+
+    def __enter__(self):
+        self._token = _current_priority.set(self.priority)
+        return self
+
+    def __exit__(self, *exc):
+        _current_priority.reset(self._token)
+        self.release()
+
+
+class AdmissionController:
+    """
+    user_rate_per_minute / user_burst:    messages a user may send per minute / at once.
+    batch_rate_per_minute / batch_burst:  the same for batch jobs, per job owner.
+    max_active_runs:                      runs admitted and not finished yet; batch runs may hold at most batch_share of them.
+    downstream_limits:                    {downstream: concurrent calls} for DOWNSTREAMS (missing ones are unlimited).
+    max_downstream_waiting:               calls queued on one downstream beyond which new runs are shed.
+    downstream_timeout:                   {priority: seconds} a call may wait for a downstream slot before it is shed.
+    max_users:                            token buckets kept (least recently used are dropped).
+    """
+
+    def __init__(self, user_rate_per_minute=20, user_burst=5, batch_rate_per_minute=600, batch_burst=50,
+                 max_active_runs=32, batch_share=0.5, downstream_limits=None, max_downstream_waiting=16,
+                 downstream_timeout=None, max_users=10000):
+        self.rates = {"interactive": (user_rate_per_minute / 60.0, user_burst), "batch": (batch_rate_per_minute / 60.0, batch_burst)}
+        self.max_active_runs = max_active_runs
+        self.max_batch_runs = max(1, int(max_active_runs * batch_share))
+        self.max_downstream_waiting = max_downstream_waiting
+        self.downstream_timeout = {"interactive": 30.0, "batch": 120.0, **(downstream_timeout or {})}
+        self.max_users = max_users
+        limits = DEFAULT_DOWNSTREAM_LIMITS if downstream_limits is None else downstream_limits
+        self.limiters = {name: PriorityLimiter(name, limit, batch_share) for name, limit in limits.items() if limit}
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._active = {priority: 0 for priority in PRIORITIES}
+        self.stats_counters = {"admitted": 0, "rejected_user_rate": 0, "rejected_capacity": 0, "rejected_downstream": 0,
+                               "shed_downstream_calls": 0}
+
+    # ---------- runs ----------
+
+    def _bucket(self, user_id, priority):
+        key = (priority, user_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*self.rates[priority])
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _saturated_downstream(self, priority):
+        for limiter in self.limiters.values():
+            if limiter.waiting() >= self.max_downstream_waiting or (priority == "batch" and limiter.waiting("interactive")):
+                return limiter
+        return None
+
+    def admit(self, user_id, priority="interactive"):
+        """Admits a run of user_id or raises Overloaded. Use the ticket as a context manager around the run."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Use one of {PRIORITIES}.")
+        with self._lock:
+            # Capacity and downstream saturation are checked first: a message shed for them must not cost the user a token
+            cap = self.max_active_runs if priority == "interactive" else self.max_batch_runs
+            if sum(self._active.values()) >= self.max_active_runs or self._active[priority] >= cap:
+                self.stats_counters["rejected_capacity"] += 1
+                raise Overloaded("Yukta is at capacity right now. Please try again in a few seconds.", "capacity", 5)
+            saturated = self._saturated_downstream(priority)
+            if saturated is not None:
+                self.stats_counters["rejected_downstream"] += 1
+                retry_after = saturated.retry_after()
+                raise Overloaded(f"Yukta's {DOWNSTREAM_LABELS.get(saturated.name, saturated.name)} service is at capacity right now. "
+                                 f"Please try again in {retry_after}s.", f"downstream:{saturated.name}", retry_after)
+            wait = self._bucket(user_id, priority).take()
+            if wait:
+                self.stats_counters["rejected_user_rate"] += 1
+                raise Overloaded(f"You are sending messages faster than Yukta can answer them. Please wait {math.ceil(wait)}s and try again.",
+                                 "user_rate", math.ceil(wait))
+            self._active[priority] += 1
+            self.stats_counters["admitted"] += 1
+        return AdmissionTicket(self, user_id, priority)
+
+    def _release_run(self, priority):
+        with self._lock:
+            self._active[priority] -= 1
+
+    # ---------- downstream calls ----------
+
+    def _shed_call(self, limiter):
+        with self._lock:
+            self.stats_counters["shed_downstream_calls"] += 1
+        label = DOWNSTREAM_LABELS.get(limiter.name, limiter.name)
+        return Overloaded(f"The {label} service is busy and did not answer in time. Please try again shortly.",
+                          f"downstream:{limiter.name}", limiter.retry_after())
+
+    @contextmanager
+    def downstream(self, name):
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            yield
+            return
+        priority = current_priority()
+        if not limiter.acquire(priority, self.downstream_timeout[priority]):
+            raise self._shed_call(limiter)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            limiter.release(priority, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def adownstream(self, name):
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            yield
+            return
+        priority = current_priority()
+        if not await limiter.aacquire(priority, self.downstream_timeout[priority]):
+            raise self._shed_call(limiter)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            limiter.release(priority, time.perf_counter() - start)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.stats_counters)
+            stats["active_runs"] = dict(self._active)
+            stats["tracked_users"] = len(self._buckets)
+        stats["max_active_runs"] = self.max_active_runs
+        stats["downstreams"] = {name: limiter.stats() for name, limiter in self.limiters.items()}
+        return stats
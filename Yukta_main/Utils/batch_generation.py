@@ -0,0 +1,164 @@
+"""
+Batch generation of LinkedIn posts and outreach emails, without the Yukta Prime -> supervisor -> agent hops.
+
+Marketing runs produce dozens of variants at a time. Routing every one of them through the conversation graph costs
+two routing calls and an agent loop per item; here the items go straight to the pre-built post chain and email writer
+chain, through Runnable.batch() with bounded concurrency. Each item fails on its own: an error becomes the same
+fallback LinkedInPost / EmailContent object the agents return, and the rest of the batch is unaffected. Batch model
+calls run with the "batch" admission priority (Utils/admission.py), so they yield OpenAI slots to chat users.
+
+Request items (one JSON object per line for the CLI):
+    {"id": "post-1", "kind": "linkedin", "request": "Announce our new AI course"}
+    {"id": "mail-1", "kind": "email", "request": "Invite Acme to our demo day",
+     "applicant_name": "...", "applicant_phone": "...", "applicant_email": "..."}
+
+Result items, in input order:
+    {"id", "kind", "ok", "error", "output" (the structured object as a dict), "text" (formatted for display)}
+
+Usage (from Yukta_main/):
+    python -m Utils.batch_generation --input requests.jsonl --output results.jsonl --concurrency 8
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import Agents.linkedin_agent as linkedin_agent
+import Agents.email_agent as email_agent
+from Utils.admission import admission_priority
+
+KINDS = ("linkedin", "email")
+
+
+def _chain_inputs(item):
+    if item["kind"] == "linkedin":
+        return {'user_input': item["request"]}
+    return {
+        'user_request': item["request"],
+        'applicant_name': item.get("applicant_name") or "N/A",
+        'applicant_phone': item.get("applicant_phone") or "N/A",
+        'applicant_email': item.get("applicant_email") or "N/A",
+    }
+
+
+def _chain(kind):
+    chain = linkedin_agent.linkedin_post_chain if kind == "linkedin" else email_agent.email_writer_chain
+    if chain is None:
+        raise ValueError(f"The {kind} chain is not initialized. Call init_linkedin_agent() / init_email_agent() first.")
+    return chain
+
+
+def _invalid(item):
+    if item.get("kind") not in KINDS:
+        return f"Unknown kind '{item.get('kind')}'. Use one of {KINDS}."
+    if not str(item.get("request") or "").strip():
+        return "Missing 'request'."
+    return None
+
+
+def _result(item, index, output):
+    """Turns a chain output (or the exception raised for this item) into a result row."""
+    result = {"id": item.get("id", index), "kind": item.get("kind"), "ok": True, "error": None}
+    if isinstance(output, Exception):
+        print(f"Batch item {result['id']} failed: {output}")
+        result.update(ok=False, error=str(output))
+        if item.get("kind") == "linkedin":
+            output = linkedin_agent._linkedin_post_error(output)
+        elif item.get("kind") == "email":
+            inputs = _chain_inputs(item)
+            output = email_agent._email_generation_error(output, inputs['applicant_name'], inputs['applicant_phone'], inputs['applicant_email'])
+        else:
+            return {**result, "output": None, "text": None}
+    text = linkedin_agent.format_linkedin_post_for_display(output) if item["kind"] == "linkedin" else email_agent.format_email_for_display(output)
+    return {**result, "output": output.model_dump(), "text": text}
+
+
+def _group(items):
+    """{kind: [index, ...]} of the valid items; invalid items get their error right away."""
+    groups, outputs = {kind: [] for kind in KINDS}, {}
+    for index, item in enumerate(items):
+        error = _invalid(item)
+        if error:
+            outputs[index] = ValueError(error)
+        else:
+            groups[item["kind"]].append(index)
+    return {kind: indices for kind, indices in groups.items() if indices}, outputs
+
+
+def batch_generate(items, max_concurrency=8):
+    """
+    Generates every item of the batch and returns one result per item, in input order.
+    max_concurrency bounds the model calls in flight per chain; the LinkedIn and email items run side by side.
+    """
+    groups, outputs = _group(items)
+
+    def run(kind, indices):
+        config = {"max_concurrency": max_concurrency, "run_name": f"batch_{kind}"}
+        with admission_priority("batch"):
+            return indices, _chain(kind).batch([_chain_inputs(items[i]) for i in indices], config=config, return_exceptions=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(groups))) as pool:
+        for indices, results in pool.map(lambda group: run(*group), groups.items()):
+            outputs.update(zip(indices, results))
+    return [_result(item, index, outputs[index]) for index, item in enumerate(items)]
+
+
+async def abatch_generate(items, max_concurrency=8):
+    """Async twin of batch_generate()."""
+    groups, outputs = _group(items)
+
+    async def run(kind, indices):
+        config = {"max_concurrency": max_concurrency, "run_name": f"batch_{kind}"}
+        with admission_priority("batch"):
+            return indices, await _chain(kind).abatch([_chain_inputs(items[i]) for i in indices], config=config, return_exceptions=True)
+
+    for indices, results in await asyncio.gather(*(run(kind, indices) for kind, indices in groups.items())):
+        outputs.update(zip(indices, results))
+    return [_result(item, index, outputs[index]) for index, item in enumerate(items)]
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main():
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="JSONL file of request items.")
+    parser.add_argument("--output", required=True, help="JSONL file the results are written to.")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "8")))
+    parser.add_argument("--linkedin-model", default="gpt-4o")
+    parser.add_argument("--linkedin-temp", type=float, default=0.8)
+    parser.add_argument("--email-model", default="gpt-4o")
+    parser.add_argument("--email-temp", type=float, default=0.7)
+    args = parser.parse_args()
+
+    # Only the chains are built; the agent graphs and supervisors are not needed for batch runs
+    linkedin_agent.init_linkedin_agent(ChatOpenAI(model=args.linkedin_model, temperature=args.linkedin_temp))
+    email_agent.init_email_agent(ChatOpenAI(model=args.email_model, temperature=args.email_temp), ChatOpenAI(model=args.email_model))
+
+    items = read_jsonl(args.input)
+    start = time.perf_counter()
+    results = batch_generate(items, max_concurrency=args.concurrency)
+    seconds = time.perf_counter() - start
+    write_jsonl(args.output, results)
+
+    failed = sum(1 for result in results if not result["ok"])
+    print(f"Generated {len(results) - failed}/{len(results)} items ({failed} failed) in {seconds:.1f}s "
+          f"({len(results) / seconds if seconds else 0:.2f} items/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Headless chart rendering off the request thread.
+
+Charts are drawn with matplotlib's object-oriented Figure + Agg canvas API (no global pyplot state) in a dedicated
+process pool, so concurrent Streamlit sessions cannot trample each other's figures and the request thread never pays
+for matplotlib imports or rendering. Output files are content-addressed (hash of data + chart params), so an identical
+chart is served from charts/ without being re-rendered and two different charts can never overwrite each other.
+The charts/ directory is kept under a size budget by evicting the least recently used PNGs.
+"""
+import os
+import json
+import asyncio
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CHARTS_DIR = "charts"
+
+
+def _render_png(path, labels, values, chart_type, title, x_label, y_label):
+    """Process-pool worker: renders one chart to path (written atomically)."""
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if chart_type == 'bar':
+        ax.bar([str(label) for label in labels], values, color='skyblue')
+        if x_label: ax.set_xlabel(x_label)
+        if y_label: ax.set_ylabel(y_label)
+        for tick in ax.get_xticklabels():
+            tick.set_rotation(45)
+            tick.set_horizontalalignment('right')
+    else:
+        colors = matplotlib.colormaps['Pastel1'].resampled(max(len(values), 1))(range(len(values)))
+        ax.pie(values, labels=[str(label) for label in labels], autopct='%1.1f%%', startangle=90, colors=colors)
+    ax.set_title(title)
+    fig.tight_layout()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp_path, format="png")
+    os.replace(tmp_path, path)
+    return path
+
+
+class ChartRenderer:
+    """Content-addressed, size-bounded PNG cache in front of a lazily started rendering process pool."""
+
+    def __init__(self, charts_dir=DEFAULT_CHARTS_DIR, max_bytes=50 * 1024 * 1024, max_workers=2, timeout=60):
+        self.charts_dir = charts_dir
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.RLock()
+        self._in_flight = {}
+        self.stats_counters = {"rendered": 0, "cache_hits": 0, "evicted": 0}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the parent (Streamlit) is multi-threaded
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def chart_path(self, chart_data, chart_type, title, x_label=None, y_label=None):
+        payload = json.dumps([list(chart_data.index), list(chart_data.values), chart_type, title, x_label, y_label], default=str)
+        digest = hashlib.sha256(payload.encode()).hexdigest()[:24]
+        return os.path.join(self.charts_dir, f"{chart_type}_chart_{digest}.png")
+
+    def _submit(self, chart_data, chart_type, title, x_label, y_label):
+        """Returns (path, future); the future is None on a cache hit. Concurrent requests for one chart share a render."""
+        path = self.chart_path(chart_data, chart_type, title, x_label, y_label)
+        with self._lock:
+            if path in self._in_flight:
+                return path, self._in_flight[path]
+            if os.path.exists(path):
+                os.utime(path) # Refresh recency for LRU eviction
+                self.stats_counters["cache_hits"] += 1
+                return path, None
+            os.makedirs(self.charts_dir, exist_ok=True)
+            future = self._executor().submit(_render_png, path, list(chart_data.index), [float(v) for v in chart_data.values],
+                                             chart_type, title, x_label, y_label)
+            self._in_flight[path] = future
+        future.add_done_callback(lambda f: self._finished(path, f))
+        return path, future
+
+    def _finished(self, path, future):
+        with self._lock:
+            self._in_flight.pop(path, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self.stats_counters["rendered"] += 1
+        self.evict(keep=path)
+
+    def render(self, chart_data, chart_type, title, x_label=None, y_label=None):
+        """Renders (or reuses) the chart for a pandas Series of values indexed by label. Returns the PNG path."""
+        path, future = self._submit(chart_data, chart_type, title, x_label, y_label)
+        if future is not None:
+            future.result(timeout=self.timeout)
+        return path
+
+    async def arender(self, chart_data, chart_type, title, x_label=None, y_label=None):
+        path, future = self._submit(chart_data, chart_type, title, x_label, y_label)
+        if future is not None:
+            await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        return path
+
+    def evict(self, keep=None):
+        """Deletes least recently used PNGs until charts_dir fits in max_bytes."""
+        try:
+            entries = [entry for entry in os.scandir(self.charts_dir) if entry.name.endswith(".png") and entry.is_file()]
+        except FileNotFoundError:
+            return
+        stats = [(entry.path, entry.stat()) for entry in entries]
+        total = sum(stat.st_size for _, stat in stats)
+        for path, stat in sorted(stats, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            with self._lock:
+                self.stats_counters["evicted"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.stats_counters)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
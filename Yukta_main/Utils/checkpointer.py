@@ -0,0 +1,258 @@
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from langgraph.checkpoint.memory import InMemorySaver
+
+# 100-ns intervals between the UUID epoch (1582-10-15) and the Unix epoch.
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+class _ThreadedAsyncSaverMixin:
+    """
+    SqliteSaver and PostgresSaver only implement the sync checkpoint API, so graph.ainvoke()/astream() would fail on
+    them. This mixin runs the sync implementation on a worker thread, keeping the event loop free for other sessions.
+    """
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class LockedInMemorySaver(InMemorySaver):
+    """
+    InMemorySaver whose reads and writes hold storage_lock, so the maintenance thread can compact its dicts without
+    racing a graph run (a put writes the blobs before the checkpoint that references them). The async methods of
+    InMemorySaver call these sync ones, so they are covered too.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage_lock = threading.RLock()
+
+    def get_tuple(self, config):
+        with self.storage_lock:
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self.storage_lock: # Materialized under the lock instead of holding it across yields
+            items = [*super().list(config, filter=filter, before=before, limit=limit)]
+        yield from items
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self.storage_lock:
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self.storage_lock:
+            return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id):
+        with self.storage_lock:
+            return super().delete_thread(thread_id)
+
+
+def _with_async_support(saver_cls):
+    return type(saver_cls.__name__, (_ThreadedAsyncSaverMixin, saver_cls), {"__module__": saver_cls.__module__})
+
+
+def create_checkpointer(backend="memory", sqlite_path="yukta_checkpoints.sqlite", pg_conninfo=None, pool_min_size=1, pool_max_size=10):
+    """
+    Creates the LangGraph checkpointer used for conversational memory.
+
+    backend:
+        - "memory":   process-local LockedInMemorySaver (state is lost on restart).
+        - "sqlite":   SqliteSaver on a WAL-mode database file. One shared connection guarded by the saver's
+                      lock; WAL lets other processes on the same node read while a turn is being written.
+        - "postgres": PostgresSaver backed by a psycopg ConnectionPool, for several app replicas.
+    All backends support both the sync (invoke/stream) and async (ainvoke/astream) graph APIs.
+    """
+    if backend == "memory":
+        return LockedInMemorySaver()
+
+    if backend == "sqlite":
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;") # Safe with WAL, avoids an fsync per transaction
+        checkpointer = _with_async_support(SqliteSaver)(conn)
+        checkpointer.setup()
+        return checkpointer
+
+    if backend == "postgres":
+        if not pg_conninfo:
+            raise ValueError("Postgres checkpointer selected but no connection string was provided (check the PG_* settings).")
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+        from langgraph.checkpoint.postgres import PostgresSaver
+        pool = ConnectionPool(
+            conninfo=pg_conninfo,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=True,
+        )
+        checkpointer = _with_async_support(PostgresSaver)(pool)
+        checkpointer.setup()
+        return checkpointer
+
+    raise ValueError(f"Unknown checkpointer backend '{backend}'. Choose 'memory', 'sqlite' or 'postgres'.")
+
+
+def checkpoint_timestamp(checkpoint_id):
+    """Checkpoint IDs are UUIDv6, so the creation time (Unix seconds) can be read back from the ID itself."""
+    value = uuid.UUID(checkpoint_id).int
+    timestamp = ((value >> 80) << 12) | ((value >> 64) & 0x0FFF)
+    return (timestamp - _UUID_EPOCH_OFFSET) / 1e7
+
+
+def _backend_name(checkpointer):
+    if isinstance(checkpointer, InMemorySaver):
+        return "memory"
+    module = type(checkpointer).__module__
+    if module.startswith("langgraph.checkpoint.sqlite"):
+        return "sqlite"
+    if module.startswith("langgraph.checkpoint.postgres"):
+        return "postgres"
+    raise ValueError(f"Unsupported checkpointer type: {type(checkpointer).__name__}")
+
+
+def _run_sql(checkpointer, statements):
+    """Runs (sql, params) statements on a SQLite or Postgres checkpointer. Returns (rows of the last statement, total rowcount)."""
+    rows, deleted = [], 0
+    if _backend_name(checkpointer) == "sqlite":
+        with checkpointer.cursor() as cur:
+            for sql, params in statements:
+                cur.execute(sql, params)
+                deleted += max(cur.rowcount, 0)
+                rows = cur.fetchall() if cur.description else []
+    else:
+        with checkpointer.conn.connection() as conn, conn.cursor() as cur:
+            for sql, params in statements:
+                cur.execute(sql.replace("?", "%s"), params)
+                deleted += max(cur.rowcount, 0)
+                rows = [tuple(row.values()) if isinstance(row, dict) else row for row in cur.fetchall()] if cur.description else []
+    return rows, deleted
+
+
+def thread_activity(checkpointer):
+    """Returns {thread_id: unix timestamp of its latest checkpoint}."""
+    if _backend_name(checkpointer) == "memory":
+        with _storage_lock(checkpointer):
+            return {
+                thread_id: checkpoint_timestamp(max(cid for ns in namespaces.values() for cid in ns))
+                for thread_id, namespaces in list(checkpointer.storage.items())
+                if any(namespaces.values())
+            }
+    rows, _ = _run_sql(checkpointer, [("SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id", ())])
+    return {thread_id: checkpoint_timestamp(latest) for thread_id, latest in rows}
+
+
+def prune_checkpointer(checkpointer, ttl_seconds=None, max_threads=None):
+    """
+    Deletes whole conversation threads that have been idle for longer than ttl_seconds,
+    then the least recently active threads beyond max_threads. Returns the number of threads deleted.
+    """
+    activity = thread_activity(checkpointer)
+    expired = set()
+    if ttl_seconds is not None:
+        cutoff = time.time() - ttl_seconds
+        expired.update(thread_id for thread_id, last_seen in activity.items() if last_seen < cutoff)
+    if max_threads is not None:
+        remaining = sorted((item for item in activity.items() if item[0] not in expired), key=lambda item: item[1], reverse=True)
+        expired.update(thread_id for thread_id, _ in remaining[max_threads:])
+    for thread_id in expired:
+        checkpointer.delete_thread(thread_id)
+    return len(expired)
+
+
+def _storage_lock(checkpointer):
+    lock = getattr(checkpointer, "storage_lock", None)
+    if lock is None:
+        raise ValueError("Maintenance of an in-memory checkpointer needs the LockedInMemorySaver from create_checkpointer('memory'); "
+                         "a plain InMemorySaver would be modified while graph runs write to it.")
+    return lock
+
+
+def _compact_memory(checkpointer):
+    removed = 0
+    live_blobs = set()
+    with _storage_lock(checkpointer): # Graph runs wait for the compaction, so no blob is orphaned mid-put
+        for thread_id, namespaces in checkpointer.storage.items():
+            for checkpoint_ns, checkpoints in namespaces.items():
+                if not checkpoints:
+                    continue
+                latest_id = max(checkpoints)
+                for checkpoint_id in [cid for cid in checkpoints if cid != latest_id]:
+                    del checkpoints[checkpoint_id]
+                    checkpointer.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+                    removed += 1
+                latest = checkpointer.serde.loads_typed(checkpoints[latest_id][0])
+                live_blobs.update((thread_id, checkpoint_ns, channel, version) for channel, version in latest["channel_versions"].items())
+        for key in [key for key in checkpointer.blobs if key not in live_blobs]:
+            del checkpointer.blobs[key]
+    return removed
+
+
+def compact_checkpointer(checkpointer):
+    """
+    Keeps only the latest checkpoint per (thread, namespace) and drops the superseded ones together with
+    their pending writes (and, for Postgres, the channel blobs superseded by the thread's newest checkpoint).
+    This gives up time-travel over old turns in exchange for bounded storage. Returns rows removed.
+    """
+    backend = _backend_name(checkpointer)
+    if backend == "memory":
+        return _compact_memory(checkpointer)
+
+    writes_table = "writes" if backend == "sqlite" else "checkpoint_writes"
+    statements = [
+        (f"""DELETE FROM {writes_table} WHERE checkpoint_id < (
+                SELECT MAX(c.checkpoint_id) FROM checkpoints c
+                WHERE c.thread_id = {writes_table}.thread_id AND c.checkpoint_ns = {writes_table}.checkpoint_ns)""", ()),
+        ("""DELETE FROM checkpoints WHERE checkpoint_id < (
+                SELECT MAX(c.checkpoint_id) FROM checkpoints c
+                WHERE c.thread_id = checkpoints.thread_id AND c.checkpoint_ns = checkpoints.checkpoint_ns)""", ()),
+    ]
+    if backend == "postgres":
+        # PostgresSaver.put writes the blobs before the checkpoint row, so a blob no checkpoint references yet may
+        # belong to a turn in progress. Only blobs older than the version in the thread's newest checkpoint go
+        # (versions are zero-padded, so they compare as text); newer and unreferenced channels are left alone.
+        statements.append(("""DELETE FROM checkpoint_blobs b WHERE EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+                AND c.checkpoint_id = (SELECT MAX(n.checkpoint_id) FROM checkpoints n
+                                       WHERE n.thread_id = b.thread_id AND n.checkpoint_ns = b.checkpoint_ns)
+                AND c.checkpoint -> 'channel_versions' ->> b.channel > b.version)""", ()))
+    _, removed = _run_sql(checkpointer, statements)
+    return removed
+
+
+def start_checkpointer_maintenance(checkpointer, interval_seconds=600, ttl_seconds=None, max_threads=None, compact=True):
+    """Runs pruning and compaction on a daemon thread every interval_seconds."""
+    def _maintain():
+        while True:
+            try:
+                pruned = prune_checkpointer(checkpointer, ttl_seconds=ttl_seconds, max_threads=max_threads)
+                compacted = compact_checkpointer(checkpointer) if compact else 0
+                print(f"Checkpointer maintenance: pruned {pruned} threads, compacted {compacted} rows.")
+            except Exception as e:
+                print(f"Error during checkpointer maintenance: {e}")
+            time.sleep(interval_seconds)
+
+    worker = threading.Thread(target=_maintain, name="checkpointer-maintenance", daemon=True)
+    worker.start()
+    return worker
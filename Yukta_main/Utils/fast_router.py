@@ -0,0 +1,226 @@
+import re
+import time
+import hashlib
+import threading
+import numpy as np
+from langchain_core.runnables import RunnableLambda
+
+# --- Deterministic rules: agent name -> regex patterns that unambiguously identify its intent ---
+FAST_PATH_RULES = {
+    "SalesDataAgent": [
+        r"\b(bar|pie)\s+(chart|graph|plot)\b.*\bsales\b",
+        r"\bsales\b.*\b(bar|pie)\s+(chart|graph|plot)\b",
+        r"\b(total|sum of|average|avg)\s+sales\b",
+        r"\bsales\s+(by|per|for each|of each)\s+(region|category|product|month|quarter|year|customer)\b",
+    ],
+    "calendar_agent": [
+        r"\b(schedule|book|set up|arrange)\s+(a|an|the|my)?\s*(meeting|call|event|appointment)\b",
+        r"\bset\s+(a|an|me a)\s+reminder\b",
+        r"\b(events|meetings|appointments)\s+(today|tomorrow|this week|next week)\b",
+        r"\b(my|the)\s+(google\s+)?calendar\b",
+    ],
+    "linkedin_agent": [
+        r"\blinked\s?in\s+post\b",
+    ],
+    "email_agent": [
+        r"\b(write|draft|compose)\s+(an?\s+)?(\w+\s+){0,3}e-?mail\b",
+    ],
+    "RAG_agent": [
+        r"\bsyllabus\b",
+    ],
+}
+
+# Requests that chain several actions must go through Yukta Prime's planner.
+MULTI_STEP_PATTERN = re.compile(r"\b(and then|then|after that|afterwards|followed by|as well as)\b", re.IGNORECASE)
+
+# A second action joined by a plain "and", "also", "plus" or a comma ("total sales by region and email them to my boss"):
+# the rules would only see the first one, so these go through Yukta Prime as well.
+ACTION_VERBS = ("schedule", "book", "set up", "arrange", "reschedule", "cancel", "move", "delete", "remind", "add", "send",
+                "email", "e-mail", "mail", "forward", "reply", "write", "draft", "compose", "post", "publish", "share",
+                "search", "find", "look up", "research", "summarize", "summarise", "plot", "chart", "graph", "show",
+                "list", "compare", "create", "make", "generate", "notify", "tell", "invite", "check")
+COMPOUND_REQUEST_PATTERN = re.compile(
+    r"(\band\b|\balso\b|\bplus\b|,|;|&)\s*(?:(?:also|please|can you|could you|you|i want you to)\s+)*"
+    r"(" + "|".join(re.escape(verb) for verb in ACTION_VERBS) + r")\b", re.IGNORECASE)
+
+
+def is_multi_step(text):
+    """True for requests that chain actions, whether with a sequencing word or with a conjunction and a second verb."""
+    return bool(MULTI_STEP_PATTERN.search(text) or COMPOUND_REQUEST_PATTERN.search(text))
+
+# --- Labelled example prompts for the similarity classifier ---
+FAST_PATH_EXAMPLES = {
+    "SalesDataAgent": [
+        "bar chart of sales by region",
+        "pie chart of sales by product category",
+        "what were the total sales last quarter",
+        "show me sales per month",
+        "which region had the highest revenue",
+        "plot revenue by category",
+    ],
+    "calendar_agent": [
+        "schedule a meeting tomorrow at 10 am",
+        "set a reminder for friday",
+        "what events do I have this week",
+        "cancel my meeting with john",
+        "book a call with the team next monday",
+        "find events next week",
+    ],
+    "linkedin_agent": [
+        "write a linkedin post about ai trends",
+        "create a linkedin post announcing our product launch",
+        "draft a post for linkedin about my new job",
+    ],
+    "email_agent": [
+        "write an email to the hiring manager",
+        "draft a follow up email to the client",
+        "compose an email applying for the data scientist role",
+        "review this email for tone",
+    ],
+    "RAG_agent": [
+        "what topics are covered in the syllabus",
+        "what is in module 3 of the course",
+        "which units cover deep learning in the curriculum",
+    ],
+    "research_agent": [
+        "search the web for the latest ai news",
+        "who won the world cup in 2022",
+        "what is the population of japan",
+        "find recent articles about quantum computing",
+    ],
+}
+
+
+def hashed_ngram_embedding(texts, dim=1024):
+    """
+    Small local embedding: hashed word unigrams and bigrams, L2-normalised.
+    Needs no network call, so classifying a request costs microseconds instead of an LLM hop.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for gram in grams:
+            bucket = int(hashlib.md5(gram.encode()).hexdigest()[:8], 16) % dim
+            vectors[row, bucket] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FastPathRouter:
+    """
+    Pre-routing stage in front of Yukta Prime.
+    Classifies obvious single-agent requests straight to the agent, skipping the Yukta Prime and
+    domain supervisor LLM hops. Multi-step requests (is_multi_step), requests whose rules match more than
+    one agent and anything below the confidence threshold fall back to the full hierarchy.
+    """
+
+    FALLBACK = "yukta_prime"
+
+    def __init__(self, rules=None, examples=None, embed_fn=None, threshold=0.75, min_margin=0.1):
+        self.rules = {agent: [re.compile(p, re.IGNORECASE) for p in patterns]
+                      for agent, patterns in (rules or FAST_PATH_RULES).items()}
+        self.examples = examples or FAST_PATH_EXAMPLES
+        self.embed_fn = embed_fn or hashed_ngram_embedding
+        self.threshold = threshold
+        self.min_margin = min_margin
+
+        self._example_vectors = None
+        self._example_labels = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rule_hits": 0, "classifier_hits": 0, "fallbacks": 0, "hits_by_agent": {}}
+        self._latency = {"fast_path": [0, 0.0], "full_hierarchy": [0, 0.0]} # route -> [count, total seconds]
+
+    def _classify_by_rules(self, text):
+        matched = {agent for agent, patterns in self.rules.items() if any(p.search(text) for p in patterns)}
+        if len(matched) == 1:
+            return matched.pop(), 1.0
+        return None, 0.0
+
+    def _classify_by_similarity(self, text):
+        if self._example_vectors is None:
+            labels, prompts = [], []
+            for agent, agent_examples in self.examples.items():
+                labels.extend([agent] * len(agent_examples))
+                prompts.extend(agent_examples)
+            self._example_vectors = np.asarray(self.embed_fn(prompts), dtype=np.float32)
+            self._example_labels = labels
+
+        query = np.asarray(self.embed_fn([text]), dtype=np.float32)[0]
+        scores = self._example_vectors @ query
+        best_by_agent = {}
+        for label, score in zip(self._example_labels, scores):
+            best_by_agent[label] = max(best_by_agent.get(label, -1.0), float(score))
+        ranked = sorted(best_by_agent.items(), key=lambda item: item[1], reverse=True)
+        best_agent, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best_score >= self.threshold and best_score - runner_up >= self.min_margin:
+            return best_agent, best_score
+        return None, best_score
+
+    def route(self, text, allowed_agents=None):
+        """
+        Returns (destination, confidence, method) where destination is an agent name or FALLBACK.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+
+        destination, confidence, method = None, 0.0, "fallback"
+        if text and not is_multi_step(text):
+            destination, confidence = self._classify_by_rules(text)
+            method = "rules"
+            if destination is None:
+                destination, confidence = self._classify_by_similarity(text)
+                method = "classifier"
+        if destination is not None and allowed_agents is not None and destination not in allowed_agents:
+            destination = None
+
+        with self._lock:
+            if destination is None:
+                self._stats["fallbacks"] += 1
+                return self.FALLBACK, confidence, "fallback"
+            self._stats["rule_hits" if method == "rules" else "classifier_hits"] += 1
+            self._stats["hits_by_agent"][destination] = self._stats["hits_by_agent"].get(destination, 0) + 1
+        return destination, confidence, method
+
+    def record_latency(self, fast_path, seconds):
+        """Records the wall time of one completed run, split by whether it took the fast path."""
+        key = "fast_path" if fast_path else "full_hierarchy"
+        with self._lock:
+            self._latency[key][0] += 1
+            self._latency[key][1] += seconds
+
+    def stats(self):
+        """Hit rate and latency summary. Latency saved is estimated from the observed average run times."""
+        with self._lock:
+            stats = dict(self._stats, hits_by_agent=dict(self._stats["hits_by_agent"]))
+            fast_count, fast_total = self._latency["fast_path"]
+            full_count, full_total = self._latency["full_hierarchy"]
+        hits = stats["rule_hits"] + stats["classifier_hits"]
+        stats["hit_rate"] = hits / stats["requests"] if stats["requests"] else 0.0
+        stats["avg_fast_path_latency_s"] = fast_total / fast_count if fast_count else None
+        stats["avg_full_hierarchy_latency_s"] = full_total / full_count if full_count else None
+        if fast_count and full_count:
+            saved_per_hit = max(0.0, stats["avg_full_hierarchy_latency_s"] - stats["avg_fast_path_latency_s"])
+            stats["estimated_latency_saved_s"] = saved_per_hit * fast_count
+        else:
+            stats["estimated_latency_saved_s"] = None
+        return stats
+
+
+def timed_node(runnable, router, fast_path):
+    """Wraps an agent/supervisor graph as a node that reports its wall time to the router."""
+    def _node(state, config):
+        start = time.perf_counter()
+        result = runnable.invoke(state, config)
+        router.record_latency(fast_path, time.perf_counter() - start)
+        return {"messages": result["messages"]}
+
+    async def _anode(state, config):
+        start = time.perf_counter()
+        result = await runnable.ainvoke(state, config)
+        router.record_latency(fast_path, time.perf_counter() - start)
+        return {"messages": result["messages"]}
+
+    return RunnableLambda(_node, afunc=_anode)
@@ -0,0 +1,244 @@
+"""
+Bounded conversation history for the full_history supervisors and their agents.
+
+Every supervisor runs with output_mode="full_history", so each inner agent message, tool call and handoff is kept in
+the checkpointed thread and would be re-sent to the model on every later turn. HistoryManager is used as the
+pre_model_hook of those graphs: the checkpoint keeps the complete history, but the model only sees
+
+    [rolling summary of older turns] + [last keep_turns turns, raw] + [current turn, untouched]
+
+Within the raw turns, tool payloads that have already been consumed (SQL results, CSVs, search results of answered
+turns) are replaced by a short stub. If the result is still over max_tokens, more of the oldest raw turns are folded
+into the summary. Summaries are rolling: a summary LLM (if given) condenses the previous summary plus the newly aged-out
+turns, and the result is cached per thread and folded prefix (Prime, the supervisors and the agents share one manager
+but fold different numbers of turns), so each turn is summarized only once.
+"""
+import threading
+from collections import OrderedDict
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+
+SUMMARY_MODEL_TIER = "light"
+# The summary call runs inside the pre_model_hook node; its text is internal and must not stream out as answer tokens
+_NOSTREAM = {"tags": ["nostream"]}
+
+summary_prompt = """You maintain the running memory of a conversation between a user and the 'Yukta' assistant.
+Update the summary with the new turns below. Keep facts the user may refer to later: names, dates, numbers, sales
+figures, file paths of charts, drafted emails/posts (subject and gist), decisions and open follow-ups.
+Write at most {max_words} words of plain sentences.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:"""
+
+
+def _text(message):
+    if isinstance(message.content, str):
+        return message.content
+    return " ".join(part.get("text", "") for part in message.content if isinstance(part, dict))
+
+
+def _clip(text, max_chars):
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars] + " ..."
+
+
+def split_turns(messages):
+    """Splits a message list at user messages. Messages before the first user message form their own turn."""
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def turn_digest(turn, max_chars=400):
+    """One completed turn as 'User: ... / Yukta: ...', dropping the inner agent, tool and handoff traffic."""
+    request = next((_text(m) for m in turn if isinstance(m, HumanMessage)), "")
+    answer = next((_text(m) for m in reversed(turn) if isinstance(m, AIMessage) and _text(m).strip()
+                   and not m.response_metadata.get("__is_handoff_back")), "")
+    lines = [f"User: {_clip(request, max_chars)}"]
+    if answer:
+        lines.append(f"Yukta: {_clip(answer, max_chars)}")
+    return "\n".join(lines)
+
+
+def current_request(messages, context_chars=4000):
+    """
+    The latest user request, plus the last answer another agent already gave to it in this turn (e.g. the sales
+    figures an email should contain). Used by the pipeline agents, which have no model of their own to read the history.
+    """
+    turns = split_turns(messages)
+    if not turns or not isinstance(turns[-1][0], HumanMessage):
+        return ""
+    request = _text(turns[-1][0])
+    context = next((_text(m) for m in reversed(turns[-1][1:]) if isinstance(m, AIMessage) and _text(m).strip()
+                    and not m.response_metadata.get("__is_handoff_back")), None)
+    return f"{request}\n\nContext from earlier steps:\n{context[:context_chars]}" if context else request
+
+
+def _stub_tool_payloads(turn, payload_chars):
+    """Replaces consumed tool outputs with a stub; tool_call ids are kept so the call/result pairing stays valid."""
+    compacted = []
+    for message in turn:
+        content = _text(message)
+        if isinstance(message, ToolMessage) and len(content) > payload_chars:
+            message = message.model_copy(update={
+                "content": f"{content[:payload_chars]} ... [{len(content) - payload_chars} more characters of '{message.name}' output omitted]"})
+        compacted.append(message)
+    return compacted
+
+
+class HistoryManager:
+    """
+    keep_turns:       completed turns kept verbatim (apart from consumed tool payloads) before the current one.
+    max_tokens:       approximate token budget for the history sent with one model call.
+    summary_llm:      optional model for rolling summaries; without it, older turns become short extractive digests.
+    payload_chars:    characters of a consumed tool payload that are kept.
+    summary_chars:    upper bound on the summary text.
+    max_threads:      threads whose summaries are cached (least recently used are dropped).
+    prefixes_per_thread: summaries of different folded prefixes cached per thread, one for each depth the hooks fold to.
+    """
+
+    def __init__(self, keep_turns=4, max_tokens=6000, summary_llm=None, payload_chars=300, summary_chars=3000, max_threads=1000,
+                 prefixes_per_thread=8):
+        self.keep_turns = keep_turns
+        self.max_tokens = max_tokens
+        self.summary_llm = summary_llm
+        self.payload_chars = payload_chars
+        self.summary_chars = summary_chars
+        self.max_threads = max_threads
+        self.prefixes_per_thread = prefixes_per_thread
+        # thread_id -> {id of the last folded message: (ids of the last message of every folded turn, summary)}
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats_counters = {"model_calls": 0, "raw_tokens": 0, "sent_tokens": 0, "summary_calls": 0}
+
+    # ---------- planning ----------
+
+    def _plan(self, messages):
+        """Returns (turns to fold into the summary, turns sent raw), enforcing keep_turns and the token budget."""
+        turns = split_turns(messages)
+        if len(turns) <= 1:
+            return [], turns
+        current = turns[-1]
+        completed = [_stub_tool_payloads(turn, self.payload_chars) for turn in turns[:-1]]
+        split = max(0, len(completed) - self.keep_turns)
+        folded, kept = turns[:split], completed[split:]
+        budget = self.max_tokens - count_tokens_approximately(current) - self.summary_chars // 4
+        while kept and count_tokens_approximately([m for turn in kept for m in turn]) > budget:
+            folded.append(turns[len(folded)])
+            kept = kept[1:]
+        return folded, kept + [current]
+
+    @staticmethod
+    def _thread_id(config):
+        return ((config or {}).get("configurable") or {}).get("thread_id", "default")
+
+    def _cached_summary(self, thread_id, folded):
+        """Returns (summary so far, turns still to be folded into it), starting from the longest cached folded prefix."""
+        keys = [turn[-1].id for turn in folded]
+        with self._lock:
+            prefixes = self._summaries.get(thread_id) or {}
+            for depth in range(len(keys), 0, -1):
+                cached_keys, summary = prefixes.get(keys[depth - 1], ((), ""))
+                if list(cached_keys) == keys[:depth]:
+                    prefixes.move_to_end(keys[depth - 1])
+                    return summary, folded[depth:]
+        return "", folded
+
+    def _store_summary(self, thread_id, folded, summary):
+        keys = tuple(turn[-1].id for turn in folded)
+        with self._lock:
+            prefixes = self._summaries.setdefault(thread_id, OrderedDict())
+            prefixes[keys[-1]] = (keys, summary)
+            prefixes.move_to_end(keys[-1])
+            while len(prefixes) > self.prefixes_per_thread:
+                prefixes.popitem(last=False)
+            self._summaries.move_to_end(thread_id)
+            while len(self._summaries) > self.max_threads:
+                self._summaries.popitem(last=False)
+
+    def _extractive_summary(self, summary, new_turns):
+        text = "\n".join(filter(None, [summary] + [turn_digest(turn) for turn in new_turns]))
+        return text if len(text) <= self.summary_chars else "... " + text[-self.summary_chars:]
+
+    def _summary_inputs(self, summary, new_turns):
+        return summary_prompt.format(max_words=self.summary_chars // 8, summary=summary or "(empty)",
+                                     turns="\n\n".join(turn_digest(turn) for turn in new_turns))
+
+    def _assemble(self, messages, summary, kept):
+        sent = ([SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")] if summary else []) + [m for turn in kept for m in turn]
+        with self._lock:
+            self.stats_counters["model_calls"] += 1
+            self.stats_counters["raw_tokens"] += count_tokens_approximately(messages)
+            self.stats_counters["sent_tokens"] += count_tokens_approximately(sent)
+        return {"llm_input_messages": sent}
+
+    # ---------- hook ----------
+
+    def compact(self, state, config=None):
+        messages = state["messages"]
+        folded, kept = self._plan(messages)
+        if not folded:
+            return self._assemble(messages, "", kept)
+        thread_id = self._thread_id(config)
+        summary, new_turns = self._cached_summary(thread_id, folded)
+        if new_turns:
+            summary = self._summarize(summary, new_turns)
+            self._store_summary(thread_id, folded, summary)
+        return self._assemble(messages, summary, kept)
+
+    async def acompact(self, state, config=None):
+        messages = state["messages"]
+        folded, kept = self._plan(messages)
+        if not folded:
+            return self._assemble(messages, "", kept)
+        thread_id = self._thread_id(config)
+        summary, new_turns = self._cached_summary(thread_id, folded)
+        if new_turns:
+            summary = await self._asummarize(summary, new_turns)
+            self._store_summary(thread_id, folded, summary)
+        return self._assemble(messages, summary, kept)
+
+    def _summarize(self, summary, new_turns):
+        if self.summary_llm is None:
+            return self._extractive_summary(summary, new_turns)
+        try:
+            result = self.summary_llm.invoke(self._summary_inputs(summary, new_turns), config=_NOSTREAM)
+            with self._lock:
+                self.stats_counters["summary_calls"] += 1
+            return _clip(_text(result), self.summary_chars)
+        except Exception as e:
+            print(f"History summary failed, using extractive digests instead: {e}")
+            return self._extractive_summary(summary, new_turns)
+
+    async def _asummarize(self, summary, new_turns):
+        if self.summary_llm is None:
+            return self._extractive_summary(summary, new_turns)
+        try:
+            result = await self.summary_llm.ainvoke(self._summary_inputs(summary, new_turns), config=_NOSTREAM)
+            with self._lock:
+                self.stats_counters["summary_calls"] += 1
+            return _clip(_text(result), self.summary_chars)
+        except Exception as e:
+            print(f"History summary failed, using extractive digests instead: {e}")
+            return self._extractive_summary(summary, new_turns)
+
+    def as_hook(self):
+        """The pre_model_hook for create_react_agent / create_supervisor (sync and async)."""
+        return RunnableLambda(self.compact, afunc=self.acompact, name="history_manager")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.stats_counters)
+            stats["threads"] = len(self._summaries)
+        stats["tokens_saved"] = stats["raw_tokens"] - stats["sent_tokens"]
+        stats["reduction"] = stats["tokens_saved"] / stats["raw_tokens"] if stats["raw_tokens"] else 0.0
+        return stats
@@ -0,0 +1,346 @@
+"""
+Shared, connection-pooled chat model clients.
+
+initialize_yukta_graph asks for a model for every role and tier, and most of them resolve to the same model name and
+settings. ModelRegistry returns one shared instance per (model, parameters) key, and every instance it builds talks to
+the API through the same pair of tuned httpx clients (sync and async):
+
+    - one connection pool with keep-alive, so TLS handshakes and sockets are reused across agents;
+    - HTTP/2 when the optional 'h2' package is installed (many concurrent requests over one connection);
+    - a per-model concurrency limit, applied in the transport to the 'model' of each request, so a burst of agent
+      calls queues locally instead of tripping the provider's rate limits;
+    - optionally the admission controller's cap on all OpenAI calls (Utils/admission.py), which serves interactive
+      runs before batch jobs;
+    - retries of rate-limited (429) and failed (5xx) requests with exponential backoff, done by the OpenAI SDK, which
+      honours the Retry-After header. The registry configures max_retries and counts the responses that triggered them.
+
+stats() reports requests, new connections and the resulting socket reuse, open/idle connections, rate-limited
+responses and the queueing caused by the concurrency limits.
+"""
+import json
+import time
+import asyncio
+import threading
+import importlib.util
+import httpx
+
+from Utils.admission import Overloaded, current_priority
+
+try:
+    from openai import OpenAIError
+except ImportError: # The registry only needs openai for this error type
+    OpenAIError = Exception
+
+DEFAULT_CONCURRENCY = 16
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _request_model(request):
+    """The 'model' field of a JSON request body, or None (e.g. for streamed uploads or non-JSON bodies)."""
+    try:
+        return json.loads(request.content).get("model")
+    except Exception:
+        return None
+
+
+class RequestShed(Overloaded, OpenAIError):
+    """
+    Overloaded raised in the transport when no downstream slot frees up in time. It is also an OpenAIError because the
+    OpenAI SDK retries any other exception from the transport (max_retries times, each waiting for a slot again) and
+    then replaces it with a generic APIConnectionError; OpenAIErrors are passed through as they are.
+    """
+
+
+class ConcurrencyLimiter:
+    """A counting semaphore that sync threads and async tasks on any event loop can share."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def acquire(self):
+        """Takes a slot, blocking until one is free. Returns the seconds spent waiting."""
+        if self._semaphore.acquire(blocking=False):
+            return 0.0
+        start = time.perf_counter()
+        self._semaphore.acquire()
+        return time.perf_counter() - start
+
+    async def aacquire(self):
+        # Polling keeps the semaphore usable from every event loop and from threads at the same time
+        if self._semaphore.acquire(blocking=False):
+            return 0.0
+        start, delay = time.perf_counter(), 0.005
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        return time.perf_counter() - start
+
+    def release(self):
+        self._semaphore.release()
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that frees the concurrency slot once it has been read and closed (also for streamed answers)."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _PooledTransport(httpx.BaseTransport):
+    def __init__(self, registry, transport):
+        self.registry = registry
+        self.transport = transport
+
+    def _trace(self, event, info):
+        self.registry._record_connection_event(event)
+
+    def handle_request(self, request):
+        model, priority = _request_model(request), current_priority()
+        limiter = self.registry._limiter_for(model)
+        self.registry._acquire_downstream(priority)
+        try:
+            waited = limiter.acquire()
+        except BaseException:
+            self.registry._release_downstream(priority)
+            raise
+        self.registry._record_start(model, waited)
+        release = self.registry._release_once(model, limiter, priority)
+        request.extensions["trace"] = self._trace
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException:
+            release()
+            raise
+        self.registry._record_response(response)
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class _AsyncPooledTransport(httpx.AsyncBaseTransport):
+    def __init__(self, registry, transport):
+        self.registry = registry
+        self.transport = transport
+
+    async def _trace(self, event, info):
+        self.registry._record_connection_event(event)
+
+    async def handle_async_request(self, request):
+        model, priority = _request_model(request), current_priority()
+        limiter = self.registry._limiter_for(model)
+        await self.registry._aacquire_downstream(priority)
+        try:
+            waited = await limiter.aacquire()
+        except BaseException: # Cancelled while queued for the model (run timeout, shutdown): the admission slot goes back
+            self.registry._release_downstream(priority)
+            raise
+        self.registry._record_start(model, waited)
+        release = self.registry._release_once(model, limiter, priority)
+        request.extensions["trace"] = self._trace
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        self.registry._record_response(response)
+        response.stream = _AsyncReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ModelRegistry:
+    """
+    model_class:                callable(model=..., http_client=..., http_async_client=..., max_retries=..., **params)
+                                -> chat model (e.g. ChatOpenAI).
+    max_connections:            sockets the shared pool may open (per client: sync and async have a pool each).
+    max_keepalive_connections:  idle sockets kept open for reuse.
+    keepalive_expiry:           seconds an idle socket is kept.
+    http2:                      use HTTP/2 if the 'h2' package is installed.
+    concurrency_limits:         {model name: concurrent requests}; other models get default_concurrency.
+    max_retries:                retries of 429/5xx responses by the OpenAI SDK (exponential backoff, honours Retry-After).
+    downstream:                 optional PriorityLimiter over all requests (AdmissionController.limiters['openai']).
+    downstream_timeout:         {priority: seconds} a request may wait for a downstream slot before it is shed with
+                                RequestShed (AdmissionController.downstream_timeout); missing priorities wait forever.
+    """
+
+    def __init__(self, model_class, max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0, http2=True,
+                 timeout=120.0, concurrency_limits=None, default_concurrency=DEFAULT_CONCURRENCY, max_retries=4, downstream=None,
+                 downstream_timeout=None):
+        self.model_class = model_class
+        self.downstream = downstream
+        self.downstream_timeout = dict(downstream_timeout or {})
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_retries = max_retries
+        self.concurrency_limits = dict(concurrency_limits or {})
+        self.default_concurrency = default_concurrency
+        self._lock = threading.Lock()
+        self._models = {}
+        self._building = {} # key -> lock, so concurrent callers of the same key build one instance
+        self._limiters = {}
+        self.stats_counters = {"models_requested": 0, "models_built": 0, "requests": 0, "new_connections": 0,
+                               "tls_handshakes": 0, "rate_limited": 0, "server_errors": 0, "http2_responses": 0, "shed_requests": 0}
+        self._model_counters = {}
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+                              keepalive_expiry=keepalive_expiry)
+        timeout = httpx.Timeout(timeout, connect=10.0)
+        # Retries are left to the OpenAI SDK (it knows about Retry-After); the transport itself never retries
+        self._transport = httpx.HTTPTransport(http2=self.http2, limits=limits, retries=0)
+        self._async_transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=limits, retries=0)
+        self.http_client = httpx.Client(transport=_PooledTransport(self, self._transport), timeout=timeout)
+        self.http_async_client = httpx.AsyncClient(transport=_AsyncPooledTransport(self, self._async_transport), timeout=timeout)
+
+    # ---------- models ----------
+
+    @staticmethod
+    def _key(model, params):
+        return model, json.dumps(params, sort_keys=True, default=repr)
+
+    def get(self, model, **params):
+        """The shared instance for model with these parameters (temperature, logprobs, ...), built on first request."""
+        key = self._key(model, params)
+        with self._lock:
+            self.stats_counters["models_requested"] += 1
+            if key in self._models:
+                return self._models[key]
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self._lock:
+                if key in self._models:
+                    return self._models[key]
+            instance = self.model_class(model=model, http_client=self.http_client, http_async_client=self.http_async_client,
+                                        max_retries=self.max_retries, **params)
+            with self._lock:
+                self._models[key] = instance
+                self._building.pop(key, None)
+                self.stats_counters["models_built"] += 1
+        return instance
+
+    def models(self):
+        with self._lock:
+            return {f"{model} {params}": instance for (model, params), instance in self._models.items()}
+
+    # ---------- transport bookkeeping ----------
+
+    def _limiter_for(self, model):
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = ConcurrencyLimiter(self.concurrency_limits.get(model, self.default_concurrency))
+                self._model_counters[model] = {"requests": 0, "in_flight": 0, "peak_in_flight": 0, "queued": 0, "wait_seconds": 0.0}
+            return self._limiters[model]
+
+    def _record_start(self, model, waited):
+        with self._lock:
+            self.stats_counters["requests"] += 1
+            counters = self._model_counters[model]
+            counters["requests"] += 1
+            counters["in_flight"] += 1
+            counters["peak_in_flight"] = max(counters["peak_in_flight"], counters["in_flight"])
+            if waited:
+                counters["queued"] += 1
+                counters["wait_seconds"] += waited
+
+    def _shed(self):
+        with self._lock:
+            self.stats_counters["shed_requests"] += 1
+        return RequestShed("The OpenAI service is busy and did not answer in time. Please try again shortly.",
+                          f"downstream:{self.downstream.name}", self.downstream.retry_after())
+
+    def _acquire_downstream(self, priority):
+        if self.downstream is not None and not self.downstream.acquire(priority, self.downstream_timeout.get(priority)):
+            raise self._shed()
+
+    async def _aacquire_downstream(self, priority):
+        if self.downstream is not None and not await self.downstream.aacquire(priority, self.downstream_timeout.get(priority)):
+            raise self._shed()
+
+    def _release_downstream(self, priority, held_seconds=None):
+        if self.downstream is not None:
+            self.downstream.release(priority, held_seconds)
+
+    def _release_once(self, model, limiter, priority):
+        released, start = [], time.perf_counter()
+
+        def release():
+            with self._lock:
+                if released:
+                    return
+                released.append(True)
+                self._model_counters[model]["in_flight"] -= 1
+            limiter.release()
+            self._release_downstream(priority, time.perf_counter() - start)
+
+        return release
+
+    def _record_connection_event(self, event):
+        with self._lock:
+            if event == "connection.connect_tcp.complete":
+                self.stats_counters["new_connections"] += 1
+            elif event == "connection.start_tls.complete":
+                self.stats_counters["tls_handshakes"] += 1
+
+    def _record_response(self, response):
+        with self._lock:
+            if response.status_code == 429:
+                self.stats_counters["rate_limited"] += 1
+            elif response.status_code >= 500:
+                self.stats_counters["server_errors"] += 1
+            if response.extensions.get("http_version") == b"HTTP/2":
+                self.stats_counters["http2_responses"] += 1
+
+    @staticmethod
+    def _pool_connections(transport):
+        pool = getattr(transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        return len(connections), sum(1 for connection in connections if connection.is_idle())
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.stats_counters)
+            stats["by_model"] = {str(model): dict(counters) for model, counters in self._model_counters.items()}
+        open_sync, idle_sync = self._pool_connections(self._transport)
+        open_async, idle_async = self._pool_connections(self._async_transport)
+        stats["open_connections"] = open_sync + open_async
+        stats["idle_connections"] = idle_sync + idle_async
+        stats["http2"] = self.http2
+        stats["reused_connections"] = max(0, stats["requests"] - stats["new_connections"])
+        stats["reuse_rate"] = stats["reused_connections"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    def close(self):
+        self.http_client.close()
+
+    async def aclose(self):
+        await self.http_async_client.aclose()
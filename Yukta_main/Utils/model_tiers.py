@@ -0,0 +1,315 @@
+"""
+Per-role model tiering.
+
+Every supervisor, agent loop and tool chain declares a tier next to its prompt (MODEL_TIER = "routing" / "light" /
+"heavy"). ModelTierPolicy maps tiers to models: routing hops (Yukta Prime and the supervisors) and light agent loops
+(echoing a tool result, calling a formatting tool) run on a small model, heavy roles (SQL, research synthesis, writing)
+keep the model configured for the role in llm_config.
+
+A tiered role gets an EscalatingChatModel: the small model answers first and the call is re-run on the role's large
+model when the answer looks unreliable - an invalid or unknown tool call, an empty answer, a routing hop that answers
+a fresh request without delegating, an answer that ignores the tool_choice / parallel_tool_calls passed to bind_tools(),
+or (when logprobs are enabled) a low mean token probability. Chains with an output
+parser built through tiered_chain() also escalate when the small model's output fails to parse.
+"""
+import json
+import math
+import threading
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import CallbackManager
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, Field
+
+TIERS = ("routing", "light", "heavy")
+# An empty tier model means "use the role's own model from llm_config"
+DEFAULT_TIER_MODELS = {"routing": "gpt-4o-mini", "light": "gpt-4o-mini", "heavy": ""}
+
+
+def _delegated_since_request(messages):
+    """True once an agent/supervisor has handed back since the latest user message."""
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return False
+        if isinstance(message, AIMessage) and message.response_metadata.get("__is_handoff_back"):
+            return True
+    return False
+
+
+def _as_chunk(message):
+    """Models without native streaming yield one complete AIMessage from stream(); turn it into a chunk."""
+    if isinstance(message, AIMessageChunk):
+        return message
+    return AIMessageChunk(
+        content=message.content, id=message.id, response_metadata=message.response_metadata, usage_metadata=message.usage_metadata,
+        tool_call_chunks=[{"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i} for i, call in enumerate(message.tool_calls)],
+    )
+
+
+def _required_tool(tool_choice):
+    """None when tool_choice lets the model answer in text, "" when it must call some tool, else the tool it must call."""
+    if tool_choice in (None, False, "auto", "none"):
+        return None
+    if tool_choice in (True, "required", "any"):
+        return ""
+    if isinstance(tool_choice, dict):
+        return (tool_choice.get("function") or {}).get("name") or tool_choice.get("name") or ""
+    return str(tool_choice)
+
+
+def _mean_token_probability(message):
+    content = ((message.response_metadata or {}).get("logprobs") or {}).get("content") or []
+    logprobs = [token["logprob"] for token in content if "logprob" in token]
+    return math.exp(sum(logprobs) / len(logprobs)) if logprobs else None
+
+
+class EscalatingChatModel(BaseChatModel):
+    """
+    small / large:   chat models (or their bind_tools() bindings) of the cheap tier and of the role.
+    routing:         routing hop: answering a fresh request in text instead of delegating counts as low confidence.
+    min_confidence:  escalate when the mean token probability of a text answer is below this (needs logprobs=True).
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    small: Any
+    large: Any
+    tier: str = "light"
+    routing: bool = False
+    min_confidence: Optional[float] = None
+    tool_names: List[str] = Field(default_factory=list)
+    tool_kwargs: Dict[str, Any] = Field(default_factory=dict) # bind_tools() options such as tool_choice / parallel_tool_calls
+    stats: Dict[str, Any] = Field(default_factory=dict) # Shared with the policy and with bind_tools() copies
+    stats_lock: Any = Field(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self):
+        return "escalating-chat-model"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": f"{self._model_name(self.small)}->{self._model_name(self.large)}", "tier": self.tier}
+
+    @staticmethod
+    def _model_name(model):
+        model = getattr(model, "bound", model)
+        return getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={
+            "small": self.small.bind_tools(tools, **kwargs),
+            "large": self.large.bind_tools(tools, **kwargs),
+            "tool_names": [convert_to_openai_tool(t)["function"]["name"] for t in tools],
+            "tool_kwargs": dict(kwargs),
+        })
+
+    # ---------- escalation policy ----------
+
+    def escalation_reason(self, messages, message):
+        if message.invalid_tool_calls:
+            return "invalid_tool_call"
+        if any(call["name"] not in self.tool_names for call in message.tool_calls):
+            return "unknown_tool"
+        required = _required_tool(self.tool_kwargs.get("tool_choice"))
+        if required is not None and (not message.tool_calls or (required and any(call["name"] != required for call in message.tool_calls))):
+            return "missing_tool_call"
+        if self.tool_kwargs.get("parallel_tool_calls") is False and len(message.tool_calls) > 1:
+            return "parallel_tool_calls"
+        text = message.content if isinstance(message.content, str) else str(message.content)
+        if not message.tool_calls and not text.strip():
+            return "empty_answer"
+        if self.routing and self.tool_names and not message.tool_calls and not _delegated_since_request(messages):
+            return "answered_without_delegating"
+        if self.min_confidence and not message.tool_calls:
+            confidence = _mean_token_probability(message)
+            if confidence is not None and confidence < self.min_confidence:
+                return "low_confidence"
+        return None
+
+    def _holds_text(self, messages):
+        """Text can fail the checks too on a routing hop that still has to delegate, under a forced tool_choice or a confidence floor."""
+        if self.routing and self.tool_names and not _delegated_since_request(messages):
+            return True
+        return _required_tool(self.tool_kwargs.get("tool_choice")) is not None or bool(self.min_confidence)
+
+    def _record(self, reason, call=True):
+        with self.stats_lock:
+            if call:
+                self.stats["calls"] = self.stats.get("calls", 0) + 1
+            if reason:
+                self.stats["escalations"] = self.stats.get("escalations", 0) + 1
+                reasons = self.stats.setdefault("reasons", {})
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    @staticmethod
+    def _child_config(run_manager):
+        # Inner calls are traced as children of this call but not streamed: only the answer that is kept reaches the UI.
+        # LLM run managers have no get_child(), so the child manager is built the way ParentRunManager.get_child() does.
+        if not run_manager:
+            return None
+        manager = CallbackManager(handlers=[], parent_run_id=run_manager.run_id)
+        manager.set_handlers(run_manager.inheritable_handlers)
+        manager.add_tags(run_manager.inheritable_tags)
+        manager.add_metadata(run_manager.inheritable_metadata)
+        manager.add_tags(["nostream"], inherit=False)
+        return {"callbacks": manager}
+
+    @staticmethod
+    def _without_usage(message):
+        # Token usage is reported by the inner calls; dropping it here avoids counting it twice
+        return message.model_copy(update={"usage_metadata": None})
+
+    @staticmethod
+    def _without_text(message):
+        # The small model's text has already been streamed, so only the large model's tool calls are added to it
+        return message.model_copy(update={"content": "", "usage_metadata": None})
+
+    # ---------- sync ----------
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        config = self._child_config(run_manager)
+        message = self.small.invoke(messages, config=config, stop=stop, **kwargs)
+        reason = self.escalation_reason(messages, message)
+        self._record(reason)
+        if reason:
+            print(f"Model tier '{self.tier}': escalating to {self._model_name(self.large)} ({reason})")
+            message = self.large.invoke(messages, config=config, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=self._without_usage(message))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        """
+        Text of the small model is streamed as soon as it arrives (it cannot fail the checks any more); tool calls, and
+        everything the checks still apply to (see _holds_text()), are buffered until the whole answer is validated. When a
+        tool call that follows streamed text fails the checks, the large model's tool calls replace it after that text.
+        """
+        config = self._child_config(run_manager)
+        hold_text = self._holds_text(messages)
+        received, buffered, committed = [], [], False
+        for chunk in self.small.stream(messages, config=config, stop=stop, **kwargs):
+            chunk = _as_chunk(chunk)
+            received.append(chunk)
+            if not committed and not hold_text and isinstance(chunk.content, str) and chunk.content and not chunk.tool_call_chunks:
+                committed = True
+                for held in buffered:
+                    yield ChatGenerationChunk(message=self._without_usage(held))
+                buffered = []
+            if committed and not buffered and not chunk.tool_call_chunks:
+                yield ChatGenerationChunk(message=self._without_usage(chunk))
+            else:
+                buffered.append(chunk)
+        reason = self.escalation_reason(messages, sum(received[1:], received[0])) if received else None
+        self._record(reason)
+        if not reason:
+            for held in buffered:
+                yield ChatGenerationChunk(message=self._without_usage(held))
+            return
+        print(f"Model tier '{self.tier}': escalating to {self._model_name(self.large)} ({reason})")
+        for chunk in self.large.stream(messages, config=config, stop=stop, **kwargs):
+            chunk = _as_chunk(chunk)
+            yield ChatGenerationChunk(message=self._without_text(chunk) if committed else self._without_usage(chunk))
+
+    # ---------- async ----------
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        config = self._child_config(run_manager)
+        message = await self.small.ainvoke(messages, config=config, stop=stop, **kwargs)
+        reason = self.escalation_reason(messages, message)
+        self._record(reason)
+        if reason:
+            print(f"Model tier '{self.tier}': escalating to {self._model_name(self.large)} ({reason})")
+            message = await self.large.ainvoke(messages, config=config, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=self._without_usage(message))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        config = self._child_config(run_manager)
+        hold_text = self._holds_text(messages)
+        received, buffered, committed = [], [], False
+        async for chunk in self.small.astream(messages, config=config, stop=stop, **kwargs):
+            chunk = _as_chunk(chunk)
+            received.append(chunk)
+            if not committed and not hold_text and isinstance(chunk.content, str) and chunk.content and not chunk.tool_call_chunks:
+                committed = True
+                for held in buffered:
+                    yield ChatGenerationChunk(message=self._without_usage(held))
+                buffered = []
+            if committed and not buffered and not chunk.tool_call_chunks:
+                yield ChatGenerationChunk(message=self._without_usage(chunk))
+            else:
+                buffered.append(chunk)
+        reason = self.escalation_reason(messages, sum(received[1:], received[0])) if received else None
+        self._record(reason)
+        if not reason:
+            for held in buffered:
+                yield ChatGenerationChunk(message=self._without_usage(held))
+            return
+        print(f"Model tier '{self.tier}': escalating to {self._model_name(self.large)} ({reason})")
+        async for chunk in self.large.astream(messages, config=config, stop=stop, **kwargs):
+            chunk = _as_chunk(chunk)
+            yield ChatGenerationChunk(message=self._without_text(chunk) if committed else self._without_usage(chunk))
+
+
+def tiered_chain(prompt, llm, parser):
+    """
+    prompt | llm | parser, except that for a tiered llm a parse failure of the small model's output re-runs the chain
+    on the role's large model. Other errors (API, timeout, shed load) are raised as they are, not retried on the large model.
+    """
+    if not isinstance(llm, EscalatingChatModel):
+        return prompt | llm | parser
+
+    def _count_call(inputs):
+        llm._record(None)
+        return inputs
+
+    def _count_parse_escalation(inputs):
+        print(f"Model tier '{llm.tier}': output did not parse, escalating to {llm._model_name(llm.large)}")
+        llm._record("parse_failure", call=False) # The chain's call was counted when the small model ran
+        return inputs
+
+    return RunnableLambda(_count_call) | (prompt | llm.small | parser).with_fallbacks(
+        [RunnableLambda(_count_parse_escalation) | prompt | llm.large | parser], exceptions_to_handle=(OutputParserException,))
+
+
+class ModelTierPolicy:
+    """
+    tier_models:    {tier: model name}; an empty/missing entry keeps the role's own model.
+    model_factory:  callable(model_name, **kwargs) -> chat model (e.g. a ChatOpenAI constructor).
+    """
+
+    def __init__(self, model_factory, tier_models=None, enabled=True, min_confidence=None):
+        self.model_factory = model_factory
+        self.tier_models = dict(DEFAULT_TIER_MODELS if tier_models is None else tier_models)
+        self.enabled = enabled
+        self.min_confidence = min_confidence
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, tier, role_model, **model_kwargs):
+        """The model for a role of the given tier whose configured (large) model is role_model."""
+        if tier not in TIERS:
+            raise ValueError(f"Unknown model tier '{tier}'. Use one of {TIERS}.")
+        large = self.model_factory(role_model, **model_kwargs)
+        tier_model = self.tier_models.get(tier) if self.enabled else None
+        if not tier_model or tier_model == role_model:
+            return large
+        small_kwargs = {**model_kwargs, "logprobs": True} if self.min_confidence else model_kwargs
+        model = EscalatingChatModel(
+            small=self.model_factory(tier_model, **small_kwargs),
+            large=large,
+            tier=tier,
+            routing=tier == "routing",
+            min_confidence=self.min_confidence,
+            stats_lock=self._lock,
+        )
+        with self._lock:
+            model.stats = self._stats.setdefault(tier, {"calls": 0, "escalations": 0, "reasons": {}}) # Assigned, not validated: stays shared
+        return model
+
+    def stats(self):
+        with self._lock:
+            stats = {tier: {**counters, "reasons": dict(counters["reasons"])} for tier, counters in self._stats.items()}
+        for counters in stats.values():
+            counters["escalation_rate"] = counters["escalations"] / counters["calls"] if counters["calls"] else 0.0
+        return stats
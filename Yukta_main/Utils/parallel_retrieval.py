@@ -0,0 +1,135 @@
+import asyncio
+import inspect
+from typing import Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import ConfigDict, PrivateAttr
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+
+from Utils.admission import downstream_slot
+
+QUERY_VARIANTS_PROMPT = PromptTemplate(
+    template="""You are an AI language model assistant. Your task is to generate {num_variants} different versions of the given
+user question to retrieve relevant documents from a vector database. By generating multiple perspectives on the user
+question, your goal is to help the user overcome some of the limitations of distance-based similarity search.
+Provide these alternative questions separated by newlines, without numbering.
+Original question: {question}""",
+    input_variables=['question', 'num_variants'],
+)
+
+
+def _batched_query_embed(embedding):
+    """
+    The batched query-mode call of NVIDIAEmbeddings, or None. It is private (_embed(texts, model_type), as of
+    langchain-nvidia-ai-endpoints 0.3), so it is only used when its signature still matches; otherwise the public
+    embed_query() is used.
+    """
+    embed = getattr(embedding, "_embed", None)
+    if embed is None or type(embedding).__name__ != "NVIDIAEmbeddings":
+        return None
+    try:
+        parameters = inspect.signature(embed).parameters
+    except (TypeError, ValueError):
+        return None
+    return embed if "model_type" in parameters else None
+
+
+def embed_queries(embedding, texts, executor=None):
+    """
+    Embeds several search queries with as few round trips as possible.
+    NVIDIA retrieval models embed queries and passages differently, so embed_documents() (passage mode) would be
+    the wrong call here; use the batched query-mode endpoint when the embedding class exposes it, otherwise
+    issue the embed_query() calls concurrently on the given executor.
+    """
+    embed = _batched_query_embed(embedding)
+    if embed is not None:
+        return embed(texts, model_type="query")
+    if executor is not None:
+        return list(executor.map(embedding.embed_query, texts))
+    return [embedding.embed_query(text) for text in texts]
+
+
+def _doc_key(doc):
+    return (doc.page_content, doc.metadata.get("source"), doc.metadata.get("page"))
+
+
+def reciprocal_rank_fusion(result_lists, top_n, rrf_k=60):
+    """Dedupes and fuses ranked result lists: score(doc) = sum over lists of 1 / (rrf_k + rank)."""
+    scores, docs = {}, {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = _doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked[:top_n]]
+
+
+class ParallelMultiQueryRetriever(BaseRetriever):
+    """
+    Drop-in replacement for MultiQueryRetriever that fans out instead of looping:
+      1. one LLM call generates the query variants,
+      2. the original question and all variants are embedded in one batched call,
+      3. the vector searches run concurrently on a thread pool (or asyncio.gather for ainvoke),
+      4. results are deduped and fused with reciprocal-rank fusion.
+    Works with any LangChain VectorStore (Pinecone in production, InMemoryVectorStore for offline benchmarks).
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    llm: Any
+    vector_store: Any
+    embedding: Any
+    k: int = 4
+    num_variants: int = 3
+    fused_k: int = 8
+    max_workers: int = 8
+
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _variants_chain: Any = PrivateAttr(default=None)
+
+    def _chain(self):
+        if self._variants_chain is None:
+            # Runs inside a tool: the query variants are internal and must not stream out as answer tokens
+            self._variants_chain = (QUERY_VARIANTS_PROMPT | self.llm | StrOutputParser()).with_config(tags=["nostream"])
+        return self._variants_chain
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rag-search")
+        return self._executor
+
+    def _queries(self, question, variants_text):
+        variants = [line.strip() for line in variants_text.split("\n") if line.strip()]
+        return [question] + variants[:self.num_variants]
+
+    def _search(self, vector):
+        with downstream_slot("pinecone"):
+            return self.vector_store.similarity_search_by_vector(vector, k=self.k)
+
+    def search(self, question, question_vector=None):
+        """Retrieves fused documents; pass question_vector to reuse an embedding computed by the caller."""
+        queries = self._queries(question, self._chain().invoke({'question': question, 'num_variants': self.num_variants}))
+        to_embed = queries[1:] if question_vector is not None else queries
+        vectors = embed_queries(self.embedding, to_embed, self._pool()) if to_embed else []
+        if question_vector is not None:
+            vectors = [question_vector] + list(vectors)
+        result_lists = list(self._pool().map(self._search, vectors))
+        return reciprocal_rank_fusion(result_lists, self.fused_k)
+
+    async def asearch(self, question, question_vector=None):
+        variants_text = await self._chain().ainvoke({'question': question, 'num_variants': self.num_variants})
+        queries = self._queries(question, variants_text)
+        to_embed = queries[1:] if question_vector is not None else queries
+        vectors = await asyncio.to_thread(embed_queries, self.embedding, to_embed, self._pool()) if to_embed else []
+        if question_vector is not None:
+            vectors = [question_vector] + list(vectors)
+        result_lists = await asyncio.gather(*(asyncio.to_thread(self._search, vector) for vector in vectors))
+        return reciprocal_rank_fusion(result_lists, self.fused_k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self.search(query)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return await self.asearch(query)
@@ -0,0 +1,218 @@
+"""
+Planner/executor mode for Yukta Prime.
+
+Instead of delegating one supervisor at a time, a planner LLM call turns the request into a DAG of supervisor calls
+with declared dependencies. A scheduler node then dispatches every step whose dependencies are satisfied in parallel
+(LangGraph Send), joins their results, and repeats until the plan is done; a final LLM call synthesizes the answer.
+Independent steps ("sales by region AND my calendar this week AND research competitor X") therefore take as long as
+the slowest one instead of the sum of all of them. If no usable plan can be produced, the request falls back to the
+regular sequential Yukta Prime supervisor.
+"""
+from typing import Annotated, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, MessagesState, START, END
+from langgraph.types import Send
+from Utils.model_tiers import tiered_chain
+
+SUPERVISOR_NAMES = ("communication_supervisor", "personal_supervisor", "company_supervisor")
+PLANNER_NODE = "planner"
+SCHEDULER_NODE = "scheduler"
+SYNTHESIZER_NODE = "synthesizer"
+FALLBACK_NODE = "yukta_prime"
+
+
+class PlanStep(BaseModel):
+    id: str = Field(description="Short unique identifier of the step, e.g. 's1'.")
+    supervisor: Literal["communication_supervisor", "personal_supervisor", "company_supervisor"] = Field(description="Supervisor that executes the step.")
+    instruction: str = Field(description="Self-contained instruction for the supervisor.")
+    depends_on: List[str] = Field(default_factory=list, description="Ids of the steps whose results this step needs as input.")
+
+
+class ExecutionPlan(BaseModel):
+    steps: List[PlanStep] = Field(description="Steps of the plan. Steps without dependencies between them run in parallel.")
+
+
+def _merge_results(left, right):
+    """Reducer for step results; None resets them at the start of a new plan."""
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
+class PlanState(MessagesState):
+    plan: Optional[List[dict]]
+    results: Annotated[Dict[str, str], _merge_results]
+
+
+planner_prompt = PromptTemplate(
+    template="""You are the planner of 'Yukta Prime', a multi-agent assistant. Break the user's latest request into steps,
+each handled by exactly one of these supervisors:
+- communication_supervisor: emails, LinkedIn posts and general web research.
+- personal_supervisor: personal documents (college syllabus) and calendar tasks (scheduling, reminders, finding events).
+- company_supervisor: company sales data, sales charts and business insights.
+
+Rules:
+- Use as few steps as possible; a request one supervisor can handle is a single step.
+- Every instruction must be self-contained (include names, dates and details from the conversation).
+- Only add a dependency when a step truly needs another step's output (e.g. an email that must include sales figures).
+  Independent steps must NOT depend on each other, so they can run in parallel.
+
+Conversation:
+{conversation}
+
+{format_instructions}""",
+    input_variables=['conversation'],
+)
+
+synthesis_prompt = PromptTemplate(
+    template="""You are 'Yukta Prime'. Combine the results of the executed plan into one clear, well-structured answer to the
+user's request. Keep file paths (e.g. chart images) and drafted texts exactly as they are. If a step failed, say so.
+End with a short, relevant proactive suggestion for a next step.
+
+User request: {request}
+
+Step results:
+{results}
+
+Answer:""",
+    input_variables=['request', 'results'],
+)
+
+
+def _conversation_text(messages, max_messages=10):
+    lines = []
+    for msg in messages[-max_messages:]:
+        role = "User" if isinstance(msg, HumanMessage) else "Assistant"
+        if isinstance(msg.content, str) and msg.content.strip():
+            lines.append(f"{role}: {msg.content}")
+    return "\n".join(lines)
+
+
+def _latest_request(messages):
+    return next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+
+
+def _step_input(step, results):
+    """The supervisor sees its instruction plus the results of the steps it depends on."""
+    context = "\n\n".join(f"[Result of step {dep}]\n{results[dep]}" for dep in step["depends_on"] if dep in results)
+    content = f"{step['instruction']}\n\nUse these results from earlier steps:\n{context}" if context else step['instruction']
+    return {"messages": [HumanMessage(content=content)]}
+
+
+def _final_text(output):
+    for msg in reversed(output.get("messages", [])):
+        if isinstance(msg, AIMessage) and isinstance(msg.content, str) and msg.content.strip() \
+                and not msg.response_metadata.get("__is_handoff_back"):
+            return msg.content
+    return "The step finished without producing an answer."
+
+
+def _step_node(supervisor_graph):
+    """Runs one plan step on a supervisor graph; failures become the step's result instead of aborting the plan."""
+    def _run(payload, config):
+        step = payload["step"]
+        try:
+            output = supervisor_graph.invoke(_step_input(step, payload["results"]), config)
+            return {"results": {step["id"]: _final_text(output)}}
+        except Exception as e:
+            return {"results": {step["id"]: f"Error: step failed: {e}"}}
+
+    async def _arun(payload, config):
+        step = payload["step"]
+        try:
+            output = await supervisor_graph.ainvoke(_step_input(step, payload["results"]), config)
+            return {"results": {step["id"]: _final_text(output)}}
+        except Exception as e:
+            return {"results": {step["id"]: f"Error: step failed: {e}"}}
+
+    return RunnableLambda(_run, afunc=_arun)
+
+
+def _validated_steps(plan):
+    """Drops dependencies on unknown or later-undefined steps and duplicate ids."""
+    steps, seen = [], set()
+    for step in plan.steps:
+        if step.id in seen:
+            continue
+        seen.add(step.id)
+        steps.append(step.model_dump())
+    ids = {step["id"] for step in steps}
+    for step in steps:
+        step["depends_on"] = [dep for dep in step["depends_on"] if dep in ids and dep != step["id"]]
+    return steps
+
+
+def build_plan_executor_graph(planner_llm, supervisor_graphs, fallback_graph, name="yukta_prime", checkpointer=None):
+    """
+    planner_llm:       model used for the planning and synthesis calls.
+    supervisor_graphs: compiled supervisor graphs; node names are their .name, so streamed handoff paths stay readable.
+    fallback_graph:    the sequential Yukta Prime graph, used when no usable plan is produced.
+    """
+    parser = PydanticOutputParser(pydantic_object=ExecutionPlan)
+    planner_chain = tiered_chain(planner_prompt.partial(format_instructions=parser.get_format_instructions()), planner_llm, parser)
+    synthesis_chain = synthesis_prompt | planner_llm | StrOutputParser()
+    supervisor_names = [graph.name for graph in supervisor_graphs]
+
+    def _planned(plan):
+        steps = _validated_steps(plan)
+        if not steps or any(step["supervisor"] not in supervisor_names for step in steps):
+            return {"plan": None, "results": None}
+        print(f"Yukta Prime plan: {[(s['id'], s['supervisor'], s['depends_on']) for s in steps]}")
+        return {"plan": steps, "results": None}
+
+    def plan_request(state):
+        try:
+            return _planned(planner_chain.invoke({'conversation': _conversation_text(state["messages"])}))
+        except Exception as e:
+            print(f"Planner failed, falling back to sequential Yukta Prime: {e}")
+            return {"plan": None, "results": None}
+
+    async def aplan_request(state):
+        try:
+            return _planned(await planner_chain.ainvoke({'conversation': _conversation_text(state["messages"])}))
+        except Exception as e:
+            print(f"Planner failed, falling back to sequential Yukta Prime: {e}")
+            return {"plan": None, "results": None}
+
+    def dispatch(state):
+        """Join point: sends every step whose dependencies are done; all steps in one wave run concurrently."""
+        plan, results = state.get("plan"), state.get("results") or {}
+        if not plan:
+            return FALLBACK_NODE
+        pending = [step for step in plan if step["id"] not in results]
+        if not pending:
+            return SYNTHESIZER_NODE
+        ready = [step for step in pending if all(dep in results for dep in step["depends_on"])]
+        if not ready: # Dependency cycle: run what is left rather than stalling
+            ready = pending
+        return [Send(step["supervisor"], {"step": step, "results": results}) for step in ready]
+
+    def _synthesis_inputs(state):
+        results = state["results"]
+        return {'request': _latest_request(state["messages"]),
+                'results': "\n\n".join(f"[{step['id']} - {step['supervisor']}] {results.get(step['id'], 'Not executed.')}" for step in state["plan"])}
+
+    def synthesize(state):
+        return {"messages": [AIMessage(content=synthesis_chain.invoke(_synthesis_inputs(state)), name=name)]}
+
+    async def asynthesize(state):
+        return {"messages": [AIMessage(content=await synthesis_chain.ainvoke(_synthesis_inputs(state)), name=name)]}
+
+    builder = StateGraph(PlanState)
+    builder.add_node(PLANNER_NODE, RunnableLambda(plan_request, afunc=aplan_request))
+    builder.add_node(SCHEDULER_NODE, lambda state: {})
+    builder.add_node(SYNTHESIZER_NODE, RunnableLambda(synthesize, afunc=asynthesize))
+    builder.add_node(FALLBACK_NODE, fallback_graph)
+    for graph in supervisor_graphs:
+        builder.add_node(graph.name, _step_node(graph))
+        builder.add_edge(graph.name, SCHEDULER_NODE)
+    builder.add_edge(START, PLANNER_NODE)
+    builder.add_edge(PLANNER_NODE, SCHEDULER_NODE)
+    builder.add_conditional_edges(SCHEDULER_NODE, dispatch, supervisor_names + [SYNTHESIZER_NODE, FALLBACK_NODE])
+    builder.add_edge(SYNTHESIZER_NODE, END)
+    builder.add_edge(FALLBACK_NODE, END)
+    return builder.compile(checkpointer=checkpointer, name=name)
@@ -0,0 +1,217 @@
+"""
+Incremental, content-hashed ingestion of the RAG document corpus into the vector index.
+
+A local SQLite manifest records the hash of every ingested file and of every chunk. On each run only new or changed
+files are loaded and split (in a process pool), only chunks whose content is new are embedded and upserted (in
+batches), and vectors belonging to chunks or files that disappeared are deleted. Vector IDs are derived from the file
+path and chunk content, so unchanged chunks keep their IDs even when surrounding text shifts.
+
+Vectors from before the manifest (the old full reload, with random IDs) would otherwise survive next to the new ones and
+duplicate every chunk. The first run on a manifest deletes them once by their 'source' metadata and re-ingests all
+files. Indexes that cannot delete by metadata (Pinecone serverless) need a one-time --reset-index instead.
+
+Usage (from Yukta_main/):
+    python -m Utils.rag_ingestion --data-path ./TestData --index rag-documents-index
+    python -m Utils.rag_ingestion --data-path ./TestData --index rag-documents-index --reset-index
+"""
+import os
+import glob
+import time
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from Utils.semantic_cache import bump_index_generation, DEFAULT_GENERATION_MARKER
+
+DEFAULT_MANIFEST_PATH = "rag_manifest.sqlite"
+_LEGACY_PURGED = "legacy_vectors_purged"
+
+
+def _open_manifest(manifest_path):
+    conn = sqlite3.connect(manifest_path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, file_hash TEXT NOT NULL, pages INTEGER, ingested_at REAL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS chunks (vector_id TEXT PRIMARY KEY, path TEXT NOT NULL, chunk_hash TEXT NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS chunks_by_path ON chunks (path)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+
+def _reset_manifest(conn, legacy_purged):
+    with conn:
+        conn.execute("DELETE FROM chunks")
+        conn.execute("DELETE FROM files")
+        if legacy_purged:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (_LEGACY_PURGED, str(time.time())))
+
+
+def _purge_legacy_vectors(vector_store, conn, paths, batch_size):
+    """
+    Deletes every vector whose 'source' is one of paths (legacy random-ID vectors and any this manifest wrote), then
+    resets the manifest so the run re-ingests all files under deterministic IDs. Runs once per manifest.
+    """
+    paths = sorted(paths)
+    try:
+        for start in range(0, len(paths), batch_size):
+            vector_store.delete(filter={"source": {"$in": paths[start:start + batch_size]}})
+    except Exception as e:
+        raise RuntimeError("Could not delete the vectors of the previous ingestion by their 'source' metadata "
+                           f"({e}). Re-run once with --reset-index to empty the index and ingest everything again.") from e
+    _reset_manifest(conn, legacy_purged=True)
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_vector_id(path, chunk_hash):
+    return hashlib.sha256(f"{path}:{chunk_hash}".encode()).hexdigest()[:40]
+
+
+def _load_and_split(path, chunk_size, chunk_overlap):
+    """Process-pool worker: loads one PDF and splits it. Returns (path, page_count, [(text, metadata), ...])."""
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    pages = PyPDFLoader(path).load()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = splitter.split_documents(pages)
+    return path, len(pages), [(chunk.page_content, chunk.metadata) for chunk in chunks]
+
+
+def _upsert_in_batches(vector_store, items, batch_size):
+    """items: [(vector_id, text, metadata)]. Each batch is one embedding request plus one upsert."""
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        vector_store.add_texts(
+            [text for _, text, _ in batch],
+            metadatas=[metadata for _, _, metadata in batch],
+            ids=[vector_id for vector_id, _, _ in batch],
+        )
+
+
+def _delete_vectors(vector_store, vector_ids, batch_size):
+    vector_ids = list(vector_ids)
+    for start in range(0, len(vector_ids), batch_size):
+        vector_store.delete(ids=vector_ids[start:start + batch_size])
+
+
+def ingest_directory(data_path, vector_store, manifest_path=DEFAULT_MANIFEST_PATH, glob_pattern="**/*.pdf",
+                     chunk_size=1500, chunk_overlap=300, batch_size=64, max_workers=None,
+                     generation_marker=DEFAULT_GENERATION_MARKER, reset_index=False):
+    """
+    Brings vector_store in sync with the PDFs under data_path, touching only what changed.
+    reset_index empties the whole index (delete_all) and the manifest first, then ingests everything.
+    Returns a report dict with counts and pages/sec and chunks/sec throughput.
+    """
+    start_time = time.perf_counter()
+    conn = _open_manifest(manifest_path)
+    try:
+        return _ingest(conn, data_path, vector_store, glob_pattern, chunk_size, chunk_overlap, batch_size, max_workers,
+                       generation_marker, reset_index, start_time)
+    finally:
+        conn.close()
+
+
+def _ingest(conn, data_path, vector_store, glob_pattern, chunk_size, chunk_overlap, batch_size, max_workers,
+            generation_marker, reset_index, start_time):
+    current_files = {os.path.normpath(path): file_sha256(path)
+                     for path in glob.glob(os.path.join(data_path, glob_pattern), recursive=True)}
+    legacy_purged = conn.execute("SELECT 1 FROM meta WHERE key = ?", (_LEGACY_PURGED,)).fetchone() is not None
+    if reset_index:
+        vector_store.delete(delete_all=True)
+        _reset_manifest(conn, legacy_purged=True)
+    elif not legacy_purged:
+        known = [row[0] for row in conn.execute("SELECT path FROM files")]
+        _purge_legacy_vectors(vector_store, conn, set(current_files) | set(known), batch_size)
+    known_files = dict(conn.execute("SELECT path, file_hash FROM files").fetchall())
+    changed = [path for path, file_hash in current_files.items() if known_files.get(path) != file_hash]
+    removed = [path for path in known_files if path not in current_files]
+
+    report = {"files_scanned": len(current_files), "files_changed": len(changed), "files_removed": len(removed),
+              "pages": 0, "chunks_total": 0, "chunks_embedded": 0, "chunks_unchanged": 0, "vectors_deleted": 0}
+
+    # Files that no longer exist: drop all of their vectors
+    for path in removed:
+        stale_ids = [row[0] for row in conn.execute("SELECT vector_id FROM chunks WHERE path = ?", (path,))]
+        _delete_vectors(vector_store, stale_ids, batch_size)
+        with conn:
+            conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        report["vectors_deleted"] += len(stale_ids)
+
+    if changed:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(_load_and_split, changed, [chunk_size] * len(changed), [chunk_overlap] * len(changed))
+            for path, page_count, chunks in results:
+                current = {}
+                for text, metadata in chunks:
+                    chunk_hash = hashlib.sha256(text.encode()).hexdigest()
+                    current[chunk_vector_id(path, chunk_hash)] = (chunk_hash, text, metadata)
+                existing = {row[0] for row in conn.execute("SELECT vector_id FROM chunks WHERE path = ?", (path,))}
+
+                new_items = [(vector_id, text, metadata) for vector_id, (_, text, metadata) in current.items() if vector_id not in existing]
+                stale_ids = existing - current.keys()
+                _upsert_in_batches(vector_store, new_items, batch_size)
+                _delete_vectors(vector_store, stale_ids, batch_size)
+
+                # Only record the file once its vectors are in place, so a crash mid-file is retried next run
+                with conn:
+                    conn.executemany("DELETE FROM chunks WHERE vector_id = ?", [(vector_id,) for vector_id in stale_ids])
+                    conn.executemany("INSERT OR REPLACE INTO chunks (vector_id, path, chunk_hash) VALUES (?, ?, ?)",
+                                     [(vector_id, path, chunk_hash) for vector_id, (chunk_hash, _, _) in current.items()])
+                    conn.execute("INSERT OR REPLACE INTO files (path, file_hash, pages, ingested_at) VALUES (?, ?, ?, ?)",
+                                 (path, current_files[path], page_count, time.time()))
+
+                report["pages"] += page_count
+                report["chunks_total"] += len(current)
+                report["chunks_embedded"] += len(new_items)
+                report["chunks_unchanged"] += len(current) - len(new_items)
+                report["vectors_deleted"] += len(stale_ids)
+                print(f"Ingested {path}: {page_count} pages, {len(new_items)} new chunks, {len(stale_ids)} removed.")
+
+    if report["chunks_embedded"] or report["vectors_deleted"] or reset_index:
+        bump_index_generation(generation_marker) # Invalidate cached RAG answers built on the old index
+
+    elapsed = time.perf_counter() - start_time
+    report["seconds"] = elapsed
+    report["pages_per_sec"] = report["pages"] / elapsed if elapsed else 0.0
+    report["chunks_per_sec"] = report["chunks_total"] / elapsed if elapsed else 0.0
+    return report
+
+
+def main():
+    from dotenv import load_dotenv
+    from pinecone import Pinecone
+    from langchain_pinecone import PineconeVectorStore
+    from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default="./TestData")
+    parser.add_argument("--index", default=os.getenv("PINECONE_INDEX_NAME", "rag-documents-index"))
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH)
+    parser.add_argument("--embedding-model", default="nvidia/llama-3.2-nv-embedqa-1b-v2")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for PDF loading (default: CPU count).")
+    parser.add_argument("--reset-index", action="store_true", help="Delete every vector in the index and re-ingest all files.")
+    args = parser.parse_args()
+
+    embedding = NVIDIAEmbeddings(model=args.embedding_model, nvidia_api_key=os.getenv("NVIDIA_API_KEY"))
+    index = Pinecone(api_key=os.getenv("PINECONE_API_KEY")).Index(args.index)
+    vector_store = PineconeVectorStore(index=index, embedding=embedding)
+
+    report = ingest_directory(args.data_path, vector_store, manifest_path=args.manifest,
+                              batch_size=args.batch_size, max_workers=args.workers, reset_index=args.reset_index)
+    print(f"Scanned {report['files_scanned']} files: {report['files_changed']} changed, {report['files_removed']} removed.")
+    print(f"Chunks: {report['chunks_embedded']} embedded, {report['chunks_unchanged']} unchanged, {report['vectors_deleted']} vectors deleted.")
+    print(f"Throughput: {report['pages_per_sec']:.1f} pages/sec, {report['chunks_per_sec']:.1f} chunks/sec ({report['seconds']:.1f}s total).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import uuid
+import time
+import threading
+from collections import OrderedDict
+
+
+class ResultStore:
+    """
+    In-process store of SQL query results, addressed by short result_id handles.
+
+    The LLM only ever sees a handle, the column names, the row count and a small preview; downstream tools
+    (generate_chart_tool) look the handle up and re-use the stored SQL instead of receiving rows through the model.
+    Only the first max_rows rows of a result are materialized; row_count reflects the full result, or is None when
+    the result was truncated and counting it was too expensive (the SQL guard rejected or timed out the COUNT).
+    """
+
+    def __init__(self, max_entries=128, max_rows=10000, preview_rows=20):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.preview_rows = preview_rows
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def put(self, sql, df, row_count=None, truncated=None):
+        result_id = "res_" + uuid.uuid4().hex[:10]
+        entry = {
+            "result_id": result_id,
+            "sql": sql,
+            "df": df,
+            "columns": [str(column) for column in df.columns],
+            "row_count": len(df) if row_count is None and not truncated else row_count,
+            "truncated": truncated if truncated is not None else row_count is not None and row_count > len(df),
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._entries[result_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id):
+        with self._lock:
+            entry = self._entries.get(result_id.strip()) if result_id else None
+            if entry is not None:
+                self._entries.move_to_end(entry["result_id"])
+            return entry
+
+    def describe(self, result_id):
+        """Compact, LLM-facing summary of a stored result: handle, shape and a CSV preview."""
+        entry = self.get(result_id)
+        if entry is None:
+            return f"Error: unknown or expired result_id '{result_id}'."
+        preview = entry["df"].head(self.preview_rows)
+        row_count = entry["row_count"] if entry["row_count"] is not None else f"more than {len(entry['df'])}"
+        shown = "all rows" if len(preview) == entry["row_count"] else f"first {len(preview)} of {row_count} rows"
+        note = ""
+        if entry["truncated"]:
+            note = (f"note: only the first {len(entry['df'])} rows were kept. Aggregate in SQL (GROUP BY, COUNT, SUM) "
+                    "or add a WHERE filter instead of reading individual rows.\n")
+        return (f"result_id: {entry['result_id']}\n"
+                f"rows: {row_count}, columns: {', '.join(entry['columns'])}\n"
+                f"{note}data ({shown}, CSV):\n{preview.to_csv(index=False)}")
@@ -0,0 +1,274 @@
+"""
+Bounded run queue with a fixed pool of async workers, used by the HTTP server (server.py).
+
+Every user message becomes a Run: it waits in a bounded queue until one of the workers picks it up, and every event
+the graph produces is appended to the run, so any number of subscribers (an SSE stream, a WebSocket, a client that
+reconnects with Last-Event-ID) can follow it from any position. The queue applies backpressure instead of letting
+work pile up:
+
+    - QueueFull when max_queue runs are already waiting (the server answers 429 with a Retry-After estimate);
+    - ThreadBusy when the conversation already has a queued or running run, since turns of one thread must be
+      checkpointed in order (409);
+    - ShuttingDown once shutdown() has started (503);
+    - Overloaded from the admission controller (Utils/admission.py), if one is given: the user's rate limit, the cap
+      on active runs or a saturated downstream service (429 with the controller's message).
+
+Runs have a priority class: workers always take queued "interactive" runs before "batch" ones, and batch runs may
+fill at most batch_queue_share of the queue, so a batch job never leaves chat users without a queue slot.
+
+shutdown() stops accepting runs, lets the queued and running ones finish for up to drain_timeout seconds, and then
+cancels what is left; cancelled runs end with an error event, so no client waits forever.
+
+The queue does not know about LangGraph: run_fn(thread_id, message) is any async generator of event dicts.
+"""
+import math
+import time
+import uuid
+import asyncio
+import itertools
+import statistics
+from collections import deque
+
+from Utils.admission import PRIORITIES, admission_priority, find_overloaded
+
+
+class QueueFull(Exception):
+    reason = "queue_full" # Sent as X-Yukta-Reject-Reason, like Overloaded.reason: clients only retry this one
+
+    def __init__(self, retry_after):
+        super().__init__(f"The run queue is full, retry in {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class ThreadBusy(Exception):
+    pass
+
+
+class ShuttingDown(Exception):
+    pass
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+class Run:
+    def __init__(self, thread_id, message, priority="interactive", ticket=None):
+        self.run_id = f"run_{uuid.uuid4().hex[:16]}"
+        self.thread_id = thread_id
+        self.message = message
+        self.priority = priority
+        self.ticket = ticket # AdmissionTicket, released when the run finishes
+        self.status = "queued" # queued -> running -> completed | failed | cancelled
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.final = None
+        self.error = None
+        self.events = []
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def publish(self, event):
+        self.events.append({"seq": len(self.events) + 1, **event})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self, after=0, heartbeat=None):
+        """
+        Yields the events after sequence number `after`, then new ones as they are published, until the run is done.
+        With heartbeat (seconds), yields None whenever no event arrived for that long (for keep-alive comments).
+        """
+        while True:
+            while after < len(self.events):
+                after += 1
+                yield self.events[after - 1]
+            if self.done:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def describe(self):
+        return {
+            "run_id": self.run_id, "thread_id": self.thread_id, "priority": self.priority, "status": self.status, "created_at": self.created_at,
+            "started_at": self.started_at, "finished_at": self.finished_at, "final": self.final, "error": self.error,
+            "events": len(self.events),
+        }
+
+
+class RunQueue:
+    """
+    run_fn:             async generator function (thread_id, message) -> event dicts; an event of type "final" carries
+                        the answer in "content".
+    workers:            runs executed concurrently.
+    max_queue:          runs allowed to wait for a worker; more are rejected with QueueFull.
+    run_timeout:        seconds after which a running run is cancelled and fails.
+    retention_seconds:  how long a finished run (and its events) stays available to late subscribers.
+    admission:          optional AdmissionController asked before a run is queued.
+    batch_queue_share:  share of the queue batch runs may fill.
+    """
+
+    def __init__(self, run_fn, workers=8, max_queue=64, run_timeout=600, retention_seconds=600, admission=None, batch_queue_share=0.5):
+        self.run_fn = run_fn
+        self.workers = workers
+        self.max_queue = max_queue
+        self.admission = admission
+        self.max_batch_queue = max(1, int(max_queue * batch_queue_share))
+        self.run_timeout = run_timeout
+        self.retention_seconds = retention_seconds
+        self._queue = None
+        self._tasks = []
+        self._runs = {}
+        self._active_threads = {} # thread_id -> run_id of its queued or running run
+        self._accepting = False
+        self._running = 0
+        self._queued = {priority: 0 for priority in PRIORITIES}
+        self._order = itertools.count() # FIFO within a priority class
+        self._queue_waits = deque(maxlen=500)
+        self._run_seconds = deque(maxlen=500)
+        self.stats_counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected_full": 0, "rejected_busy": 0,
+                               "rejected_admission": 0}
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"yukta-run-worker-{i}") for i in range(self.workers)]
+        self._accepting = True
+
+    # ---------- submission ----------
+
+    def retry_after(self):
+        """Rough seconds until a queue slot frees up, from recent run durations."""
+        mean_run = statistics.fmean(self._run_seconds) if self._run_seconds else 5.0
+        return max(1, math.ceil(mean_run * (self._queue.qsize() + 1) / self.workers))
+
+    def submit(self, thread_id, message, priority="interactive", user_id=None):
+        """Queues a run. user_id is what the admission controller rate-limits (the thread_id by default)."""
+        if not self._accepting:
+            raise ShuttingDown("The server is shutting down and does not accept new runs.")
+        if thread_id in self._active_threads:
+            self.stats_counters["rejected_busy"] += 1
+            raise ThreadBusy(f"Thread '{thread_id}' already has a run in progress ({self._active_threads[thread_id]}).")
+        if self._queue.full() or (priority == "batch" and self._queued["batch"] >= self.max_batch_queue):
+            self.stats_counters["rejected_full"] += 1
+            raise QueueFull(self.retry_after())
+        ticket = None
+        if self.admission is not None:
+            try:
+                ticket = self.admission.admit(user_id or thread_id, priority)
+            except Exception:
+                self.stats_counters["rejected_admission"] += 1
+                raise
+        run = Run(thread_id, message, priority, ticket)
+        self._queue.put_nowait((PRIORITIES.index(priority), next(self._order), run))
+        self._queued[priority] += 1
+        self._runs[run.run_id] = run
+        self._active_threads[thread_id] = run.run_id
+        self.stats_counters["submitted"] += 1
+        run.publish({"type": "queued", "run_id": run.run_id, "position": self._queue.qsize()})
+        return run
+
+    def get(self, run_id):
+        return self._runs.get(run_id)
+
+    # ---------- execution ----------
+
+    async def _worker(self):
+        while True:
+            _, _, run = await self._queue.get()
+            self._queued[run.priority] -= 1
+            try:
+                await self._execute(run)
+            finally:
+                self._queue.task_done()
+
+    async def _consume(self, run):
+        with admission_priority(run.priority): # Downstream slots taken by this run are served by its priority
+            async for event in self.run_fn(run.thread_id, run.message):
+                if event.get("type") == "final":
+                    run.final = event.get("content")
+                run.publish(event)
+
+    async def _execute(self, run):
+        run.status, run.started_at = "running", time.time()
+        self._running += 1
+        self._queue_waits.append(run.started_at - run.created_at)
+        run.publish({"type": "started", "queue_seconds": round(run.started_at - run.created_at, 3)})
+        try:
+            await asyncio.wait_for(self._consume(run), self.run_timeout)
+            run.status = "completed"
+        except asyncio.CancelledError:
+            run.status, run.error = "cancelled", "The server shut down before the run finished."
+            run.publish({"type": "error", "message": run.error})
+            raise
+        except asyncio.TimeoutError:
+            run.status, run.error = "failed", f"The run did not finish within {self.run_timeout}s."
+            run.publish({"type": "error", "message": run.error})
+        except Exception as e:
+            print(f"Run {run.run_id} on thread '{run.thread_id}' failed: {e}")
+            overloaded = find_overloaded(e)
+            run.status, run.error = "failed", str(overloaded or e)
+            if overloaded is not None: # Shed inside the run (a downstream slot did not free up): the message is for the user
+                run.publish({"type": "error", "message": run.error, "reason": overloaded.reason, "retry_after": overloaded.retry_after})
+            else:
+                run.publish({"type": "error", "message": run.error})
+        finally:
+            self._running -= 1
+            self._finish(run)
+
+    def _finish(self, run):
+        run.finished_at = time.time()
+        if run.ticket is not None:
+            run.ticket.release()
+        if run.started_at is not None:
+            self._run_seconds.append(run.finished_at - run.started_at)
+        self.stats_counters[run.status if run.status in ("completed", "failed") else "cancelled"] += 1
+        if self._active_threads.get(run.thread_id) == run.run_id:
+            del self._active_threads[run.thread_id]
+        run.publish({"type": "done", "status": run.status})
+        asyncio.get_running_loop().call_later(self.retention_seconds, self._runs.pop, run.run_id, None)
+
+    # ---------- shutdown ----------
+
+    async def shutdown(self, drain_timeout=30):
+        """Stops accepting runs, waits up to drain_timeout seconds for queued and running ones, then cancels the rest."""
+        self._accepting = False
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"Run queue: {self._running} running and {self._queue.qsize()} queued runs did not finish within {drain_timeout}s, cancelling them")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while not self._queue.empty():
+            _, _, run = self._queue.get_nowait()
+            self._queued[run.priority] -= 1
+            run.status, run.error = "cancelled", "The server shut down before the run started."
+            run.publish({"type": "error", "message": run.error})
+            self._finish(run)
+
+    @property
+    def accepting(self):
+        return self._accepting
+
+    def stats(self):
+        return {
+            **self.stats_counters,
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queued_by_priority": dict(self._queued),
+            "max_queue": self.max_queue,
+            "accepting": self._accepting,
+            "queue_wait_p50_s": _percentile(self._queue_waits, 0.5),
+            "queue_wait_p95_s": _percentile(self._queue_waits, 0.95),
+            "run_p50_s": _percentile(self._run_seconds, 0.5),
+            "run_p95_s": _percentile(self._run_seconds, 0.95),
+        }
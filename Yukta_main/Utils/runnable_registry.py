@@ -0,0 +1,22 @@
+_registry = {}
+
+
+def register_runnable(name, runnable):
+    """
+    Registers a pre-built runnable (prompt | llm | parser chain, retriever, ...) under a dotted name such as
+    'rag.answer_chain'. The init_*_agent() functions call this once at initialize_yukta_graph time so tools
+    reuse the same compiled chain on every call instead of rebuilding it.
+    """
+    _registry[name] = runnable
+    return runnable
+
+
+def get_runnable(name):
+    if name not in _registry:
+        raise KeyError(f"Runnable '{name}' is not registered. Ensure the owning init_*_agent() function was called.")
+    return _registry[name]
+
+
+def registered_runnables():
+    """Returns a snapshot {name: runnable} of everything registered so far."""
+    return dict(_registry)
@@ -0,0 +1,157 @@
+"""
+On-disk snapshot cache for SQL schema introspection (SQLDatabase.get_table_info).
+
+get_table_info() reflects the table and runs a sample-rows query, which is slow on the large production 'sales' table
+and used to repeat on every Streamlit session restart and on every sql_db_schema tool call. Snapshots are stored per
+database (keyed by a hash of the DB URI, never the URI itself) together with a cheap schema fingerprint built from the
+column catalogue; a snapshot is only reused while the fingerprint still matches. When a table's fingerprint changes
+(or the snapshot is refreshed), on_change(table_names) is called so callers can drop state built on the old schema.
+
+Usage (from Yukta_main/):
+    python -m Utils.schema_cache --refresh --tables sales
+
+The CLI rewrites the on-disk snapshot. A running server re-checks fingerprints every verify_interval seconds; to make it
+re-introspect at once (and drop its question -> SQL cache), call POST /admin/sales-schema/refresh instead.
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from sqlalchemy import text, bindparam
+
+DEFAULT_CACHE_DIR = ".schema_cache"
+
+
+def schema_fingerprint(engine, table_names):
+    """Hashes (table, column, type) rows from the catalogue: one cheap query, no reflection and no sample rows."""
+    rows = []
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            for table in sorted(table_names):
+                rows += [(table, row[1], row[2]) for row in conn.execute(text(f'PRAGMA table_info("{table}")'))]
+        else:
+            query = text("SELECT table_name, column_name, data_type FROM information_schema.columns "
+                         "WHERE table_name IN :tables ORDER BY table_name, ordinal_position"
+                         ).bindparams(bindparam("tables", expanding=True))
+            rows = [tuple(row) for row in conn.execute(query, {"tables": sorted(table_names)})]
+    return hashlib.sha256(json.dumps(rows, default=str).encode()).hexdigest()
+
+
+def _forget_reflection(db, table):
+    """Drops a table SQLDatabase has already reflected, so get_table_info() reflects its current columns."""
+    metadata = db._metadata
+    if table in metadata.tables:
+        metadata.remove(metadata.tables[table])
+
+
+class SchemaSnapshotCache:
+    """
+    Per-table get_table_info() snapshots for one database, persisted as JSON under cache_dir.
+    Within a process, a table's fingerprint is re-checked at most every verify_interval seconds.
+    """
+
+    def __init__(self, db_uri, cache_dir=DEFAULT_CACHE_DIR, verify_interval=300, on_change=None):
+        self.cache_dir = cache_dir
+        self.verify_interval = verify_interval
+        self.on_change = on_change
+        self._verified_at = {}
+        self.path = os.path.join(cache_dir, hashlib.sha256(db_uri.encode()).hexdigest()[:16] + ".json")
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.stats_counters = {"hits": 0, "misses": 0, "refreshes": 0, "changes": 0}
+
+    def _load(self):
+        if self._snapshot is None:
+            try:
+                with open(self.path) as f:
+                    self._snapshot = json.load(f)
+            except (OSError, ValueError):
+                self._snapshot = {"fingerprints": {}, "tables": {}}
+        return self._snapshot
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    def get_table_info(self, db, table_names):
+        """Drop-in for db.get_table_info(table_names): serves tables whose fingerprint is unchanged from the snapshot."""
+        table_names = [name.strip() for name in table_names if name.strip()]
+        changed = []
+        with self._lock:
+            snapshot = self._load()
+            stale = []
+            for table in table_names:
+                if table in snapshot["tables"] and time.time() - self._verified_at.get(table, 0.0) < self.verify_interval:
+                    self.stats_counters["hits"] += 1
+                    continue
+                fingerprint = schema_fingerprint(db._engine, [table])
+                if snapshot["fingerprints"].get(table) == fingerprint and table in snapshot["tables"]:
+                    self._verified_at[table] = time.time()
+                    self.stats_counters["hits"] += 1
+                else:
+                    stale.append((table, fingerprint))
+            if stale:
+                self.stats_counters["misses"] += len(stale)
+                for table, fingerprint in stale:
+                    if table in snapshot["tables"]:
+                        changed.append(table)
+                    _forget_reflection(db, table)
+                    snapshot["tables"][table] = db.get_table_info(table_names=[table])
+                    snapshot["fingerprints"][table] = fingerprint
+                    self._verified_at[table] = time.time()
+                snapshot["updated_at"] = time.time()
+                self._save()
+            table_info = "\n\n".join(snapshot["tables"][table] for table in table_names)
+        if changed:
+            self._notify(changed)
+        return table_info
+
+    def refresh(self, db, table_names=None):
+        """Discards the snapshot and re-introspects table_names (default: every usable table)."""
+        table_names = list(table_names or db.get_usable_table_names())
+        with self._lock:
+            self._snapshot = {"fingerprints": {}, "tables": {}}
+            self._verified_at.clear()
+            self.stats_counters["refreshes"] += 1
+        table_info = self.get_table_info(db, table_names)
+        self._notify(table_names)
+        return table_info
+
+    def _notify(self, table_names):
+        self.stats_counters["changes"] += 1
+        if self.on_change is not None:
+            self.on_change(table_names)
+
+    def stats(self):
+        return dict(self.stats_counters)
+
+
+def main():
+    from dotenv import load_dotenv
+    from langchain_community.utilities import SQLDatabase
+
+    load_dotenv()
+    default_uri = (f"postgresql+psycopg2://{os.getenv('PG_USER')}:{os.getenv('PG_PASSWORD')}@"
+                   f"{os.getenv('PG_HOST')}:{os.getenv('PG_PORT')}/{os.getenv('PG_DBNAME')}")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-uri", default=os.getenv("SALES_DATABASE_URI", default_uri))
+    parser.add_argument("--tables", nargs="*", default=["sales"])
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--refresh", action="store_true", help="Discard the snapshot and re-introspect the tables.")
+    args = parser.parse_args()
+
+    db = SQLDatabase.from_uri(args.db_uri, lazy_table_reflection=True)
+    cache = SchemaSnapshotCache(args.db_uri, cache_dir=args.cache_dir)
+    start = time.perf_counter()
+    table_info = cache.refresh(db, args.tables) if args.refresh else cache.get_table_info(db, args.tables)
+    print(table_info)
+    print(f"\n{'Refreshed' if args.refresh else 'Loaded'} schema for {', '.join(args.tables)} in {time.perf_counter() - start:.2f}s -> {cache.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Persistent TTL cache with single-flight coalescing in front of the research agent's web search.
+
+Every Tavily search is a slow, billed external call, and several users often research the same trending topic within
+minutes. Results are cached under the normalized query, with a TTL chosen by topic: time-sensitive queries ("latest",
+"today", "news", prices, scores, the current year, ...) expire after minutes, evergreen facts after days. Concurrent
+identical queries share one in-flight request (sync and async callers alike), and results are persisted to a SQLite
+file so they survive restarts and are shared by every process on the host.
+
+The cache does not know about Tavily: callers pass the fetch function, so any backend (or a local fake) can sit behind it.
+
+Usage (from Yukta_main/):
+    python -m Utils.search_cache                   # entries per topic
+    python -m Utils.search_cache --purge-expired
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import argparse
+import datetime
+import threading
+from concurrent.futures import Future
+
+from Utils.sql_cache import normalize_question
+
+DEFAULT_CACHE_PATH = os.path.join(".search_cache", "search_cache.sqlite")
+DEFAULT_TTL_BY_TOPIC = {"news": 15 * 60, "general": 7 * 24 * 3600}
+
+_NEWS_PATTERN = re.compile(
+    r"\b(latest|today|tonight|yesterday|tomorrow|this (week|month|year)|current(ly)?|now|recent(ly)?|news|breaking|update[sd]?|"
+    r"live|score[sd]?|price[sd]?|stock|weather|exchange rate|trending|announce[sd]?|release[sd]?|election)\b")
+
+
+def normalize_query(query):
+    return normalize_question(query)
+
+
+def classify_topic(query, now=None):
+    """'news' for time-sensitive queries, 'general' otherwise."""
+    normalized = normalize_query(query)
+    year = (now or datetime.date.today()).year
+    if _NEWS_PATTERN.search(normalized) or re.search(rf"\b({year}|{year - 1})\b", normalized):
+        return "news"
+    return "general"
+
+
+def _fetch_error(query, error):
+    """
+    The error handed to coalesced callers. A cancelled leader (run timeout, shutdown) still settles, otherwise the key
+    would stay in flight and every identical query would wait it out; its followers get a plain error, not the cancellation.
+    """
+    return error if isinstance(error, Exception) else RuntimeError(f"search for {query!r} was cancelled")
+
+
+class SearchCache:
+    """
+    path:           SQLite file the results are persisted to (None keeps them in memory only).
+    ttl_by_topic:   {topic: seconds}; see classify_topic().
+    max_entries:    entries kept on disk; the least recently stored are deleted beyond this.
+    wait_timeout:   seconds a coalesced caller waits for the in-flight request before giving up.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_by_topic=None, max_entries=5000, wait_timeout=60):
+        self.path = path
+        self.ttl_by_topic = dict(DEFAULT_TTL_BY_TOPIC, **(ttl_by_topic or {}))
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._in_flight = {} # key -> concurrent.futures.Future shared by every caller of the same query
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, query TEXT, topic TEXT, result TEXT, "
+                           "stored_at REAL, expires_at REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)")
+        self._conn.commit()
+        self.stats_counters = {"hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "errors": 0}
+
+    # ---------- storage ----------
+
+    def _key(self, query, variant):
+        normalized = normalize_query(query)
+        return f"{variant}|{normalized}" if variant else normalized
+
+    def _read(self, key):
+        row = self._conn.execute("SELECT result, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def get(self, query, variant=None):
+        """The cached result for query, or None when it is missing or expired."""
+        with self._lock:
+            return self._read(self._key(query, variant))
+
+    def put(self, query, result, variant=None):
+        topic = classify_topic(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                               (self._key(query, variant), query, topic, json.dumps(result, default=str), now, now + self.ttl_by_topic[topic]))
+            self._conn.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                               (self.max_entries,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def invalidate(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    # ---------- single-flight lookup ----------
+
+    def _claim(self, query, variant):
+        """Returns (cached result, None, False) on a hit, else (None, future, is_leader) for the in-flight request."""
+        key = self._key(query, variant)
+        with self._lock: # One lock for the lookup and the claim, so a fetch finishing in between is not repeated
+            cached = self._read(key)
+            if cached is not None:
+                self.stats_counters["hits"] += 1
+                return cached, None, False
+            if key in self._in_flight:
+                self.stats_counters["coalesced"] += 1
+                return None, self._in_flight[key], False
+            self.stats_counters["misses"] += 1
+            future = self._in_flight[key] = Future()
+            return None, future, True
+
+    def _settle(self, query, variant, future, result=None, error=None):
+        if error is None:
+            self.put(query, result, variant)
+        with self._lock:
+            self._in_flight.pop(self._key(query, variant), None)
+            self.stats_counters["fetches"] += 1
+            if error is not None:
+                self.stats_counters["errors"] += 1
+        if future.done(): # Only if a caller cancelled the shared future despite the shield
+            return
+        # Errors reach every coalesced caller but are never cached
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def get_or_fetch(self, query, fetch, variant=None):
+        """
+        Returns the cached result for query, or calls fetch(query) once and caches its result.
+        Concurrent calls for the same normalized query wait for that one fetch instead of issuing their own.
+        variant separates results of differently configured backends (e.g. search depth).
+        """
+        cached, future, leader = self._claim(query, variant)
+        if future is None:
+            return cached
+        if not leader:
+            return future.result(timeout=self.wait_timeout)
+        try:
+            result = fetch(query)
+        except BaseException as e:
+            self._settle(query, variant, future, error=_fetch_error(query, e))
+            raise
+        self._settle(query, variant, future, result=result)
+        return result
+
+    async def aget_or_fetch(self, query, afetch, variant=None):
+        """Async twin of get_or_fetch(); shares in-flight requests with sync callers."""
+        cached, future, leader = await asyncio.to_thread(self._claim, query, variant)
+        if future is None:
+            return cached
+        if not leader:
+            # Shielded: a follower that times out or is cancelled must not cancel the future the leader settles
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=self.wait_timeout)
+        try:
+            result = await afetch(query)
+        except BaseException as e:
+            self._settle(query, variant, future, error=_fetch_error(query, e))
+            raise
+        await asyncio.to_thread(self._settle, query, variant, future, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.stats_counters)
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=os.getenv("SEARCH_CACHE_PATH", DEFAULT_CACHE_PATH))
+    parser.add_argument("--purge-expired", action="store_true")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    cache = SearchCache(args.path)
+    if args.purge_expired:
+        print(f"Deleted {cache.purge_expired()} expired entries.")
+    if args.clear:
+        cache.invalidate()
+        print("Search cache cleared.")
+    with cache._lock:
+        rows = cache._conn.execute("SELECT topic, COUNT(*), SUM(expires_at < ?) FROM results GROUP BY topic", (time.time(),)).fetchall()
+    for topic, count, expired in rows:
+        print(f"{topic:<10}{count:>7} entries ({expired or 0} expired)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Marker file rewritten by every (re-)ingestion of the RAG index. Caches watch it and drop their entries when it changes.
+DEFAULT_GENERATION_MARKER = ".rag_index_generation"
+
+
+def bump_index_generation(marker_path=DEFAULT_GENERATION_MARKER):
+    """Records that the vector index was re-ingested, invalidating every SemanticCache watching marker_path."""
+    with open(marker_path, "w") as marker:
+        marker.write(f"{uuid.uuid4().hex} {time.time()}\n")
+
+
+class SemanticCache:
+    """
+    Local answer cache keyed on question embeddings.
+
+    Lookups do a NumPy brute-force cosine search over at most max_entries vectors (cheap at this size) and return
+    the cached answer when the best match is at or above the similarity threshold. Entries expire after ttl_seconds
+    and the least recently used entry is evicted when the cache is full. The whole cache is cleared when the
+    index generation marker file changes.
+    """
+
+    def __init__(self, threshold=0.92, max_entries=512, ttl_seconds=24 * 3600, generation_marker=DEFAULT_GENERATION_MARKER):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation_marker = generation_marker
+
+        self._lock = threading.Lock()
+        self._vectors = None # (max_entries, dim) matrix of normalised embeddings, allocated on first insert
+        self._entries = OrderedDict() # slot -> (question, answer, created_at); order = LRU order
+        self._free_slots = list(range(max_entries))
+        self._generation = self._read_generation()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _read_generation(self):
+        try:
+            with open(self.generation_marker) as marker:
+                return marker.read().strip()
+        except (OSError, TypeError):
+            return None
+
+    def _check_generation(self):
+        generation = self._read_generation()
+        if generation != self._generation:
+            self._generation = generation
+            self._clear()
+            self.invalidations += 1
+
+    def _clear(self):
+        self._entries.clear()
+        self._free_slots = list(range(self.max_entries))
+
+    @staticmethod
+    def _normalise(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _evict_expired(self, now):
+        expired = [slot for slot, (_, _, created_at) in self._entries.items() if now - created_at > self.ttl_seconds]
+        for slot in expired:
+            del self._entries[slot]
+            self._free_slots.append(slot)
+
+    def lookup(self, vector):
+        """Returns the cached answer for the most similar stored question, or None."""
+        query = self._normalise(vector)
+        with self._lock:
+            self._check_generation()
+            self._evict_expired(time.time())
+            if not self._entries:
+                self.misses += 1
+                return None
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+            scores = self._vectors[slots] @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            slot = int(slots[best])
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            return self._entries[slot][1]
+
+    def insert(self, vector, question, answer):
+        vector = self._normalise(vector)
+        with self._lock:
+            self._check_generation()
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._clear()
+            if not self._free_slots:
+                lru_slot, _ = self._entries.popitem(last=False)
+                self._free_slots.append(lru_slot)
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = (question, answer, time.time())
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,150 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from sqlglot.tokens import Tokenizer, TokenType
+from sqlglot.errors import TokenError
+
+
+def normalize_question(question):
+    """Lower-cases, strips punctuation and collapses whitespace so trivially different phrasings share a key."""
+    question = re.sub(r"[^\w\s]", " ", question.lower())
+    return re.sub(r"\s+", " ", question).strip()
+
+
+def strip_sql(sql):
+    """The statement as the model wrote it, without surrounding whitespace and trailing ';'. This is what gets stored and run."""
+    return sql.strip().rstrip(";").strip()
+
+
+def normalize_sql(sql):
+    """
+    Cache key of a statement: its tokens, so whitespace, comments and a trailing ';' do not split keys.
+    Only a key - comments are dropped, so it is never executed.
+    """
+    try:
+        tokens = Tokenizer().tokenize(sql)
+    except TokenError:
+        return re.sub(r"\s+", " ", strip_sql(sql))
+    while tokens and tokens[-1].token_type == TokenType.SEMICOLON:
+        tokens.pop()
+    return " ".join(f"{token.token_type.name}:{token.text}" for token in tokens)
+
+
+class SalesQueryCache:
+    """
+    Two-level cache in front of the SalesDataAgent's SQL pipeline.
+
+    Level 1: normalized question -> validated SQL text, with a TTL (sql_ttl_seconds) and cleared by
+             invalidate_sql() when the schema changes. A hit skips the LLM query generation and
+             sql_db_query_checker round trips entirely.
+    Level 2: SQL text -> result set, with a TTL. Every entry is also tied to a change marker of the 'sales' table
+             (e.g. row count / max updated_at); when the marker moves, all cached results are dropped.
+    """
+
+    def __init__(self, result_ttl_seconds=300, max_questions=1000, max_results=256, marker_fn=None, marker_check_interval=30,
+                 sql_ttl_seconds=24 * 3600):
+        self.result_ttl_seconds = result_ttl_seconds
+        self.sql_ttl_seconds = sql_ttl_seconds
+        self.max_questions = max_questions
+        self.max_results = max_results
+        self.marker_fn = marker_fn
+        self.marker_check_interval = marker_check_interval
+
+        self._lock = threading.Lock()
+        self._sql_by_question = OrderedDict() # question -> (sql, stored_at)
+        self._results = OrderedDict() # sql -> (result, stored_at)
+        self._marker = None
+        self._marker_checked_at = 0.0
+        self.stats_counters = {"sql_hits": 0, "sql_misses": 0, "result_hits": 0, "result_misses": 0, "invalidations": 0}
+
+    def _check_marker(self):
+        """Polls the table change marker at most every marker_check_interval seconds."""
+        if self.marker_fn is None or time.time() - self._marker_checked_at < self.marker_check_interval:
+            return
+        self._marker_checked_at = time.time()
+        try:
+            marker = self.marker_fn()
+        except Exception as e:
+            print(f"Error reading sales change marker, dropping cached results: {e}")
+            marker = None
+        with self._lock:
+            if marker is None or marker != self._marker:
+                if self._results:
+                    self.stats_counters["invalidations"] += 1
+                self._results.clear()
+                self._marker = marker
+
+    def invalidate(self):
+        """Explicit invalidation hook, e.g. after a known write to the sales table."""
+        with self._lock:
+            self._results.clear()
+            self.stats_counters["invalidations"] += 1
+
+    def invalidate_sql(self):
+        """Drops the question -> SQL entries, e.g. after a schema change made the cached SQL stale."""
+        with self._lock:
+            self._sql_by_question.clear()
+            self.stats_counters["invalidations"] += 1
+
+    # --- Level 1: question -> SQL ---
+    def get_sql(self, question):
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._sql_by_question.get(key)
+            if entry is None or time.time() - entry[1] > self.sql_ttl_seconds:
+                self._sql_by_question.pop(key, None)
+                self.stats_counters["sql_misses"] += 1
+                return None
+            self._sql_by_question.move_to_end(key)
+            self.stats_counters["sql_hits"] += 1
+            return entry[0]
+
+    def put_sql(self, question, sql):
+        with self._lock:
+            self._sql_by_question[normalize_question(question)] = (strip_sql(sql), time.time())
+            while len(self._sql_by_question) > self.max_questions:
+                self._sql_by_question.popitem(last=False)
+
+    # --- Level 2: SQL -> result ---
+    def get_result(self, sql):
+        self._check_marker()
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None or time.time() - entry[1] > self.result_ttl_seconds:
+                self._results.pop(key, None)
+                self.stats_counters["result_misses"] += 1
+                return None
+            self._results.move_to_end(key)
+            self.stats_counters["result_hits"] += 1
+            return entry[0]
+
+    def put_result(self, sql, result):
+        with self._lock:
+            self._results[normalize_sql(sql)] = (result, time.time())
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.stats_counters, cached_questions=len(self._sql_by_question), cached_results=len(self._results))
+
+
+def table_change_marker(run_query, table="sales", updated_at_column="updated_at"):
+    """
+    Builds a marker function for SalesQueryCache from a run_query(sql) callable.
+    Uses (row count, max updated_at) when the column exists and falls back to the row count alone.
+    """
+    state = {"query": f"SELECT COUNT(*), MAX({updated_at_column}) FROM {table}"}
+
+    def marker():
+        try:
+            return run_query(state["query"])
+        except Exception:
+            if state["query"] == f"SELECT COUNT(*) FROM {table}":
+                raise
+            state["query"] = f"SELECT COUNT(*) FROM {table}" # No updated_at column: row count only
+            return run_query(state["query"])
+
+    return marker
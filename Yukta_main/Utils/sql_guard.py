@@ -0,0 +1,224 @@
+"""
+Query guard in front of the SalesDataAgent's sql_db_query.
+
+The SQL comes from the model, so the SELECT-only rule in the prompt and the LLM-driven sql_db_query_checker are
+advice, not enforcement. SQLGuard enforces it before a statement reaches the database:
+
+    1. parse (sqlglot, in the connection's dialect): exactly one statement, and it must be a query. Anything that
+       writes or locks (INSERT/UPDATE/DELETE/MERGE, DDL, SELECT INTO, FOR UPDATE, a data-modifying CTE, ...), the
+       functions in DENIED_FUNCTIONS and, optionally, tables outside allowed_tables are rejected;
+    2. cartesian products: a join without ON/USING (or with a constant one such as ON TRUE) and without a join
+       condition in WHERE is rejected, except against a single-row aggregate subquery (the usual "share of total" pattern);
+    3. LIMIT: a query without one gets LIMIT max_rows + 1, a larger one is capped to it, so at most max_rows rows
+       (plus one to detect truncation) ever leave the database;
+    4. EXPLAIN (Postgres): plans above max_cost planner units are rejected with the estimate, before anything runs;
+    5. execution limits: the statement runs in a read-only transaction with a statement timeout (SET TRANSACTION
+       READ ONLY and SET LOCAL statement_timeout on Postgres, PRAGMA query_only and a progress handler on SQLite).
+
+The function denylist only catches what it names, so step 5's read-only transaction is what makes the database itself
+refuse a write from a function that slipped through (nextval, a volatile user-defined function, ...).
+Rejections raise QueryRejected with a message that tells the agent how to fix the query. Other dialects get steps
+1-3 only, the plan check and the execution limits are skipped.
+"""
+import time
+import threading
+from contextlib import contextmanager
+import sqlglot
+from sqlglot import exp
+
+# SQLAlchemy dialect name -> sqlglot dialect
+SQLGLOT_DIALECTS = {"postgresql": "postgres", "sqlite": "sqlite", "mysql": "mysql", "mssql": "tsql", "oracle": "oracle"}
+
+_WRITE_NODE_NAMES = ("Insert", "Update", "Delete", "Merge", "Drop", "Create", "Alter", "TruncateTable", "Command",
+                     "Into", "Lock", "Copy", "Grant", "Set", "Pragma", "Transaction", "Commit", "Use")
+WRITE_NODES = tuple(getattr(exp, name) for name in _WRITE_NODE_NAMES if hasattr(exp, name))
+
+DENIED_FUNCTIONS = {
+    # Sleeping, file and network access, other sessions
+    "pg_sleep", "pg_sleep_for", "pg_sleep_until", "pg_read_file", "pg_read_binary_file", "pg_ls_dir", "pg_stat_file",
+    "pg_file_write", "dblink", "dblink_exec", "dblink_connect", "dblink_send_query", "pg_terminate_backend",
+    "pg_cancel_backend", "pg_reload_conf", "pg_rotate_logfile", "load_extension", "sleep", "benchmark",
+    # Side effects inside a SELECT: sequences, large objects, settings, locks, notifications, WAL
+    "nextval", "setval", "lo_import", "lo_export", "lo_unlink", "lo_create", "lo_creat", "lo_put", "lo_from_bytea",
+    "lo_truncate", "set_config", "pg_advisory_lock", "pg_advisory_xact_lock", "pg_advisory_lock_shared",
+    "pg_try_advisory_lock", "pg_try_advisory_xact_lock", "pg_notify", "pg_switch_wal", "pg_create_restore_point",
+    "pg_logical_emit_message", "txid_current", "pg_current_xact_id",
+    # Run SQL passed as a string, which the parser cannot see
+    "query_to_xml", "query_to_xml_and_xmlschema", "query_to_xmlschema", "cursor_to_xml",
+}
+
+
+class QueryRejected(Exception):
+    def __init__(self, message, reason):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _single_row_subquery(node):
+    """A subquery that aggregates without GROUP BY returns exactly one row, so joining it multiplies nothing."""
+    if not isinstance(node, exp.Subquery) or not isinstance(node.this, exp.Select):
+        return False
+    select = node.this
+    return not select.args.get("group") and any(projection.find(exp.AggFunc) for projection in select.expressions)
+
+
+def _is_cartesian(join, select):
+    on = join.args.get("on")
+    if on is not None and on.find(exp.Column) is None:
+        on = None # ON TRUE, ON 1 = 1, ...: a constant condition joins every row with every row
+    if on is not None or join.args.get("using") or join.args.get("method"): # ON, USING or NATURAL
+        return False
+    target = join.this
+    if isinstance(target, (exp.Unnest, exp.Lateral)) or _single_row_subquery(target):
+        return False
+    name = target.alias_or_name
+    where = select.args.get("where")
+    for condition in (where.find_all(exp.EQ) if where else []):
+        left, right = condition.left, condition.right
+        if isinstance(left, exp.Column) and isinstance(right, exp.Column) and left.table != right.table and name in (left.table, right.table):
+            return False
+    return True
+
+
+class SQLGuard:
+    """
+    max_rows:              rows a query may return; LIMIT max_rows + 1 is injected or enforced.
+    max_cost:              highest EXPLAIN total cost (Postgres planner units) allowed; None disables the plan check.
+    statement_timeout_ms:  per-statement timeout; None disables it.
+    allowed_tables:        tables queries may read (None: any).
+    allow_cross_joins:     accept joins without a join condition.
+    """
+
+    def __init__(self, max_rows=10000, max_cost=1_000_000, statement_timeout_ms=15000, allowed_tables=None, allow_cross_joins=False):
+        self.max_rows = max_rows
+        self.max_cost = max_cost
+        self.statement_timeout_ms = statement_timeout_ms
+        self.allowed_tables = {table.lower() for table in allowed_tables} if allowed_tables else None
+        self.allow_cross_joins = allow_cross_joins
+        self._lock = threading.Lock()
+        self.stats_counters = {"checked": 0, "rejected": 0, "limits_added": 0, "limits_capped": 0, "plans_checked": 0,
+                               "timeouts": 0, "truncated": 0}
+        self._rejections = {}
+
+    def _reject(self, message, reason):
+        with self._lock:
+            self.stats_counters["rejected"] += 1
+            self._rejections[reason] = self._rejections.get(reason, 0) + 1
+        raise QueryRejected(message, reason)
+
+    def _count(self, counter):
+        with self._lock:
+            self.stats_counters[counter] += 1
+
+    # ---------- static checks ----------
+
+    def rewrite(self, sql, dialect="postgres", limit=True):
+        """Validates sql and returns the SQL to run (with the row cap applied when limit is set). Raises QueryRejected."""
+        self._count("checked")
+        try:
+            statements = [statement for statement in sqlglot.parse(sql, read=dialect) if statement is not None]
+        except sqlglot.errors.ParseError as e:
+            self._reject(f"Error: the query could not be parsed ({str(e).splitlines()[0]}). Send a single valid SELECT statement.", "parse")
+        if len(statements) != 1:
+            self._reject("Error: send exactly one SQL statement, without multiple statements separated by ';'.", "multiple_statements")
+        tree = statements[0]
+        if not isinstance(tree, exp.Query):
+            self._reject(f"Error: only read-only SELECT queries are allowed, not {tree.key.upper()} statements.", "not_select")
+        forbidden = next(tree.find_all(*WRITE_NODES), None)
+        if forbidden is not None:
+            self._reject(f"Error: the query contains {forbidden.key.upper()}; only read-only SELECT queries are allowed.", "write")
+        for function in tree.find_all(exp.Func):
+            name = (function.name if isinstance(function, exp.Anonymous) else function.sql_name()).lower()
+            if name in DENIED_FUNCTIONS:
+                self._reject(f"Error: the function {name}() is not allowed in sales queries.", "function")
+        if self.allowed_tables is not None:
+            cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+            for table in tree.find_all(exp.Table):
+                if table.name.lower() not in self.allowed_tables | cte_names:
+                    self._reject(f"Error: table '{table.name}' is not available. Query only: {', '.join(sorted(self.allowed_tables))}.", "table")
+        if not self.allow_cross_joins:
+            for select in tree.find_all(exp.Select):
+                for join in select.args.get("joins") or []:
+                    if _is_cartesian(join, select):
+                        self._reject(f"Error: the join with '{join.this.alias_or_name}' has no join condition and would pair every row with "
+                                     "every other row. Add an ON condition or aggregate first.", "cross_join")
+        if not limit:
+            return sql
+        return self._cap_rows(tree, sql, dialect)
+
+    def _cap_rows(self, tree, sql, dialect):
+        cap = self.max_rows + 1
+        limit = tree.args.get("limit")
+        if limit is not None:
+            count = limit.args.get("count") if isinstance(limit, exp.Fetch) else limit.expression
+            if isinstance(count, exp.Literal) and count.is_int and int(count.this) <= cap:
+                return sql # Already small enough: run the statement as written
+            self._count("limits_capped")
+        else:
+            self._count("limits_added")
+        return tree.limit(cap).sql(dialect=dialect)
+
+    # ---------- database checks ----------
+
+    def check_plan(self, conn, sql):
+        """EXPLAINs sql and rejects it above max_cost. Returns {"cost", "rows"} (Postgres) or None."""
+        if self.max_cost is None or conn.dialect.name != "postgresql":
+            return None
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            import json
+            plan = json.loads(plan)
+        root = plan[0]["Plan"]
+        cost, rows = root["Total Cost"], root["Plan Rows"]
+        self._count("plans_checked")
+        if cost > self.max_cost:
+            self._reject(f"Error: the query is too expensive to run (estimated cost {cost:,.0f}, limit {self.max_cost:,.0f}, "
+                         f"~{rows:,} rows). Filter on indexed columns, aggregate with GROUP BY or avoid large joins and sorts.", "cost")
+        return {"cost": cost, "rows": rows}
+
+    @contextmanager
+    def execution_limits(self, conn):
+        """
+        Runs the statements of the block read-only and under the statement timeout; a timed-out statement raises
+        QueryRejected. On Postgres both settings last until the connection's transaction ends.
+        """
+        timeout_ms = self.statement_timeout_ms
+        dialect = conn.dialect.name
+        raw = None
+        if dialect == "postgresql":
+            conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+            if timeout_ms:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+        elif dialect == "sqlite":
+            raw = conn.connection.driver_connection
+            raw.execute("PRAGMA query_only = ON")
+            if timeout_ms:
+                deadline = time.monotonic() + timeout_ms / 1000
+                raw.set_progress_handler(lambda: time.monotonic() > deadline, 10000) # A true return value interrupts the query
+        try:
+            yield
+        except Exception as e:
+            message = str(e).lower()
+            if timeout_ms and ("statement timeout" in message or "interrupted" in message):
+                self._count("timeouts")
+                self._reject(f"Error: the query ran longer than {timeout_ms / 1000:g}s and was cancelled. "
+                             "Filter the rows or aggregate with GROUP BY so it runs faster.", "timeout")
+            raise
+        finally:
+            if raw is not None: # The pooled connection is reused by the schema cache and the change marker
+                raw.set_progress_handler(None, 0)
+                raw.execute("PRAGMA query_only = OFF")
+
+    def prepare(self, conn, sql, limit=True):
+        """rewrite() in the connection's dialect followed by check_plan(). Returns the SQL to execute."""
+        guarded_sql = self.rewrite(sql, SQLGLOT_DIALECTS.get(conn.dialect.name, conn.dialect.name), limit=limit)
+        self.check_plan(conn, guarded_sql)
+        return guarded_sql
+
+    def record_truncation(self):
+        self._count("truncated")
+
+    def stats(self):
+        with self._lock:
+            return {**self.stats_counters, "rejections": dict(self._rejections), "max_rows": self.max_rows,
+                    "max_cost": self.max_cost, "statement_timeout_ms": self.statement_timeout_ms}
@@ -0,0 +1,145 @@
+"""
+Startup: concurrent construction of independent components, lazy expensive backends, and a timing report.
+
+initialize_yukta_graph() used to build every client one after the other before the first page could render. Model
+clients, embeddings, caches and the checkpointer do not depend on each other, so they are built concurrently on a
+thread pool (their constructors mostly wait on I/O: TLS setup, disk, network handshakes). Backends that need a remote
+round trip and are only used by one agent - the Pinecone index, the SQL engine with its schema snapshot, the Google
+Calendar OAuth session - are wrapped in a LazyResource and built by their agent on first use instead.
+
+Every component, eager or lazy, is recorded in a StartupReport with its build time, the phase it was built in and any
+error, so slow or failing components are visible in the sidebar and in the logs.
+"""
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StartupReport:
+    """Build time per component. phase is 'startup' for eager components and 'lazy' for backends built on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components = {}
+        self.started_at = time.perf_counter()
+        self.ready_seconds = None # Wall time of initialize_yukta_graph, set by mark_ready()
+
+    def record(self, name, seconds, phase="startup", error=None):
+        with self._lock:
+            self._components[name] = {"seconds": seconds, "phase": phase, "error": str(error) if error else None}
+
+    def timed(self, name, factory, phase="startup"):
+        """Calls factory(), recording its build time (also when it raises) under name."""
+        start = time.perf_counter()
+        try:
+            value = factory()
+        except Exception as e:
+            self.record(name, time.perf_counter() - start, phase, e)
+            raise
+        self.record(name, time.perf_counter() - start, phase)
+        return value
+
+    def mark_ready(self):
+        self.ready_seconds = time.perf_counter() - self.started_at
+        return self.ready_seconds
+
+    def components(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._components.items()}
+
+    def summary(self):
+        components = self.components()
+        startup = [entry["seconds"] for entry in components.values() if entry["phase"] == "startup"]
+        return {
+            "ready_seconds": self.ready_seconds,
+            "component_seconds": sum(startup), # What a serial startup would have spent on the same components
+            "lazy_pending": [name for name, entry in components.items() if entry["phase"] == "lazy" and entry["seconds"] is None
+                             and not entry["error"]],
+            "errors": {name: entry["error"] for name, entry in components.items() if entry["error"]},
+            "components": components,
+        }
+
+    def format(self):
+        lines = [f"{'component':<32}{'phase':<9}{'seconds':>9}"]
+        for name, entry in sorted(self.components().items(), key=lambda item: -(item[1]["seconds"] or 0)):
+            seconds = f"{entry['seconds']:.3f}" if entry["seconds"] is not None else "-"
+            lines.append(f"{name:<32}{entry['phase']:<9}{seconds:>9}" + (f"  ERROR: {entry['error']}" if entry["error"] else ""))
+        if self.ready_seconds is not None:
+            lines.append(f"ready after {self.ready_seconds:.3f}s")
+        return "\n".join(lines)
+
+
+def build_concurrently(factories, report=None, max_workers=8):
+    """
+    Runs {name: factory} on a thread pool and returns {name: result}. Every factory runs to completion; if any of
+    them raised, the first error (in the order of factories) is re-raised once all are done.
+    """
+    report = report if report is not None else StartupReport()
+    if max_workers <= 1:
+        return {name: report.timed(name, factory) for name, factory in factories.items()}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yukta-startup") as executor:
+        futures = {name: executor.submit(report.timed, name, factory) for name, factory in factories.items()}
+    errors = [future.exception() for future in futures.values() if future.exception() is not None]
+    if errors:
+        raise errors[0]
+    return {name: future.result() for name, future in futures.items()}
+
+
+class LazyResource:
+    """
+    A backend built by factory() on the first get(), once, even when several threads ask for it at the same time.
+    A failed build is not cached: the error reaches the caller and the next get() tries again.
+    """
+
+    def __init__(self, name, factory, report=None):
+        self.name = name
+        self.factory = factory
+        self.report = report
+        self._lock = threading.Lock()
+        self._value = None
+        self._built = False
+        if report is not None:
+            report.record(name, None, phase="lazy")
+
+    @property
+    def built(self):
+        return self._built
+
+    def get(self):
+        if self._built:
+            return self._value
+        with self._lock:
+            if not self._built:
+                start = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    if self.report is not None:
+                        self.report.record(self.name, None, phase="lazy", error=e)
+                    raise
+                self._built = True
+                print(f"Lazy backend '{self.name}' built in {time.perf_counter() - start:.2f}s")
+                if self.report is not None:
+                    self.report.record(self.name, time.perf_counter() - start, phase="lazy")
+        return self._value
+
+    async def aget(self):
+        """get() for async callers: the blocking build runs on a worker thread."""
+        if self._built:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+
+def prewarm(resources):
+    """Builds lazy resources on a daemon thread, so the first request usually finds them ready without startup waiting."""
+    def _build_all():
+        for resource in resources:
+            try:
+                resource.get()
+            except Exception as e:
+                print(f"Pre-warming '{resource.name}' failed, it will be retried on first use: {e}")
+
+    thread = threading.Thread(target=_build_all, name="yukta-prewarm", daemon=True)
+    thread.start()
+    return thread
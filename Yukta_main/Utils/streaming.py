@@ -0,0 +1,124 @@
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Node names that are internal plumbing of create_supervisor / create_react_agent / plan executor / LinkedIn and email pipeline graphs.
+# They are hidden from the handoff path shown to the user.
+_INTERNAL_NODES = {"supervisor", "agent", "tools", "pre_model_hook", "yukta_prime", "planner", "scheduler", "synthesizer", "generate_post", "format_post", "write_email", "review_email", "revise_email", "finalize_email", "__start__", "__end__"}
+
+
+def _agent_path(namespace, node_name=None):
+    """
+    Converts a LangGraph namespace tuple (e.g. ('company_supervisor:<task_id>', 'SalesDataAgent:<task_id>'))
+    into the list of supervisor/agent names the request is currently flowing through.
+    """
+    path = [part.split(":")[0] for part in namespace]
+    if node_name and node_name not in _INTERNAL_NODES:
+        path.append(node_name)
+    return [name for name in path if name not in _INTERNAL_NODES]
+
+
+def format_agent_path(path):
+    """Formats an agent path as a handoff trail, e.g. '→ company_supervisor → SalesDataAgent'."""
+    return " ".join(f"→ {name}" for name in path)
+
+
+def _chunk_text(chunk):
+    """Extracts the plain-text part of a streamed message chunk (tool-call chunks carry no text)."""
+    if not isinstance(chunk, (AIMessageChunk, AIMessage)):
+        return ""
+    if chunk.response_metadata.get("__is_handoff_back"): # "Transferring back to supervisor" bookkeeping message
+        return ""
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(part.get("text", "") for part in chunk.content if isinstance(part, dict))
+
+
+def _translate(namespace, mode, payload, seen_paths):
+    """Turns one raw LangGraph stream item into zero or more UI events."""
+    events = []
+    if mode == "messages":
+        chunk, metadata = payload
+        path = _agent_path(namespace)
+        if path and tuple(path) not in seen_paths:
+            seen_paths.add(tuple(path))
+            events.append({"type": "step", "path": path})
+        # Model calls inside a tool (the RAG answer chain, the SQL agent) are relayed by the agent afterwards; their
+        # tokens are skipped even when a chain was not tagged nostream, or the answer would be shown twice
+        text = _chunk_text(chunk) if metadata.get("langgraph_node") != "tools" else ""
+        if text:
+            events.append({"type": "token", "path": path, "node": metadata.get("langgraph_node"), "text": text})
+    elif mode == "updates":
+        for node_name in payload or {}:
+            path = _agent_path(namespace, node_name)
+            if path and tuple(path) not in seen_paths:
+                seen_paths.add(tuple(path))
+                events.append({"type": "step", "path": path})
+    elif mode == "custom":
+        events.append({"type": "custom", "path": _agent_path(namespace), "data": payload})
+    return events
+
+
+def stream_yukta_response(graph, inputs, config):
+    """
+    Streams a Yukta run as UI-friendly events instead of blocking until the final state.
+
+    Yields dictionaries of the form:
+        {"type": "step", "path": [...]}               -> a supervisor/agent handoff was observed
+        {"type": "token", "path": [...], "text": ...} -> a token produced by the model currently speaking
+        {"type": "custom", "path": [...], "data": ...} -> data emitted by a node through the stream writer
+    (stream_yukta_turn() adds the final answer, server.py adds "queued"/"started"/"error"/"done" around a run.)
+    """
+    seen_paths = set()
+    for namespace, mode, payload in graph.stream(
+        inputs,
+        config=config,
+        stream_mode=["messages", "updates", "custom"],
+        subgraphs=True,
+    ):
+        yield from _translate(namespace, mode, payload, seen_paths)
+
+
+def get_final_ai_message(graph, config):
+    """Returns the last AIMessage stored in the checkpointed thread, or None."""
+    state = graph.get_state(config)
+    for msg in reversed(state.values.get("messages", [])):
+        if isinstance(msg, AIMessage) and msg.content:
+            return msg
+    return None
+
+
+async def astream_yukta_response(graph, inputs, config):
+    """Async twin of stream_yukta_response(), for serving many conversations from one event loop."""
+    seen_paths = set()
+    async for namespace, mode, payload in graph.astream(
+        inputs,
+        config=config,
+        stream_mode=["messages", "updates", "custom"],
+        subgraphs=True,
+    ):
+        for event in _translate(namespace, mode, payload, seen_paths):
+            yield event
+
+
+async def aget_final_ai_message(graph, config):
+    state = await graph.aget_state(config)
+    for msg in reversed(state.values.get("messages", [])):
+        if isinstance(msg, AIMessage) and msg.content:
+            return msg
+    return None
+
+
+def stream_yukta_turn(graph, inputs, config):
+    """
+    stream_yukta_response() followed by {"type": "final", "content": ...} with the answer stored in the thread
+    (content is None when the run produced no answer). This is the event sequence the HTTP server sends to its clients.
+    """
+    yield from stream_yukta_response(graph, inputs, config)
+    final_ai_message = get_final_ai_message(graph, config)
+    yield {"type": "final", "content": final_ai_message.content if final_ai_message else None}
+
+
+async def astream_yukta_turn(graph, inputs, config):
+    async for event in astream_yukta_response(graph, inputs, config):
+        yield event
+    final_ai_message = await aget_final_ai_message(graph, config)
+    yield {"type": "final", "content": final_ai_message.content if final_ai_message else None}
@@ -0,0 +1,443 @@
+"""
+Span tracing for the Yukta hierarchy (Yukta Prime -> supervisor -> agent -> tool).
+
+YuktaTracer is a LangChain callback handler registered once on the compiled Yukta graph. It turns the callback stream
+into spans: one per graph node (supervisors, agents and their internal nodes), per LLM call (model, prompt/completion
+tokens, estimated cost, retries) and per tool call, each with wall time, status and its parent span. Helper runnables
+inside a node (prompts, sequences, routing functions) are folded into the node's span.
+
+Finished spans go to a sink (JSONL or SQLite, written in batches on a background thread) and to a small in-memory ring
+buffer that feeds the live p50/p95 report. Spans left open longer than max_open_seconds (a run that was abandoned, e.g.
+by a cancelled task that never reported its end) are closed as "abandoned".
+Spans can be exported as OTLP/JSON, the OpenTelemetry wire format that collectors accept on /v1/traces.
+
+Usage (from Yukta_main/):
+    python -m Utils.tracing report --source traces/spans.jsonl
+    python -m Utils.tracing export --source traces/spans.jsonl --out traces/otlp.json [--endpoint http://localhost:4318/v1/traces]
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import argparse
+import threading
+import urllib.request
+from collections import deque, defaultdict
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Nodes that are plumbing of create_supervisor / create_react_agent / the plan executor, not agents of their own
+INTERNAL_NODES = {"supervisor", "agent", "tools", "pre_model_hook", "planner", "scheduler", "synthesizer", "generate_post", "format_post", "write_email", "review_email", "revise_email", "finalize_email", "__start__", "__end__"}
+
+# USD per 1M (input, output) tokens, used for the cost estimate of each LLM span
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prices = MODEL_PRICES.get(model) or next((p for name, p in sorted(MODEL_PRICES.items(), key=lambda item: -len(item[0]))
+                                               if model and model.startswith(name)), None)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+# ---------- sinks ----------
+
+class _BatchedSpanSink:
+    """
+    write() only queues the span: a daemon thread writes the queue in batches, so the tracer's callbacks (which run
+    inline, on the event loop in async runs) never wait for the disk. When the queue is full, spans are dropped and counted.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(target=self._drain, name=f"{type(self).__name__}-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def write(self, span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            if spans:
+                try:
+                    self._write_batch(spans)
+                except Exception as e:
+                    print(f"Trace sink write failed ({len(spans)} spans lost): {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def flush(self):
+        """Blocks until every queued span has been written."""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+
+    def _write_batch(self, spans):
+        raise NotImplementedError
+
+
+class JsonlSpanSink(_BatchedSpanSink):
+    def __init__(self, path, **kwargs):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        super().__init__(**kwargs)
+
+    def _write_batch(self, spans):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(span, default=str) + "\n" for span in spans))
+
+
+class SqliteSpanSink(_BatchedSpanSink):
+    COLUMNS = ("trace_id", "span_id", "parent_id", "name", "kind", "path", "agent", "thread_id", "start", "end", "duration_ms",
+               "status", "error", "model", "prompt_tokens", "completion_tokens", "retries", "cost_usd")
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False) # Created here, used only by the writer thread afterwards
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS spans ({', '.join(self.COLUMNS)})")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS spans_trace ON spans (trace_id)")
+        self._conn.commit()
+        super().__init__(**kwargs)
+
+    def _write_batch(self, spans):
+        self._conn.executemany(f"INSERT INTO spans VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                               [[span.get(c) for c in self.COLUMNS] for span in spans])
+        self._conn.commit()
+
+
+def create_span_sink(kind, path):
+    """kind: 'jsonl', 'sqlite' or 'none'."""
+    if kind == "jsonl":
+        return JsonlSpanSink(path)
+    if kind == "sqlite":
+        return SqliteSpanSink(path)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown trace sink '{kind}'. Use 'jsonl', 'sqlite' or 'none'.")
+
+
+def load_spans(path):
+    """Reads spans back from a .jsonl or SQLite sink file."""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM spans")]
+    finally:
+        conn.close()
+
+
+# ---------- tracer ----------
+
+class YuktaTracer(BaseCallbackHandler):
+    """Callback handler that records node/LLM/tool spans. Safe to share across threads and event loops."""
+    run_inline = True # Record in callback order instead of on the executor used for sync handlers in async runs
+
+    def __init__(self, sink=None, buffer_size=5000, max_open_seconds=3600):
+        self.sink = sink
+        self.recent = deque(maxlen=buffer_size)
+        self.max_open_seconds = max_open_seconds
+        self._open = {}     # run_id -> open span
+        self._aliases = {}  # run_id of a folded helper run -> run_id of the span it belongs to
+        self._lock = threading.Lock()
+        self._next_sweep = time.time() + min(60, max_open_seconds)
+
+    def _sweep(self, now):
+        """Removes spans open longer than max_open_seconds, and the aliases into them. Call with the lock held."""
+        self._next_sweep = now + min(60, self.max_open_seconds)
+        stale = [run_id for run_id, span in self._open.items() if now - span["start"] > self.max_open_seconds]
+        abandoned = [self._open.pop(run_id) for run_id in stale]
+        if abandoned:
+            self._aliases = {run_id: owner for run_id, owner in self._aliases.items() if owner in self._open}
+        return abandoned
+
+    def _owner(self, parent_run_id):
+        return self._aliases.get(parent_run_id, parent_run_id) if parent_run_id else None
+
+    def _start(self, run_id, parent_run_id, name, kind, metadata, **fields):
+        now = time.time()
+        with self._lock:
+            abandoned = self._sweep(now) if now >= self._next_sweep else []
+            self._open_span(now, run_id, parent_run_id, name, kind, metadata, fields)
+        for span in abandoned:
+            self._finish(span, error=f"abandoned: no end event after {self.max_open_seconds}s", status="abandoned")
+
+    def _open_span(self, now, run_id, parent_run_id, name, kind, metadata, fields):
+        """Opens the span of run_id (or folds it into its parent's span). Call with the lock held."""
+        owner = self._owner(parent_run_id)
+        parent = self._open.get(owner)
+        if kind == "node" and parent is not None and (parent["name"] == name or metadata.get("langgraph_node") != name or name in ("__start__", "__end__")):
+            # A compiled subgraph runs as a node and again as a graph of the same name; helpers are not nodes
+            self._aliases[run_id] = owner
+            return
+        path = parent["path"] + [name] if parent else [name]
+        # A span belongs to the innermost supervisor/agent node above it (Yukta Prime at the top level)
+        agent = name if kind == "node" and name not in INTERNAL_NODES else (parent["agent"] if parent else "yukta_prime")
+        self._open[run_id] = {
+            "trace_id": parent["trace_id"] if parent else run_id.hex,
+            "span_id": run_id.hex[-16:], # Run ids are time-ordered UUIDs; the tail is the random part
+            "parent_id": parent["span_id"] if parent else None,
+            "name": name,
+            "kind": kind,
+            "path": path,
+            "agent": agent,
+            "thread_id": (metadata or {}).get("thread_id"),
+            "start": now,
+            "retries": 0,
+            **fields,
+        }
+
+    def _end(self, run_id, error=None, **fields):
+        with self._lock:
+            if self._aliases.pop(run_id, None) is not None:
+                return
+            span = self._open.pop(run_id, None)
+        if span is None:
+            return
+        self._finish(span, error=repr(error)[:500] if error is not None else None, **fields)
+
+    def _finish(self, span, error=None, status=None, **fields):
+        span["end"] = time.time()
+        span["duration_ms"] = round((span["end"] - span["start"]) * 1000, 2)
+        span["status"] = status or ("error" if error is not None else "ok")
+        span["error"] = error
+        span.update(fields)
+        span["path"] = " > ".join(span["path"])
+        self.recent.append(span)
+        if self.sink is not None:
+            try:
+                self.sink.write(span)
+            except Exception as e:
+                print(f"Trace sink write failed: {e}")
+
+    # ---------- chains (graph nodes) ----------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "chain")
+        self._start(run_id, parent_run_id, name, "graph" if parent_run_id is None else "node", metadata or {})
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # GraphBubbleUp (interrupts, Command(goto=...) handoffs across graphs) is control flow, not a failure
+        self._end(run_id, None if type(error).__name__ in ("GraphInterrupt", "ParentCommand") else error)
+
+    # ---------- LLM calls ----------
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or (metadata or {}).get("ls_model_name")
+        self._start(run_id, parent_run_id, model or "llm", "llm", metadata or {}, model=model)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, parent_run_id=parent_run_id, metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        model = None
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+            model = (response.llm_output or {}).get("model_name")
+        else:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    if message is not None and message.usage_metadata:
+                        prompt_tokens += message.usage_metadata.get("input_tokens", 0)
+                        completion_tokens += message.usage_metadata.get("output_tokens", 0)
+                        model = model or message.response_metadata.get("model_name")
+        with self._lock:
+            span = self._open.get(run_id)
+            model = (span or {}).get("model") or model
+        self._end(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, model=model,
+                  cost_usd=estimate_cost(model, prompt_tokens, completion_tokens))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_retry(self, retry_state, *, run_id, parent_run_id=None, **kwargs):
+        with self._lock:
+            span = self._open.get(self._owner(run_id))
+            if span is not None:
+                span["retries"] += 1
+
+    # ---------- tools ----------
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self._start(run_id, parent_run_id, name, "tool", metadata or {})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def report(self):
+        return latency_report(list(self.recent))
+
+
+# ---------- reporting / export ----------
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def latency_report(spans):
+    """p50/p95 wall time per agent (supervisor/agent nodes), per tool and per model, plus token and cost totals."""
+    groups = {"agents": defaultdict(list), "tools": defaultdict(list), "models": defaultdict(list)}
+    for span in spans:
+        if span["kind"] == "node" and span["name"] not in INTERNAL_NODES:
+            groups["agents"][span["name"]].append(span)
+        elif span["kind"] == "tool":
+            groups["tools"][span["name"]].append(span)
+        elif span["kind"] == "llm":
+            groups["models"][span.get("model") or "unknown"].append(span)
+
+    report = {}
+    for group, by_name in groups.items():
+        rows = {}
+        for name, items in by_name.items():
+            durations = [s["duration_ms"] for s in items]
+            row = {"count": len(items), "p50_ms": _percentile(durations, 0.5), "p95_ms": _percentile(durations, 0.95),
+                   "total_s": round(sum(durations) / 1000, 2), "errors": sum(1 for s in items if s["status"] == "error")}
+            if group == "models":
+                row.update(prompt_tokens=sum(s.get("prompt_tokens") or 0 for s in items),
+                           completion_tokens=sum(s.get("completion_tokens") or 0 for s in items),
+                           retries=sum(s.get("retries") or 0 for s in items),
+                           cost_usd=round(sum(s.get("cost_usd") or 0 for s in items), 4))
+            rows[name] = row
+        report[group] = dict(sorted(rows.items(), key=lambda item: -item[1]["total_s"]))
+    llm_spans = [s for s in spans if s["kind"] == "llm"]
+    report["tokens_by_agent"] = {}
+    for span in llm_spans:
+        totals = report["tokens_by_agent"].setdefault(span["agent"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += span.get("prompt_tokens") or 0
+        totals["completion_tokens"] += span.get("completion_tokens") or 0
+    return report
+
+
+def format_report(report):
+    lines = []
+    for group in ("agents", "tools", "models"):
+        lines.append(f"\n{group.upper():<40}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}{'errors':>8}")
+        for name, row in report[group].items():
+            extra = f"  tokens {row['prompt_tokens']:,}/{row['completion_tokens']:,}  ${row['cost_usd']:.4f}" if group == "models" else ""
+            lines.append(f"{name[:39]:<40}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['total_s']:>10.2f}{row['errors']:>8}{extra}")
+    lines.append(f"\n{'TOKENS BY AGENT':<40}{'calls':>7}{'prompt':>12}{'completion':>12}")
+    for name, row in sorted(report["tokens_by_agent"].items(), key=lambda item: -item[1]["prompt_tokens"]):
+        lines.append(f"{name[:39]:<40}{row['calls']:>7}{row['prompt_tokens']:>12,}{row['completion_tokens']:>12,}")
+    return "\n".join(lines)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans, service_name="yukta"):
+    """Converts spans to an OTLP/JSON ExportTraceServiceRequest (gen_ai.* attributes for LLM spans)."""
+    otlp_spans = []
+    for span in spans:
+        attributes = {"yukta.kind": span["kind"], "yukta.path": span["path"], "yukta.agent": span["agent"], "yukta.retries": span.get("retries") or 0}
+        if span.get("thread_id"):
+            attributes["yukta.thread_id"] = span["thread_id"]
+        if span["kind"] == "llm":
+            attributes.update({"gen_ai.request.model": span.get("model") or "unknown",
+                               "gen_ai.usage.input_tokens": span.get("prompt_tokens") or 0,
+                               "gen_ai.usage.output_tokens": span.get("completion_tokens") or 0})
+            if span.get("cost_usd") is not None:
+                attributes["yukta.cost_usd"] = float(span["cost_usd"])
+        elif span["kind"] == "tool":
+            attributes["gen_ai.tool.name"] = span["name"]
+        otlp_span = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 3 if span["kind"] == "llm" else 1, # CLIENT for model calls, INTERNAL otherwise
+            "startTimeUnixNano": str(int(span["start"] * 1e9)),
+            "endTimeUnixNano": str(int(span["end"] * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+            "status": {"code": 2, "message": span.get("error") or ""} if span["status"] == "error" else {"code": 1},
+        }
+        if span.get("parent_id"):
+            otlp_span["parentSpanId"] = span["parent_id"]
+        otlp_spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{"scope": {"name": "yukta.tracing"}, "spans": otlp_spans}],
+    }]}
+
+
+def export_otlp(spans, out_path=None, endpoint=None):
+    """Writes OTLP/JSON to out_path and/or POSTs it to an OTLP/HTTP endpoint (e.g. http://localhost:4318/v1/traces)."""
+    payload = to_otlp(spans)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+    if endpoint:
+        request = urllib.request.Request(endpoint, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on or export Yukta trace spans.")
+    parser.add_argument("command", choices=["report", "export"])
+    parser.add_argument("--source", default=os.path.join("traces", "spans.jsonl"), help="JSONL or SQLite sink file.")
+    parser.add_argument("--out", help="OTLP/JSON output file (export).")
+    parser.add_argument("--endpoint", help="OTLP/HTTP traces endpoint to POST to (export).")
+    args = parser.parse_args()
+
+    spans = load_spans(args.source)
+    if args.command == "report":
+        print(f"{len(spans)} spans in {len({s['trace_id'] for s in spans})} traces")
+        print(format_report(latency_report(spans)))
+    else:
+        status = export_otlp(spans, out_path=args.out or "otlp_traces.json", endpoint=args.endpoint)
+        print(f"Exported {len(spans)} spans to {args.out or 'otlp_traces.json'}" + (f" and {args.endpoint} (HTTP {status})" if status else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Thin client for the Yukta HTTP server (server.py), used by app2.py when YUKTA_SERVER_URL is set.
+
+stream() / astream() send a message to a thread and yield the run's events as they arrive over SSE: the same dicts
+stream_yukta_turn yields ("step", "token", "custom", "final"), plus the server's "queued", "started", "error" and
+"done". When the server's run queue is full (429 with X-Yukta-Reject-Reason: queue_full) the request is retried after
+its Retry-After, up to max_retries times. Other rejections (the admission controller's per-user rate limit, capacity
+and downstream shedding) and the last failed retry raise YuktaServerError, which carries the server's message for the user.
+"""
+import json
+import time
+import asyncio
+import httpx
+
+REJECT_REASON_HEADER = "X-Yukta-Reject-Reason"
+RETRYABLE_REJECTIONS = ("queue_full",) # Waiting for a worker helps; a user over their rate or a shed run must not resend
+
+
+class YuktaServerError(Exception):
+    def __init__(self, status_code, detail, reason=None):
+        super().__init__(f"Yukta server answered {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.reason = reason
+
+
+def _event(data_lines):
+    return json.loads("\n".join(data_lines))
+
+
+def _parse_sse(lines):
+    """Events of an SSE line stream. The event type is repeated in the JSON payload, so only 'data:' lines matter."""
+    data = []
+    for line in lines:
+        if not line:
+            if data:
+                yield _event(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield _event(data)
+
+
+async def _aparse_sse(lines):
+    data = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield _event(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield _event(data)
+
+
+def _error(response):
+    try:
+        detail = response.json().get("detail")
+    except Exception:
+        detail = response.text
+    return YuktaServerError(response.status_code, detail, response.headers.get(REJECT_REASON_HEADER))
+
+
+class YuktaClient:
+    """
+    base_url:     the server, e.g. http://localhost:8000
+    timeout:      seconds to wait for the next event of a run (the server sends keep-alives every 15s).
+    max_retries:  retries of a message the server rejected because its run queue was full.
+    """
+
+    def __init__(self, base_url, timeout=120.0, max_retries=3):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self._timeout = httpx.Timeout(timeout, connect=10.0)
+        self._client = httpx.Client(base_url=self.base_url, timeout=self._timeout)
+        self._async_client = None
+
+    @staticmethod
+    def _retryable(response):
+        return response.status_code == 429 and response.headers.get(REJECT_REASON_HEADER) in RETRYABLE_REJECTIONS
+
+    @staticmethod
+    def _retry_after(response):
+        return float(response.headers.get("Retry-After", 1))
+
+    @staticmethod
+    def _body(message, priority, user_id):
+        return {"message": message, "priority": priority, "user_id": user_id}
+
+    def stream(self, thread_id, message, priority="interactive", user_id=None):
+        for attempt in range(self.max_retries + 1):
+            with self._client.stream("POST", f"/threads/{thread_id}/runs/stream", json=self._body(message, priority, user_id)) as response:
+                if self._retryable(response) and attempt < self.max_retries:
+                    time.sleep(self._retry_after(response))
+                    continue
+                if response.status_code >= 400:
+                    response.read()
+                    raise _error(response)
+                yield from _parse_sse(response.iter_lines())
+                return
+
+    async def astream(self, thread_id, message, priority="interactive", user_id=None):
+        if self._async_client is None: # Created on first use, inside the caller's event loop
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=self._timeout)
+        for attempt in range(self.max_retries + 1):
+            async with self._async_client.stream("POST", f"/threads/{thread_id}/runs/stream", json=self._body(message, priority, user_id)) as response:
+                if self._retryable(response) and attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_after(response))
+                    continue
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise _error(response)
+                async for event in _aparse_sse(response.aiter_lines()):
+                    yield event
+                return
+
+    def messages(self, thread_id):
+        response = self._client.get(f"/threads/{thread_id}/messages")
+        if response.status_code >= 400:
+            raise _error(response)
+        return response.json()["messages"]
+
+    def stats(self):
+        response = self._client.get("/stats")
+        if response.status_code >= 400:
+            raise _error(response)
+        return response.json()
+
+    def close(self):
+        self._client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
@@ -3,53 +3,16 @@
 import streamlit as st
 import uuid # For generating unique session IDs
 import os
-from dotenv import load_dotenv
 
 # Import the main graph initialization function from yukta_nexus.py
-from yukta_nexus import initialize_yukta_graph
-from langchain_core.messages import AIMessage, HumanMessage
-
-# --- Configuration (Load Environment Variables) ---
-load_dotenv()
-
-# --- Retrieve Environment Variables ---
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')
-NVIDIA_API_KEY = os.getenv('NVIDIA_API_KEY')
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "rag-documents-index")
-
-PG_USER = os.getenv("PG_USER")
-PG_PASSWORD = os.getenv("PG_PASSWORD")
-PG_HOST = os.getenv("PG_HOST")
-PG_PORT = os.getenv("PG_PORT")
-PG_DBNAME = os.getenv("PG_DBNAME")
-DATABASE_URI = f"postgresql+psycopg2://{PG_USER}:{PG_PASSWORD}@{PG_HOST}:{PG_PORT}/{PG_DBNAME}"
-
-
-# --- LLM Config for initialization ---
-llm_config = {
-    'default_model': 'gpt-4o',
-    'rag_model': 'gpt-4o',
-    'research_model': 'gpt-4o',
-    'linkedin_model': 'gpt-4o',
-    'linkedin_temp': 0.8,
-    'email_writer_model': 'gpt-4o',
-    'email_writer_temp': 0.7,
-    'email_reviewer_model': 'gpt-4o',
-    'sales_model': 'gpt-4o',
-    'yukta_nexus_model': 'gpt-4o',
-    'embedding_model': "nvidia/llama-3.2-nv-embedqa-1b-v2",
-    'calendar_model' : 'gpt-4o'
-}
-
-# --- API Keys Config ---
-api_keys = {
-    'OPENAI_API_KEY': OPENAI_API_KEY,
-    'TAVILY_API_KEY': TAVILY_API_KEY,
-    'NVIDIA_API_KEY': NVIDIA_API_KEY,
-    'PINECONE_API_KEY': PINECONE_API_KEY
-}
+from yukta_nexus import initialize_yukta_graph, get_dashboard_stats
+from langchain_core.messages import HumanMessage
+from Utils.streaming import stream_yukta_turn, format_agent_path
+from Utils.yukta_client import YuktaClient, YuktaServerError
+from Utils.admission import Overloaded, find_overloaded, get_admission_controller
+
+# --- Configuration (environment variables, see yukta_config.py) ---
+from yukta_config import llm_config, api_keys, runtime_config, DATABASE_URI, PINECONE_INDEX_NAME, YUKTA_SERVER_URL
 
 
 # --- Initialize Yukta and get the compiled graph and memory saver ---
@@ -61,13 +24,28 @@ def cached_initialize_yukta_graph():
         api_keys,
         DATABASE_URI,
         './TestData',
-        PINECONE_INDEX_NAME
+        PINECONE_INDEX_NAME,
+        runtime_config
     )
     st.success("Yukta AI Assistant Core Initialized!")
     return yukta_graph, checkpointer
 
-# --- Get the initialized Yukta graph and checkpointer instance ---
-yukta_nexus_graph, session_memory_saver = cached_initialize_yukta_graph()
+@st.cache_resource
+def cached_yukta_client():
+    """Client of the Yukta HTTP server (server.py); the graph then runs there instead of in this process."""
+    return YuktaClient(YUKTA_SERVER_URL, max_retries=0) # A busy server's message is shown instead of waiting it out
+
+@st.cache_data
+def load_style_css(path="style.css"):
+    with open(path) as f:
+        return f.read()
+
+# --- Get the initialized Yukta graph and checkpointer instance, or the server client ---
+if YUKTA_SERVER_URL:
+    yukta_client, yukta_nexus_graph = cached_yukta_client(), None
+else:
+    yukta_client = None
+    yukta_nexus_graph, session_memory_saver = cached_initialize_yukta_graph()
 
 
 # --- Streamlit UI Setup ---
@@ -101,7 +79,7 @@ st.markdown("""
     }
 
     /* Apply custom CSS from file */
-    """ + open("style.css").read() + """
+    """ + load_style_css() + """
     </style>
 """, unsafe_allow_html=True)
 
@@ -152,28 +130,47 @@ if prompt := st.chat_input("How can Yukta help you today?"):
 
     with chat_history_container.chat_message("assistant"): # Display in the fixed height container
         message_placeholder = st.empty() # Create an empty placeholder to update with response
+        admission_ticket = None
         
         try:
-            # Use yukta_nexus_graph.invoke() method to get the final response.
-            # Using invoke() is simpler for UI as it returns the complete final state,
-            # unlike stream() which provides granular intermediate updates.
-            with st.spinner("Yukta is thinking..."): # Show a spinner while processing
-                final_state = yukta_nexus_graph.invoke(
+            # Stream the run instead of blocking on invoke(): tokens are rendered into the
+            # placeholder as they arrive and supervisor/agent handoffs are shown live.
+            status = st.status("Yukta is thinking...", expanded=False)
+            streamed_text = ""
+            current_path = None
+            full_response = None
+            if yukta_client is not None:
+                events = yukta_client.stream(st.session_state.thread_id, prompt)
+            else:
+                # Per-user rate limit and load shedding; raises Overloaded with a message for the user
+                admission = get_admission_controller()
+                admission_ticket = admission.admit(st.session_state.thread_id) if admission is not None else None
+                events = stream_yukta_turn(
+                    yukta_nexus_graph,
                     {"messages": [HumanMessage(content=prompt)]}, # Input is a list containing the user's HumanMessage
                     config=config # Pass the config to enable short-term memory
                 )
+            for event in events:
+                if event["type"] == "step":
+                    status.update(label=f"Yukta is working: {format_agent_path(event['path'])}")
+                    status.write(format_agent_path(event["path"]))
+                elif event["type"] == "token":
+                    if event["path"] != current_path: # A different agent started speaking, start a fresh buffer
+                        current_path = event["path"]
+                        streamed_text = ""
+                    streamed_text += event["text"]
+                    message_placeholder.markdown(streamed_text + "▌")
+                elif event["type"] == "custom" and "email_draft" in event["data"]: # Draft shown while the reviewer runs
+                    message_placeholder.markdown(event["data"]["email_draft"] + "\n\n*Reviewing the draft...*")
+                elif event["type"] == "final": # The answer stored in the thread
+                    full_response = event["content"]
+                elif event["type"] == "error": # Raised by the server for a failed or cancelled run
+                    if event.get("retry_after") is not None: # Shed by the server's admission control during the run
+                        raise Overloaded(event["message"], event.get("reason"), event["retry_after"])
+                    raise RuntimeError(event["message"])
+            status.update(label="Done", state="complete")
 
-            # Extract the final AI message from the complete state after invocation
-            final_ai_message = None
-            if "messages" in final_state and final_state["messages"]:
-                for msg in reversed(final_state["messages"]):
-                    if isinstance(msg, AIMessage):
-                        final_ai_message = msg
-                        break
-            
-            if final_ai_message:
-                full_response = final_ai_message.content
-                
+            if full_response:
                 # Special check: If the response indicates a chart was generated, display the image
                 if "Chart generated successfully:" in full_response:
                     image_path_str = full_response.replace("Chart generated successfully:", "").strip()
@@ -193,11 +190,120 @@ if prompt := st.chat_input("How can Yukta help you today?"):
                 st.session_state.messages.append({"role": "assistant", "content": "Yukta could not generate a clear response for this query."})
                 
         except Exception as e:
-            st.error(f"An internal error occurred: {e}. Please check your API keys, database, and Pinecone connections.")
-            st.session_state.messages.append({"role": "assistant", "content": f"Sorry, I encountered an error: {e}. Please try again."})
+            overloaded = find_overloaded(e) # Shed model calls may reach here wrapped by the client library
+            if overloaded is not None or (isinstance(e, YuktaServerError) and e.status_code in (429, 503)):
+                # Yukta is at capacity: say so right away instead of letting the request time out
+                busy_message = e.detail if overloaded is None else str(overloaded)
+                message_placeholder.warning(busy_message)
+                st.session_state.messages.append({"role": "assistant", "content": busy_message})
+            else:
+                st.error(f"An internal error occurred: {e}. Please check your API keys, database, and Pinecone connections.")
+                st.session_state.messages.append({"role": "assistant", "content": f"Sorry, I encountered an error: {e}. Please try again."})
+        finally:
+            if admission_ticket is not None:
+                admission_ticket.release()
 
 
 if st.sidebar.button("Clear Chat History"):
     st.session_state.messages = []
     st.session_state.thread_id = str(uuid.uuid4()) # Generate new thread_id for a fresh start
-    st.rerun() # CORRECTED: Use st.rerun()
\ No newline at end of file
+    st.rerun() # CORRECTED: Use st.rerun()
+
+try:
+    dashboard_stats = yukta_client.stats() if yukta_client is not None else get_dashboard_stats()
+except Exception as e:
+    print(f"Error fetching Yukta statistics: {e}")
+    dashboard_stats = {}
+
+run_stats = dashboard_stats.get('runs') # Only served by the HTTP server
+if run_stats:
+    with st.sidebar.expander("Yukta server"):
+        st.metric("Runs in progress", f"{run_stats['running']} / {run_stats['workers']}", help=f"{run_stats['queued']} of {run_stats['max_queue']} queue slots used")
+        st.caption(f"{run_stats['completed']} completed, {run_stats['failed']} failed, {run_stats['rejected_full']} rejected (queue full)")
+        if run_stats['run_p50_s'] is not None:
+            st.caption(f"Run p50 {run_stats['run_p50_s']:.1f}s / p95 {run_stats['run_p95_s']:.1f}s, queue wait p95 {run_stats['queue_wait_p95_s']:.2f}s")
+
+fast_path_stats = dashboard_stats.get('fast_path')
+if fast_path_stats:
+    with st.sidebar.expander("Fast-path router"):
+        st.metric("Hit rate", f"{fast_path_stats['hit_rate']:.0%}", help=f"{fast_path_stats['requests']} requests routed")
+        if fast_path_stats['estimated_latency_saved_s'] is not None:
+            st.metric("Estimated latency saved", f"{fast_path_stats['estimated_latency_saved_s']:.1f}s")
+        st.json(fast_path_stats['hits_by_agent'])
+
+rag_cache_stats = dashboard_stats.get('rag_cache')
+if rag_cache_stats:
+    with st.sidebar.expander("RAG answer cache"):
+        st.metric("Hit rate", f"{rag_cache_stats['hit_rate']:.0%}", help=f"{rag_cache_stats['hits']} hits / {rag_cache_stats['misses']} misses")
+        st.caption(f"{rag_cache_stats['entries']} cached answers, {rag_cache_stats['invalidations']} invalidations")
+
+sales_cache_stats = dashboard_stats.get('sales_cache')
+if sales_cache_stats:
+    with st.sidebar.expander("Sales query cache"):
+        st.metric("Question -> SQL hits", sales_cache_stats['sql_hits'], help=f"{sales_cache_stats['cached_questions']} questions cached")
+        st.metric("Result hits", sales_cache_stats['result_hits'], help=f"{sales_cache_stats['cached_results']} result sets cached")
+        st.caption(f"{sales_cache_stats['invalidations']} invalidations from 'sales' table changes")
+
+sql_guard_stats = dashboard_stats.get('sql_guard')
+if sql_guard_stats:
+    with st.sidebar.expander("SQL guard"):
+        rejections = ", ".join(f"{count} {reason}" for reason, count in sql_guard_stats['rejections'].items()) or "none"
+        st.metric("Queries rejected", sql_guard_stats['rejected'], help=f"{sql_guard_stats['checked']} checked; by reason: {rejections}")
+        st.metric("Row caps applied", sql_guard_stats['limits_added'] + sql_guard_stats['limits_capped'], help=f"{sql_guard_stats['truncated']} results truncated at {sql_guard_stats['max_rows']} rows")
+        st.caption(f"{sql_guard_stats['plans_checked']} plans checked (max cost {sql_guard_stats['max_cost']:,.0f}), {sql_guard_stats['timeouts']} timeouts")
+
+search_cache_stats = dashboard_stats.get('search_cache')
+if search_cache_stats:
+    with st.sidebar.expander("Web search cache"):
+        st.metric("Hit rate", f"{search_cache_stats['hit_rate']:.0%}", help=f"{search_cache_stats['hits']} cached, {search_cache_stats['coalesced']} shared in-flight, {search_cache_stats['misses']} misses")
+        st.caption(f"{search_cache_stats['fetches']} Tavily calls, {search_cache_stats['errors']} errors, {search_cache_stats['entries']} results on disk")
+
+model_tier_stats = dashboard_stats.get('model_tiers')
+if model_tier_stats:
+    with st.sidebar.expander("Model tiers"):
+        for tier, tier_stats in model_tier_stats.items():
+            st.metric(f"{tier.capitalize()} tier escalations", f"{tier_stats['escalation_rate']:.0%}", help=f"{tier_stats['escalations']} of {tier_stats['calls']} calls escalated to the role's large model")
+            if tier_stats['reasons']:
+                st.caption(", ".join(f"{reason}: {count}" for reason, count in tier_stats['reasons'].items()))
+
+admission_stats = dashboard_stats.get('admission')
+if admission_stats:
+    with st.sidebar.expander("Admission control"):
+        shed = admission_stats['rejected_user_rate'] + admission_stats['rejected_capacity'] + admission_stats['rejected_downstream']
+        st.metric("Messages shed", shed, help=f"{admission_stats['admitted']} admitted; {admission_stats['rejected_user_rate']} over a user's rate limit, {admission_stats['rejected_capacity']} at capacity, {admission_stats['rejected_downstream']} for a saturated service")
+        st.caption(f"Active runs: {admission_stats['active_runs']['interactive']} interactive, {admission_stats['active_runs']['batch']} batch (max {admission_stats['max_active_runs']})")
+        st.dataframe([{"service": name, "in use": sum(row['in_use'].values()), "limit": row['limit'], "waiting": sum(row['waiting'].values()), "timeouts": row['timeouts']}
+                      for name, row in admission_stats['downstreams'].items()], hide_index=True)
+
+model_registry_stats = dashboard_stats.get('model_registry')
+if model_registry_stats and model_registry_stats['requests']:
+    with st.sidebar.expander("Model clients"):
+        st.metric("Connection reuse", f"{model_registry_stats['reuse_rate']:.0%}", help=f"{model_registry_stats['requests']} requests over {model_registry_stats['new_connections']} new sockets")
+        st.caption(f"{len(model_registry_stats['models'])} shared model clients, {model_registry_stats['open_connections']} open / {model_registry_stats['idle_connections']} idle connections, HTTP/2: {'on' if model_registry_stats['http2'] else 'off'}")
+        st.caption(f"{model_registry_stats['rate_limited']} rate-limited and {model_registry_stats['server_errors']} failed responses retried")
+        st.dataframe([{"model": model, "requests": row['requests'], "in flight": row['in_flight'], "queued": row['queued']} for model, row in model_registry_stats['by_model'].items()], hide_index=True)
+
+history_stats = dashboard_stats.get('history')
+if history_stats:
+    with st.sidebar.expander("History compaction"):
+        st.metric("Prompt tokens saved", f"{history_stats['reduction']:.0%}", help=f"{history_stats['tokens_saved']} of {history_stats['raw_tokens']} history tokens over {history_stats['model_calls']} model calls")
+        st.caption(f"{history_stats['summary_calls']} summary updates across {history_stats['threads']} conversations")
+
+startup_report = dashboard_stats.get('startup')
+if startup_report:
+    with st.sidebar.expander("Startup"):
+        st.metric("Ready after", f"{startup_report['ready_seconds']:.1f}s", help=f"{startup_report['component_seconds']:.1f}s of component build time, run concurrently")
+        st.dataframe([{"component": name, "phase": row['phase'], "seconds": None if row['seconds'] is None else round(row['seconds'], 3)}
+                      for name, row in sorted(startup_report['components'].items(), key=lambda item: -(item[1]['seconds'] or 0))], hide_index=True)
+        if startup_report['lazy_pending']:
+            st.caption(f"Not connected yet (built on first use): {', '.join(startup_report['lazy_pending'])}")
+        for name, error in startup_report['errors'].items():
+            st.caption(f"{name}: {error}")
+
+trace_report = dashboard_stats.get('trace')
+if trace_report and trace_report['agents']:
+    with st.sidebar.expander("Latency by agent / tool"):
+        for group in ("agents", "tools"):
+            st.caption(group.capitalize())
+            st.dataframe([{"name": name, "count": row['count'], "p50 ms": row['p50_ms'], "p95 ms": row['p95_ms']} for name, row in trace_report[group].items()], hide_index=True)
+        st.caption(", ".join(f"{model}: {row['prompt_tokens']:,} in / {row['completion_tokens']:,} out (${row['cost_usd']:.3f})" for model, row in trace_report['models'].items()))
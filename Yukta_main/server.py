@@ -0,0 +1,293 @@
+"""
+HTTP / WebSocket serving layer for the Yukta graph, independent of Streamlit.
+
+The compiled graph is built once per process, at startup. Each user message becomes a run on a bounded RunQueue
+(Utils/run_queue.py) executed by a fixed pool of async workers, so the process serves many conversations at once and
+pushes back (429 + Retry-After) instead of piling up work. Before a run is queued, the admission controller of
+initialize_yukta_graph (Utils/admission.py) applies the per-user rate limit and sheds load when the services behind
+the graph are saturated; its message is returned as the 429's detail. The X-Yukta-Reject-Reason header of a 429 tells
+the rejections apart: "queue_full" is worth retrying after Retry-After, "user_rate", "capacity" and "downstream:..." are not. Conversations are keyed by thread_id; their state lives in
+the graph's checkpointer, so with a shared checkpointer (CHECKPOINTER_BACKEND=postgres) any number of server processes
+can run behind a load balancer.
+
+    POST /threads/{thread_id}/runs/stream   run a message and stream its events (SSE), the endpoint thin clients use;
+                                            body {"message", "priority": "interactive"|"batch", "user_id" (optional)}
+    POST /threads/{thread_id}/runs          queue a message, returns the run (202)
+    GET  /runs/{run_id}                     run status and final answer
+    GET  /runs/{run_id}/events              stream a run's events (SSE); resumes after the Last-Event-ID header
+    WS   /threads/{thread_id}/ws            send {"message": ...}, receive the run's events; repeatable per connection
+    GET  /threads/{thread_id}/messages      the conversation so far (user messages and Yukta's answers)
+    GET  /healthz, /readyz, /stats          liveness, readiness (503 while draining or full), queue and cache statistics
+    POST /admin/sales-schema/refresh        re-introspect the sales schema snapshot after a migration and clear the
+                                            question -> SQL cache; body {"tables": [...]} (optional, default ["sales"])
+
+Events are the dicts of Utils/streaming.py ("step", "token", "custom", "final") framed by "queued", "started",
+"error" and "done", each with a sequence number "seq". On SIGTERM the server stops accepting runs and lets the
+queued and running ones finish (YUKTA_DRAIN_TIMEOUT_SECONDS) before exiting.
+
+Usage (from Yukta_main/):
+    python server.py --port 8000 --run-workers 8 --max-queue 64
+    uvicorn server:app --host 0.0.0.0 --port 8000
+"""
+import json
+import asyncio
+import argparse
+from typing import List, Literal, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from langchain_core.messages import HumanMessage, AIMessage
+
+from yukta_config import server_config
+from Utils.run_queue import RunQueue, QueueFull, ThreadBusy, ShuttingDown
+from Utils.admission import Overloaded
+from Utils.streaming import astream_yukta_turn
+from Utils.history_manager import split_turns
+
+SSE_HEARTBEAT_SECONDS = 15
+REJECT_REASON_HEADER = "X-Yukta-Reject-Reason"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} # Keep proxies from buffering the stream
+
+
+class RunRequest(BaseModel):
+    message: str
+    priority: Literal["interactive", "batch"] = "interactive"
+    user_id: Optional[str] = None # Rate-limited identity; the thread_id when omitted
+
+
+class SchemaRefreshRequest(BaseModel):
+    tables: Optional[List[str]] = None
+
+
+def _initialize_graph():
+    from yukta_config import llm_config, api_keys, runtime_config, DATABASE_URI, PINECONE_INDEX_NAME
+    from yukta_nexus import initialize_yukta_graph
+    graph, _ = initialize_yukta_graph(llm_config, api_keys, DATABASE_URI, './TestData', PINECONE_INDEX_NAME, runtime_config)
+    return graph
+
+
+def _admission_controller():
+    from Utils.admission import get_admission_controller
+    return get_admission_controller()
+
+
+def _dashboard_stats():
+    from yukta_nexus import get_dashboard_stats
+    return get_dashboard_stats()
+
+
+def _refresh_sales_schema(tables):
+    from Agents.sales_data_agent import refresh_sales_schema
+    return refresh_sales_schema(tables)
+
+
+def _sse(event):
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _sse_stream(run, after=0):
+    async for event in run.follow(after, heartbeat=SSE_HEARTBEAT_SECONDS):
+        yield ": keep-alive\n\n" if event is None else _sse(event)
+
+
+async def _send(websocket, payload):
+    """send_json that reports a socket the client has already closed as WebSocketDisconnect, whatever the server raised."""
+    try:
+        await websocket.send_json(payload)
+    except (RuntimeError, OSError) as e: # Starlette: send after close; uvicorn: ClientDisconnected
+        raise WebSocketDisconnect(code=1006, reason=str(e)) from e
+
+
+async def _forward_events(websocket, run):
+    async for event in run.follow():
+        await _send(websocket, event)
+
+
+async def _watch_socket(websocket, pending):
+    """Reads the socket while a run is followed, so a client that leaves is noticed at once; messages sent meanwhile are kept."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        pending.append(message)
+
+
+def _conversation(messages):
+    """[{"role": "user"|"assistant", "content": ...}] of a thread: each request and Yukta's answer, without the inner agent traffic."""
+    conversation = []
+    for turn in split_turns(messages):
+        request = next((m for m in turn if isinstance(m, HumanMessage)), None)
+        answer = next((m for m in reversed(turn) if isinstance(m, AIMessage) and isinstance(m.content, str) and m.content.strip()
+                       and not m.response_metadata.get("__is_handoff_back")), None)
+        if request is not None:
+            conversation.append({"role": "user", "content": request.content})
+        if answer is not None:
+            conversation.append({"role": "assistant", "content": answer.content})
+    return conversation
+
+
+def create_app(graph_factory=None, stats_fn=None, admission=None, schema_refresh_fn=None, run_workers=8, max_queue=64, run_timeout=600, drain_timeout=30, retention_seconds=600):
+    """
+    graph_factory:  callable() -> compiled graph, called once at startup (default: initialize_yukta_graph with yukta_config).
+    stats_fn:       callable() -> dict merged into /stats (default: yukta_nexus.get_dashboard_stats).
+    admission:      AdmissionController for the run queue (default: the one initialize_yukta_graph set up, if any).
+    schema_refresh_fn: callable(tables) -> table info, for /admin/sales-schema/refresh (default: sales_data_agent.refresh_sales_schema).
+    The remaining arguments configure the RunQueue and the shutdown drain.
+    """
+    graph_factory = graph_factory or _initialize_graph
+    stats_fn = stats_fn or _dashboard_stats
+    schema_refresh_fn = schema_refresh_fn or _refresh_sales_schema
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.graph = await asyncio.to_thread(graph_factory) # Initialization blocks on I/O; keep it off the loop
+
+        async def run_turn(thread_id, message):
+            config = {"configurable": {"thread_id": thread_id}}
+            async for event in astream_yukta_turn(app.state.graph, {"messages": [HumanMessage(content=message)]}, config):
+                yield event
+
+        app.state.runs = RunQueue(run_turn, workers=run_workers, max_queue=max_queue, run_timeout=run_timeout,
+                                  retention_seconds=retention_seconds, admission=admission or _admission_controller())
+        await app.state.runs.start()
+        print(f"Yukta server ready: {run_workers} run workers, queue of {max_queue}")
+        yield
+        print("Yukta server shutting down: draining the run queue")
+        await app.state.runs.shutdown(drain_timeout)
+
+    app = FastAPI(title="Yukta", lifespan=lifespan)
+
+    def submit(thread_id, body):
+        try:
+            return app.state.runs.submit(thread_id, body.message, body.priority, body.user_id)
+        except (QueueFull, Overloaded) as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after), REJECT_REASON_HEADER: e.reason})
+        except ThreadBusy as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ShuttingDown as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    def get_run(run_id):
+        run = app.state.runs.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or expired run '{run_id}'.")
+        return run
+
+    @app.post("/threads/{thread_id}/runs/stream")
+    async def stream_run(thread_id: str, body: RunRequest):
+        run = submit(thread_id, body)
+        return StreamingResponse(_sse_stream(run), media_type="text/event-stream", headers={**SSE_HEADERS, "X-Run-Id": run.run_id})
+
+    @app.post("/threads/{thread_id}/runs", status_code=202)
+    async def create_run(thread_id: str, body: RunRequest):
+        run = submit(thread_id, body)
+        return {**run.describe(), "events_url": f"/runs/{run.run_id}/events"}
+
+    @app.get("/runs/{run_id}")
+    async def read_run(run_id: str):
+        return get_run(run_id).describe()
+
+    @app.get("/runs/{run_id}/events")
+    async def run_events(run_id: str, request: Request):
+        run = get_run(run_id)
+        after = int(request.headers.get("last-event-id") or 0)
+        return StreamingResponse(_sse_stream(run, after), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    @app.websocket("/threads/{thread_id}/ws")
+    async def thread_socket(websocket: WebSocket, thread_id: str):
+        await websocket.accept()
+        pending = [] # Messages received while the previous run was being followed
+        try:
+            while True:
+                message = pending.pop(0) if pending else await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                try:
+                    body = RunRequest(**json.loads(message.get("text") or message.get("bytes") or "{}"))
+                    run = submit(thread_id, body)
+                except (ValidationError, ValueError, TypeError) as e:
+                    await _send(websocket, {"type": "error", "status": 422, "message": str(e)})
+                    continue
+                except HTTPException as e:
+                    await _send(websocket, {"type": "error", "status": e.status_code, "message": e.detail,
+                                            "retry_after": (e.headers or {}).get("Retry-After"), "reason": (e.headers or {}).get(REJECT_REASON_HEADER)})
+                    continue
+                follower = asyncio.create_task(_forward_events(websocket, run))
+                watcher = asyncio.create_task(_watch_socket(websocket, pending))
+                try:
+                    await asyncio.wait({follower, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    follower.cancel()
+                    watcher.cancel()
+                followed, watched = await asyncio.gather(follower, watcher, return_exceptions=True)
+                if not isinstance(watched, asyncio.CancelledError):
+                    return # The client left (or its socket failed) while the run was being followed
+                if isinstance(followed, BaseException) and not isinstance(followed, asyncio.CancelledError):
+                    raise followed
+        except WebSocketDisconnect:
+            pass # A run whose client left keeps running; its answer is checkpointed in the thread
+
+    @app.get("/threads/{thread_id}/messages")
+    async def thread_messages(thread_id: str):
+        state = await app.state.graph.aget_state({"configurable": {"thread_id": thread_id}})
+        return {"thread_id": thread_id, "messages": _conversation(state.values.get("messages", []))}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz():
+        stats = app.state.runs.stats()
+        ready = stats["accepting"] and stats["queued"] < stats["max_queue"]
+        return JSONResponse({"ready": ready, "queued": stats["queued"], "running": stats["running"]}, status_code=200 if ready else 503)
+
+    @app.get("/stats")
+    async def stats():
+        try:
+            dashboard = await asyncio.to_thread(stats_fn)
+        except Exception as e:
+            print(f"Error collecting stats: {e}")
+            dashboard = {}
+        return {"runs": app.state.runs.stats(), **dashboard}
+
+    @app.post("/admin/sales-schema/refresh")
+    async def refresh_sales_schema(body: Optional[SchemaRefreshRequest] = None):
+        tables = (body.tables if body else None) or ["sales"]
+        try:
+            table_info = await asyncio.to_thread(schema_refresh_fn, tables) # Reflects the tables and reads sample rows
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Schema refresh failed: {e}")
+        return {"tables": tables, "table_info": table_info}
+
+    return app
+
+
+def _app_from_config():
+    return create_app(run_workers=server_config['run_workers'], max_queue=server_config['max_queue'],
+                      run_timeout=server_config['run_timeout_seconds'], drain_timeout=server_config['drain_timeout_seconds'],
+                      retention_seconds=server_config['run_retention_seconds'])
+
+
+app = _app_from_config() # For `uvicorn server:app`; the graph is only built when the server starts
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=server_config['host'])
+    parser.add_argument("--port", type=int, default=server_config['port'])
+    parser.add_argument("--run-workers", type=int, default=server_config['run_workers'])
+    parser.add_argument("--max-queue", type=int, default=server_config['max_queue'])
+    parser.add_argument("--drain-timeout", type=int, default=server_config['drain_timeout_seconds'])
+    args = parser.parse_args()
+
+    server_app = create_app(run_workers=args.run_workers, max_queue=args.max_queue, run_timeout=server_config['run_timeout_seconds'],
+                            drain_timeout=args.drain_timeout, retention_seconds=server_config['run_retention_seconds'])
+    # Open streams get the drain timeout to finish before uvicorn runs the lifespan shutdown
+    uvicorn.run(server_app, host=args.host, port=args.port, timeout_graceful_shutdown=args.drain_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Configuration shared by the Streamlit app (app2.py) and the HTTP server (server.py), read from the environment / .env.
+"""
+import os
+import json
+from dotenv import load_dotenv
+
+# --- Configuration (Load Environment Variables) ---
+load_dotenv()
+
+# --- Retrieve Environment Variables ---
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')
+NVIDIA_API_KEY = os.getenv('NVIDIA_API_KEY')
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "rag-documents-index")
+
+PG_USER = os.getenv("PG_USER")
+PG_PASSWORD = os.getenv("PG_PASSWORD")
+PG_HOST = os.getenv("PG_HOST")
+PG_PORT = os.getenv("PG_PORT")
+PG_DBNAME = os.getenv("PG_DBNAME")
+DATABASE_URI = f"postgresql+psycopg2://{PG_USER}:{PG_PASSWORD}@{PG_HOST}:{PG_PORT}/{PG_DBNAME}"
+
+# --- Checkpointer (conversation memory) backend: "memory", "sqlite" or "postgres" ---
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "memory")
+CHECKPOINTER_SQLITE_PATH = os.getenv("CHECKPOINTER_SQLITE_PATH", "yukta_checkpoints.sqlite")
+CHECKPOINTER_TTL_SECONDS = int(os.getenv("CHECKPOINTER_TTL_SECONDS", "0")) or None
+CHECKPOINTER_MAX_THREADS = int(os.getenv("CHECKPOINTER_MAX_THREADS", "0")) or None
+
+
+# --- LLM Config for initialization ---
+llm_config = {
+    'default_model': 'gpt-4o',
+    'rag_model': 'gpt-4o',
+    'research_model': 'gpt-4o',
+    'linkedin_model': 'gpt-4o',
+    'linkedin_temp': 0.8,
+    'email_writer_model': 'gpt-4o',
+    'email_writer_temp': 0.7,
+    'email_reviewer_model': 'gpt-4o',
+    'sales_model': 'gpt-4o',
+    'yukta_nexus_model': 'gpt-4o',
+    'embedding_model': "nvidia/llama-3.2-nv-embedqa-1b-v2",
+    'calendar_model' : 'gpt-4o'
+}
+
+# --- API Keys Config ---
+api_keys = {
+    'OPENAI_API_KEY': OPENAI_API_KEY,
+    'TAVILY_API_KEY': TAVILY_API_KEY,
+    'NVIDIA_API_KEY': NVIDIA_API_KEY,
+    'PINECONE_API_KEY': PINECONE_API_KEY
+}
+
+
+# --- Runtime Config ---
+runtime_config = {
+    'fast_path_router_enabled': os.getenv("YUKTA_FAST_PATH_ROUTER", "true").lower() == "true",
+    'fast_path_router_threshold': float(os.getenv("YUKTA_FAST_PATH_THRESHOLD", "0.75")),
+    'yukta_prime_mode': os.getenv("YUKTA_PRIME_MODE", "sequential"), # 'plan' runs independent steps in parallel
+    'checkpointer_backend': CHECKPOINTER_BACKEND,
+    'checkpointer_sqlite_path': CHECKPOINTER_SQLITE_PATH,
+    'checkpointer_pg_conninfo': f"postgresql://{PG_USER}:{PG_PASSWORD}@{PG_HOST}:{PG_PORT}/{PG_DBNAME}",
+    'checkpointer_pool_max_size': int(os.getenv("CHECKPOINTER_POOL_MAX_SIZE", "10")),
+    'checkpointer_ttl_seconds': CHECKPOINTER_TTL_SECONDS,
+    'checkpointer_max_threads': CHECKPOINTER_MAX_THREADS,
+    'rag_cache_threshold': float(os.getenv("RAG_CACHE_THRESHOLD", "0.92")),
+    'rag_cache_ttl_seconds': int(os.getenv("RAG_CACHE_TTL_SECONDS", str(24 * 3600))),
+    'search_cache_enabled': os.getenv("SEARCH_CACHE", "true").lower() == "true",
+    'search_cache_path': os.getenv("SEARCH_CACHE_PATH", os.path.join(".search_cache", "search_cache.sqlite")),
+    'search_cache_news_ttl_seconds': int(os.getenv("SEARCH_CACHE_NEWS_TTL_SECONDS", str(15 * 60))),
+    'search_cache_general_ttl_seconds': int(os.getenv("SEARCH_CACHE_GENERAL_TTL_SECONDS", str(7 * 24 * 3600))),
+    'sales_result_ttl_seconds': int(os.getenv("SALES_RESULT_TTL_SECONDS", "300")),
+    'sales_sql_ttl_seconds': int(os.getenv("SALES_SQL_TTL_SECONDS", str(24 * 3600))),
+    'sales_marker_check_interval': int(os.getenv("SALES_MARKER_CHECK_INTERVAL", "30")),
+    'sales_schema_cache_dir': os.getenv("SALES_SCHEMA_CACHE_DIR", ".schema_cache"),
+    'sales_result_max_rows': int(os.getenv("SALES_RESULT_MAX_ROWS", "10000")),
+    'sales_query_max_cost': float(os.getenv("SALES_QUERY_MAX_COST", "1000000")), # EXPLAIN total cost (Postgres planner units)
+    'sales_query_timeout_ms': int(os.getenv("SALES_QUERY_TIMEOUT_MS", "15000")),
+    'chart_cache_max_mb': int(os.getenv("CHART_CACHE_MAX_MB", "50")),
+    'email_max_revisions': int(os.getenv("EMAIL_MAX_REVISIONS", "2")),
+    'email_stream_draft': os.getenv("EMAIL_STREAM_DRAFT", "true").lower() == "true",
+    'history_compaction_enabled': os.getenv("HISTORY_COMPACTION", "true").lower() == "true",
+    'history_keep_turns': int(os.getenv("HISTORY_KEEP_TURNS", "4")),
+    'history_max_tokens': int(os.getenv("HISTORY_MAX_TOKENS", "6000")),
+    'tracing_enabled': os.getenv("YUKTA_TRACING", "true").lower() == "true",
+    'tracing_sink': os.getenv("YUKTA_TRACE_SINK", "jsonl"), # 'jsonl', 'sqlite' or 'none'
+    'tracing_path': os.getenv("YUKTA_TRACE_PATH", os.path.join("traces", "spans.jsonl")),
+    'model_tiering_enabled': os.getenv("MODEL_TIERING", "true").lower() == "true",
+    'model_tiers': { # Model per tier; empty keeps each role's model from llm_config (also the escalation target)
+        'routing': os.getenv("MODEL_TIER_ROUTING", "gpt-4o-mini"),
+        'light': os.getenv("MODEL_TIER_LIGHT", "gpt-4o-mini"),
+        'heavy': os.getenv("MODEL_TIER_HEAVY", ""),
+    },
+    'model_tier_min_confidence': float(os.getenv("MODEL_TIER_MIN_CONFIDENCE", "0")) or None,
+    'llm_max_connections': int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+    'llm_max_keepalive_connections': int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    'llm_http2': os.getenv("LLM_HTTP2", "true").lower() == "true", # Needs the optional 'h2' package
+    'llm_default_concurrency': int(os.getenv("LLM_CONCURRENCY", "16")), # Concurrent requests per model
+    'llm_concurrency_limits': json.loads(os.getenv("LLM_CONCURRENCY_LIMITS", "{}")), # e.g. {"gpt-4o": 8}
+    'llm_max_retries': int(os.getenv("LLM_MAX_RETRIES", "4")),
+    'startup_max_workers': int(os.getenv("STARTUP_MAX_WORKERS", "8")),
+    # Lazy backends connected in the background right after startup: pinecone_retriever, sales_sql, google_calendar
+    'startup_prewarm': [name.strip() for name in os.getenv("STARTUP_PREWARM", "").split(",") if name.strip()],
+    'admission_enabled': os.getenv("ADMISSION_CONTROL", "true").lower() == "true",
+    'admission_user_rate_per_minute': float(os.getenv("ADMISSION_USER_RATE_PER_MINUTE", "20")),
+    'admission_user_burst': int(os.getenv("ADMISSION_USER_BURST", "5")),
+    'admission_max_active_runs': int(os.getenv("ADMISSION_MAX_ACTIVE_RUNS", "32")),
+    'admission_batch_share': float(os.getenv("ADMISSION_BATCH_SHARE", "0.5")), # Share of runs and downstream slots batch jobs may hold
+    # Concurrent calls per downstream service, e.g. {"openai": 32, "tavily": 8, "pinecone": 16, "postgres": 8, "google_calendar": 4}
+    'admission_downstream_limits': json.loads(os.getenv("ADMISSION_DOWNSTREAM_LIMITS", "null")),
+    'admission_max_downstream_waiting': int(os.getenv("ADMISSION_MAX_DOWNSTREAM_WAITING", "16")),
+}
+
+# --- HTTP server (server.py) ---
+# When set, app2.py is a thin client of a running server instead of executing the graph in the Streamlit process
+YUKTA_SERVER_URL = os.getenv("YUKTA_SERVER_URL", "").rstrip("/")
+server_config = {
+    'host': os.getenv("YUKTA_SERVER_HOST", "0.0.0.0"),
+    'port': int(os.getenv("YUKTA_SERVER_PORT", "8000")),
+    'run_workers': int(os.getenv("YUKTA_RUN_WORKERS", "8")), # Runs executed concurrently per server process
+    'max_queue': int(os.getenv("YUKTA_MAX_QUEUE", "64")), # Runs waiting for a worker before new ones get 429
+    'run_timeout_seconds': int(os.getenv("YUKTA_RUN_TIMEOUT_SECONDS", "600")),
+    'drain_timeout_seconds': int(os.getenv("YUKTA_DRAIN_TIMEOUT_SECONDS", "30")), # Graceful shutdown
+    'run_retention_seconds': int(os.getenv("YUKTA_RUN_RETENTION_SECONDS", "600")),
+}
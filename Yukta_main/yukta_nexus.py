@@ -1,15 +1,18 @@
 # yukta_nexus.py
 
 import os
+import time
 from dotenv import load_dotenv
 
 from langchain_openai import ChatOpenAI
 from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
 from langchain_core.output_parsers import StrOutputParser
 from langgraph_supervisor import create_supervisor
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, MessagesState, START, END
+from langchain_core.messages import HumanMessage
 
 
+from Agents import RAG_agent, research_agent, linkedin_agent, email_agent, sales_data_agent, calendar_agent
 from Agents.RAG_agent import init_rag_agent, create_rag_agent
 from Agents.research_agent import init_research_agent, create_research_agent
 from Agents.linkedin_agent import init_linkedin_agent, create_linkedin_agent
@@ -17,10 +20,31 @@ from Agents.email_agent import init_email_agent, create_email_agent
 from Agents.sales_data_agent import init_sales_data_agent, create_sales_data_agent
 from Agents.calendar_agent import init_calendar_agent, create_calendar_agent
 
+from Supervisors import communication_supervisor, personal_supervisor, company_supervisor
 from Supervisors.communication_supervisor import init_communication_supervisor, create_communication_supervisor_graph
 from Supervisors.personal_supervisor import init_personal_supervisor, create_personal_supervisor_graph
 from Supervisors.company_supervisor import init_company_supervisor, create_company_supervisor_graph
 
+from Utils.fast_router import FastPathRouter, timed_node
+from Utils.plan_executor import build_plan_executor_graph
+from Utils.checkpointer import create_checkpointer, start_checkpointer_maintenance
+from Utils.semantic_cache import SemanticCache
+from Utils.sql_cache import SalesQueryCache
+from Utils.search_cache import SearchCache
+from Utils.schema_cache import SchemaSnapshotCache
+from Utils.result_store import ResultStore
+from Utils.sql_guard import SQLGuard
+from Utils.chart_renderer import ChartRenderer
+from Utils.history_manager import HistoryManager, SUMMARY_MODEL_TIER
+from Utils.model_tiers import ModelTierPolicy
+from Utils.model_registry import ModelRegistry
+from Utils.admission import AdmissionController, set_admission_controller
+from Utils.tracing import YuktaTracer, create_span_sink
+from Utils.runnable_registry import registered_runnables
+from Utils.startup import StartupReport, build_concurrently, prewarm
+
+YUKTA_PRIME_MODEL_TIER = "routing"
+
 yukta_nexus_prompt = """
 You are 'Yukta Prime', the central intelligence and primary supervisor of a sophisticated AI assistant system. Your main goal is to understand the user's request and intelligently delegate it to the most appropriate specialized supervisor or orchestrate a multi-step plan across supervisors if necessary. You are also designed to offer proactive assistance and relevant suggestions where appropriate.
 
@@ -80,52 +104,292 @@ You are 'Yukta Prime', the central intelligence and primary supervisor of a soph
 """
 
 
-def initialize_yukta_graph(llm_config_dict, api_keys_dict, db_uri, rag_test_data_path, pinecone_rag_index_name):
+_fast_path_router = None
+_history_manager = None
+_tracer = None
+_model_policy = None
+_model_registry = None
+_admission_controller = None
+_startup_report = None
+
+
+def get_fast_path_stats():
+    """Returns hit-rate and latency metrics of the fast-path router, or None if it is disabled."""
+    return _fast_path_router.stats() if _fast_path_router is not None else None
+
+
+def get_history_stats():
+    """Returns prompt-token savings of history compaction, or None if it is disabled."""
+    return _history_manager.stats() if _history_manager is not None else None
+
+
+def get_trace_report():
+    """Returns p50/p95 latency per agent/tool/model over recent spans, or None if tracing is disabled."""
+    return _tracer.report() if _tracer is not None else None
+
+
+def get_model_tier_stats():
+    """Returns calls/escalations per model tier, or None if tiering is disabled."""
+    return _model_policy.stats() if _model_policy is not None and _model_policy.enabled else None
+
+
+def get_model_registry_stats():
+    """Returns shared model clients, connection reuse and rate limiting of the LLM connection pool, or None before initialization."""
+    if _model_registry is None:
+        return None
+    return {**_model_registry.stats(), "models": sorted(_model_registry.models())}
+
+
+def get_admission_stats():
+    """Returns admitted and shed runs and the load of every downstream service, or None if admission control is disabled."""
+    return _admission_controller.stats() if _admission_controller is not None else None
+
+
+def get_startup_report():
+    """Returns the build time of every startup component and lazy backend, or None before initialization."""
+    return _startup_report.summary() if _startup_report is not None else None
 
-    llm = ChatOpenAI(model=llm_config_dict['default_model'])
-    RAG_llm = ChatOpenAI(model=llm_config_dict['rag_model'])
-    research_llm = ChatOpenAI(model=llm_config_dict['research_model'])
-    LinkedIn_llm = ChatOpenAI(model=llm_config_dict['linkedin_model'], temperature=llm_config_dict['linkedin_temp'])
-    email_writer_llm = ChatOpenAI(model=llm_config_dict['email_writer_model'], temperature=llm_config_dict['email_writer_temp'])
-    email_reviewer_llm = ChatOpenAI(model=llm_config_dict['email_reviewer_model'])
-    sales_llm = ChatOpenAI(model=llm_config_dict['sales_model'])
-    yukta_nexus_llm = ChatOpenAI(model=llm_config_dict['yukta_nexus_model'])
-    calendar_llm = ChatOpenAI(model = llm_config_dict['calendar_model'])
 
-    embedding = NVIDIAEmbeddings(model=llm_config_dict['embedding_model'], nvidia_api_key=api_keys_dict['NVIDIA_API_KEY'])
+def get_dashboard_stats():
+    """Every sidebar statistic in one dict (None for a disabled component); served by server.py at /stats."""
+    return {
+        "fast_path": get_fast_path_stats(),
+        "rag_cache": RAG_agent.get_rag_cache_stats(),
+        "sales_cache": sales_data_agent.get_sales_cache_stats(),
+        "sql_guard": sales_data_agent.get_sql_guard_stats(),
+        "search_cache": research_agent.get_search_cache_stats(),
+        "model_tiers": get_model_tier_stats(),
+        "model_registry": get_model_registry_stats(),
+        "admission": get_admission_stats(),
+        "history": get_history_stats(),
+        "startup": get_startup_report(),
+        "trace": get_trace_report(),
+    }
+
+
+def _build_fast_path_graph(yukta_prime_graph, fast_path_agents, router, checkpointer):
+    """
+    Wraps Yukta Prime in an outer graph whose entry edge asks the FastPathRouter whether the latest
+    user message can go straight to a single agent. Unambiguous requests skip both the Yukta Prime
+    and the domain supervisor LLM calls; everything else falls back to the full hierarchy.
+    """
+    agent_names = [agent.name for agent in fast_path_agents]
+
+    def route_request(state):
+        last_human = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
+        destination, _, _ = router.route(last_human.content if last_human else "", agent_names)
+        return destination
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(router.FALLBACK, timed_node(yukta_prime_graph, router, fast_path=False))
+    builder.add_edge(router.FALLBACK, END)
+    for agent in fast_path_agents:
+        builder.add_node(agent.name, timed_node(agent, router, fast_path=True))
+        builder.add_edge(agent.name, END)
+    builder.add_conditional_edges(START, route_request, [router.FALLBACK] + agent_names)
+    return builder.compile(checkpointer=checkpointer, name="yukta_nexus_graph_instance")
+
+
+def initialize_yukta_graph(llm_config_dict, api_keys_dict, db_uri, rag_test_data_path, pinecone_rag_index_name, runtime_config_dict=None):
+    global _fast_path_router, _history_manager, _tracer, _model_policy, _model_registry, _admission_controller, _startup_report
+    runtime_config_dict = runtime_config_dict or {}
+    _startup_report = report = StartupReport()
+
+    # Per-user rate limits, a cap on runs in progress and a concurrency cap per downstream service; callers admit
+    # runs with get_admission_controller().admit(), tools and the model registry take downstream slots
+    _admission_controller = None
+    if runtime_config_dict.get('admission_enabled', True):
+        _admission_controller = AdmissionController(
+            user_rate_per_minute=runtime_config_dict.get('admission_user_rate_per_minute', 20),
+            user_burst=runtime_config_dict.get('admission_user_burst', 5),
+            max_active_runs=runtime_config_dict.get('admission_max_active_runs', 32),
+            batch_share=runtime_config_dict.get('admission_batch_share', 0.5),
+            downstream_limits=runtime_config_dict.get('admission_downstream_limits'),
+            max_downstream_waiting=runtime_config_dict.get('admission_max_downstream_waiting', 16),
+        )
+    set_admission_controller(_admission_controller)
+
+    # Roles with the same model and settings share one client; all clients share one tuned connection pool
+    _model_registry = ModelRegistry(
+        model_class=lambda **kwargs: ChatOpenAI(stream_usage=True, **kwargs),
+        max_connections=runtime_config_dict.get('llm_max_connections', 100),
+        max_keepalive_connections=runtime_config_dict.get('llm_max_keepalive_connections', 20),
+        http2=runtime_config_dict.get('llm_http2', True),
+        concurrency_limits=runtime_config_dict.get('llm_concurrency_limits'),
+        default_concurrency=runtime_config_dict.get('llm_default_concurrency', 16),
+        max_retries=runtime_config_dict.get('llm_max_retries', 4),
+        downstream=_admission_controller.limiters.get('openai') if _admission_controller is not None else None,
+        downstream_timeout=_admission_controller.downstream_timeout if _admission_controller is not None else None,
+    )
+    # Each role declares a model tier; the policy maps it to a model (the role's own model from llm_config is the
+    # large one that low-confidence answers escalate to)
+    _model_policy = ModelTierPolicy(
+        model_factory=_model_registry.get,
+        tier_models=runtime_config_dict.get('model_tiers'),
+        enabled=runtime_config_dict.get('model_tiering_enabled', True),
+        min_confidence=runtime_config_dict.get('model_tier_min_confidence'),
+    )
+    model_for = _model_policy.model_for
+    default_model = llm_config_dict['default_model']
+
+    def history_manager():
+        if not runtime_config_dict.get('history_compaction_enabled', True):
+            return None
+        return HistoryManager(
+            keep_turns=runtime_config_dict.get('history_keep_turns', 4),
+            max_tokens=runtime_config_dict.get('history_max_tokens', 6000),
+            summary_llm=model_for(SUMMARY_MODEL_TIER, default_model),
+        )
+
+    def search_cache():
+        if not runtime_config_dict.get('search_cache_enabled', True):
+            return None
+        return SearchCache(
+            path=runtime_config_dict.get('search_cache_path', os.path.join('.search_cache', 'search_cache.sqlite')),
+            ttl_by_topic={'news': runtime_config_dict.get('search_cache_news_ttl_seconds', 15 * 60),
+                          'general': runtime_config_dict.get('search_cache_general_ttl_seconds', 7 * 24 * 3600)},
+        )
+
+    # Model clients, embeddings, caches and the checkpointer do not depend on each other and mostly wait on I/O
+    # (TLS setup, disk, connection pools), so they are built concurrently
+    components = build_concurrently({
+        'RAG_llm': lambda: model_for(RAG_agent.ANSWER_CHAIN_MODEL_TIER, llm_config_dict['rag_model']),
+        'RAG_agent_llm': lambda: model_for(RAG_agent.MODEL_TIER, llm_config_dict['rag_model']),
+        'research_llm': lambda: model_for(research_agent.MODEL_TIER, llm_config_dict['research_model']),
+        'LinkedIn_llm': lambda: model_for(linkedin_agent.POST_CHAIN_MODEL_TIER, llm_config_dict['linkedin_model'], temperature=llm_config_dict['linkedin_temp']),
+        'email_writer_llm': lambda: model_for(email_agent.WRITER_CHAIN_MODEL_TIER, llm_config_dict['email_writer_model'], temperature=llm_config_dict['email_writer_temp']),
+        'email_reviewer_llm': lambda: model_for(email_agent.REVIEWER_CHAIN_MODEL_TIER, llm_config_dict['email_reviewer_model']),
+        'sales_llm': lambda: model_for(sales_data_agent.MODEL_TIER, llm_config_dict['sales_model']),
+        'calendar_llm': lambda: model_for(calendar_agent.MODEL_TIER, llm_config_dict['calendar_model']),
+        'yukta_nexus_llm': lambda: model_for(YUKTA_PRIME_MODEL_TIER, llm_config_dict['yukta_nexus_model']),
+        'communication_supervisor_llm': lambda: model_for(communication_supervisor.MODEL_TIER, default_model),
+        'personal_supervisor_llm': lambda: model_for(personal_supervisor.MODEL_TIER, default_model),
+        'company_supervisor_llm': lambda: model_for(company_supervisor.MODEL_TIER, default_model),
+        'embedding': lambda: NVIDIAEmbeddings(model=llm_config_dict['embedding_model'], nvidia_api_key=api_keys_dict['NVIDIA_API_KEY']),
+        'history_manager': history_manager,
+        'rag_answer_cache': lambda: SemanticCache(
+            threshold=runtime_config_dict.get('rag_cache_threshold', 0.92),
+            max_entries=runtime_config_dict.get('rag_cache_max_entries', 512),
+            ttl_seconds=runtime_config_dict.get('rag_cache_ttl_seconds', 24 * 3600),
+        ),
+        'search_cache': search_cache,
+        'sales_query_cache': lambda: SalesQueryCache(
+            result_ttl_seconds=runtime_config_dict.get('sales_result_ttl_seconds', 300),
+            sql_ttl_seconds=runtime_config_dict.get('sales_sql_ttl_seconds', 24 * 3600),
+            marker_check_interval=runtime_config_dict.get('sales_marker_check_interval', 30),
+        ),
+        'sales_schema_cache': lambda: SchemaSnapshotCache(db_uri, cache_dir=runtime_config_dict.get('sales_schema_cache_dir', '.schema_cache')),
+        'sales_result_store': lambda: ResultStore(max_rows=runtime_config_dict.get('sales_result_max_rows', 10000)),
+        'sales_sql_guard': lambda: SQLGuard(
+            max_rows=runtime_config_dict.get('sales_result_max_rows', 10000),
+            max_cost=runtime_config_dict.get('sales_query_max_cost', 1_000_000),
+            statement_timeout_ms=runtime_config_dict.get('sales_query_timeout_ms', 15000),
+        ),
+        'chart_renderer': lambda: ChartRenderer(max_bytes=runtime_config_dict.get('chart_cache_max_mb', 50) * 1024 * 1024),
+        'checkpointer': lambda: create_checkpointer(
+            backend=runtime_config_dict.get('checkpointer_backend', 'memory'),
+            sqlite_path=runtime_config_dict.get('checkpointer_sqlite_path', 'yukta_checkpoints.sqlite'),
+            pg_conninfo=runtime_config_dict.get('checkpointer_pg_conninfo'),
+            pool_max_size=runtime_config_dict.get('checkpointer_pool_max_size', 10),
+        ),
+    }, report, max_workers=runtime_config_dict.get('startup_max_workers', 8))
+
+    _history_manager = components['history_manager']
+    history_hook = _history_manager.as_hook() if _history_manager is not None else None
     parser = StrOutputParser()
 
-    init_rag_agent(RAG_llm, embedding, pinecone_rag_index_name, parser)
-    init_research_agent(research_llm, api_keys_dict['TAVILY_API_KEY'])
-    init_linkedin_agent(LinkedIn_llm)
-    init_email_agent(llm, email_writer_llm, email_reviewer_llm)
-    init_sales_data_agent(sales_llm, db_uri)
-    init_calendar_agent(calendar_llm)
+    # Pinecone, the SQL database and the Google Calendar session are connected by their agents on first use
+    lazy_backends = [
+        report.timed('init:RAG_agent', lambda: init_rag_agent(
+            components['RAG_llm'], components['embedding'], pinecone_rag_index_name, parser, components['rag_answer_cache'],
+            history_hook, agent_llm=components['RAG_agent_llm'], startup_report=report)),
+        report.timed('init:SalesDataAgent', lambda: init_sales_data_agent(
+            components['sales_llm'], db_uri, components['sales_query_cache'], components['sales_schema_cache'],
+            components['sales_result_store'], components['chart_renderer'], history_hook, startup_report=report,
+            sql_guard=components['sales_sql_guard'])),
+        report.timed('init:calendar_agent', lambda: init_calendar_agent(components['calendar_llm'], history_hook, startup_report=report)),
+    ]
+    report.timed('init:research_agent', lambda: init_research_agent(components['research_llm'], api_keys_dict['TAVILY_API_KEY'], history_hook, components['search_cache']))
+    report.timed('init:linkedin_agent', lambda: init_linkedin_agent(components['LinkedIn_llm']))
+    report.timed('init:email_agent', lambda: init_email_agent(
+        components['email_writer_llm'], components['email_reviewer_llm'],
+        max_revisions=runtime_config_dict.get('email_max_revisions', 2),
+        stream_draft=runtime_config_dict.get('email_stream_draft', True)))
+    print(f"Runnable registry: {len(registered_runnables())} chains pre-built ({', '.join(sorted(registered_runnables()))})")
 
-    rag_agent_instance = create_rag_agent()
-    research_agent_instance = create_research_agent()
-    linkedin_agent_instance = create_linkedin_agent()
-    email_agent_instance = create_email_agent()
-    sales_data_agent_instance = create_sales_data_agent()
-    calendar_agent_instance = create_calendar_agent()
+    prewarm_names = runtime_config_dict.get('startup_prewarm') or []
+    if prewarm_names:
+        # Connected in the background right after startup, so the first request usually does not wait for them
+        prewarm([backend for backend in lazy_backends if backend.name in prewarm_names])
 
-    init_communication_supervisor(llm, research_agent_instance, email_agent_instance, linkedin_agent_instance)
-    init_personal_supervisor(llm, rag_agent_instance, calendar_agent_instance) 
-    init_company_supervisor(llm, sales_data_agent_instance)
+    rag_agent_instance, research_agent_instance, linkedin_agent_instance, email_agent_instance, sales_data_agent_instance, calendar_agent_instance = report.timed(
+        'compile:agents', lambda: (create_rag_agent(), create_research_agent(), create_linkedin_agent(), create_email_agent(),
+                                   create_sales_data_agent(), create_calendar_agent()))
 
-    communication_supervisor_graph = create_communication_supervisor_graph()
-    personal_supervisor_graph = create_personal_supervisor_graph()
-    company_supervisor_graph = create_company_supervisor_graph()
+    init_communication_supervisor(components['communication_supervisor_llm'], research_agent_instance, email_agent_instance, linkedin_agent_instance, history_hook)
+    init_personal_supervisor(components['personal_supervisor_llm'], rag_agent_instance, calendar_agent_instance, history_hook)
+    init_company_supervisor(components['company_supervisor_llm'], sales_data_agent_instance, history_hook)
 
-    checkpointer = InMemorySaver()
+    communication_supervisor_graph, personal_supervisor_graph, company_supervisor_graph = report.timed(
+        'compile:supervisors', lambda: (create_communication_supervisor_graph(), create_personal_supervisor_graph(), create_company_supervisor_graph()))
 
-    yukta_nexus_graph = create_supervisor(
+    checkpointer = components['checkpointer']
+    if runtime_config_dict.get('checkpointer_ttl_seconds') or runtime_config_dict.get('checkpointer_max_threads'):
+        start_checkpointer_maintenance(
+            checkpointer,
+            interval_seconds=runtime_config_dict.get('checkpointer_maintenance_interval', 600),
+            ttl_seconds=runtime_config_dict.get('checkpointer_ttl_seconds'),
+            max_threads=runtime_config_dict.get('checkpointer_max_threads'),
+        )
+
+    compile_started = time.perf_counter()
+    yukta_nexus_llm = components['yukta_nexus_llm']
+    yukta_prime_workflow = create_supervisor(
         model = yukta_nexus_llm, 
         agents=[communication_supervisor_graph, personal_supervisor_graph, company_supervisor_graph], 
         prompt = yukta_nexus_prompt,
+        pre_model_hook = history_hook, # Compacts what the model sees; the checkpoint keeps the full history
         add_handoff_back_messages=True,
         output_mode="full_history",
-    ).compile(checkpointer=checkpointer, name="yukta_nexus_graph_instance") 
+    )
+
+    fast_path_enabled = runtime_config_dict.get('fast_path_router_enabled', True)
+    # With the fast path on, Yukta Prime is a node of the router graph, which owns the checkpointer
+    prime_checkpointer, prime_name = (None, "yukta_prime") if fast_path_enabled else (checkpointer, "yukta_nexus_graph_instance")
+    if runtime_config_dict.get('yukta_prime_mode', 'sequential') == 'plan':
+        # Planner/executor: independent steps of multi-domain requests run on their supervisors in parallel
+        yukta_prime_graph = build_plan_executor_graph(
+            yukta_nexus_llm,
+            [communication_supervisor_graph, personal_supervisor_graph, company_supervisor_graph],
+            fallback_graph=yukta_prime_workflow.compile(name="yukta_prime"),
+            name=prime_name,
+            checkpointer=prime_checkpointer,
+        )
+    else:
+        yukta_prime_graph = yukta_prime_workflow.compile(checkpointer=prime_checkpointer, name=prime_name)
+
+    if fast_path_enabled:
+        _fast_path_router = FastPathRouter(threshold=runtime_config_dict.get('fast_path_router_threshold', 0.75))
+        yukta_nexus_graph = _build_fast_path_graph(
+            yukta_prime_graph,
+            [sales_data_agent_instance, calendar_agent_instance, linkedin_agent_instance, email_agent_instance, rag_agent_instance, research_agent_instance],
+            _fast_path_router,
+            checkpointer,
+        )
+    else:
+        _fast_path_router = None
+        yukta_nexus_graph = yukta_prime_graph
+    report.record('compile:yukta_prime', time.perf_counter() - compile_started)
+
+    if runtime_config_dict.get('tracing_enabled', True):
+        # Registered once on the outermost graph; callbacks propagate to every supervisor, agent, LLM and tool run
+        _tracer = YuktaTracer(create_span_sink(runtime_config_dict.get('tracing_sink', 'jsonl'),
+                                               runtime_config_dict.get('tracing_path', os.path.join('traces', 'spans.jsonl'))))
+        yukta_nexus_graph = yukta_nexus_graph.with_config(callbacks=[_tracer])
+    else:
+        _tracer = None
 
+    report.mark_ready()
+    print(f"Startup report:\n{report.format()}")
     print("=======================================All components compiled successfully!=======================================")
     return yukta_nexus_graph, checkpointer
\ No newline at end of file